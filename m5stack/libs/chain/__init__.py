@@ -4,6 +4,7 @@
 
 _attrs = {
     "AngleChain": "angle",
+    "AsyncChainBus": "chain_async",
     "BusChainUnit": "unit_bus",
     "ChainBus": "chain",
     "EncoderChain": "encoder",
@@ -41,35 +41,28 @@ CHAIN_DEVICE_TYPE_PIR = 0x0009  # PIR device type
 CHAIN_DEVICE_TYPE_MIC = 0x000A  # Microphone device type
 
 
-class RecvData:
-    def __init__(self, state, length, data, crc):
-        self.recv_time = time.ticks_ms()
-        self.state = state
-        self.length = length
-        self.device_id = 0
-        self.cmd = 0
-        self.payload = data
-        self.crc = crc
-        self.payload_len = 0
-
-
 class ChainLinkLayer:
-    RECV_STATE_HEAD1 = 0x01
-    RECV_STATE_HEAD2 = 0x02
-    RECV_STATE_LEN1 = 0x03
-    RECV_STATE_LEN2 = 0x04
-    RECV_STATE_DEVICE_ID = 0x05
-    RECV_STATE_CMD = 0x06
-    RECV_STATE_PAYLOAD = 0x07
-    RECV_STATE_CRC = 0x08
-    RECV_STATE_TAIL1 = 0x09
-    RECV_STATE_TAIL2 = 0x0A
+    # Largest packet accepted by the decoder (header, length, body, tail),
+    # a longer length field is treated as a false header.
+    MAX_PACKET_LEN = 2048
+    # Unread packets kept per (device_id, cmd), older ones are dropped.
+    MAX_QUEUED_PACKETS = 8
 
     def __init__(self, uart, verbose=False):
         self.uart = uart
         self._verbose = verbose
-        self._recv_data = RecvData(self.RECV_STATE_HEAD1, 0, bytearray(), 0)
-        self._packet_queue = []
+        self._rx = b""
+        self._rx_time = 0
+        # (device_id << 8) | cmd -> [(recv_time, payload), ...], oldest first
+        self._packets = {}
+        # guards self._packets, used by the receive and the caller threads
+        self._packets_lock = _thread.allocate_lock()
+        # (device_id << 8) | cmd -> [[lock, deadline], ...] of blocked receivers
+        self._waiters = {}
+        # guards self._waiters, used by the receive and the caller threads
+        self._waiters_lock = _thread.allocate_lock()
+        # True while a receive thread decodes packets and wakes the waiters
+        self._dispatching = False
         self._device_num = 0
 
     # CRC 校验算法：就是求和
@@ -80,8 +73,8 @@ class ChainLinkLayer:
         crc += sum(data)
         return crc & 0xFF
 
-    # 发送完整数据包
-    def _send_packet(self, index, cmd, data=b""):
+    # 构建完整数据包
+    def _encode_packet(self, index, cmd, data=b""):
         # 构建数据体: [长度低, 长度高, 索引, 命令] + 数据
         packet_len = 2 + 2 + 1 + 1 + len(data) + 1 + 2
         packet = bytearray(packet_len)
@@ -122,104 +115,122 @@ class ChainLinkLayer:
             print("[HOST] >>> [Chain]: ", end="")
             print(" ".join(["%02X" % b for b in packet]))
 
-        self.uart.write(packet)
+        return packet
+
+    # 发送完整数据包
+    def _send_packet(self, index, cmd, data=b""):
+        self.uart.write(self._encode_packet(index, cmd, data))
 
     # 接收并解析数据包
     def _decode_packet(self, buf: bytes, timeout_ms=None) -> bool:
+        """Decode all complete packets in buf and the previously buffered bytes.
+
+        The header ``AA 55`` is located with ``bytes.find``, a packet is
+        only taken once all of its bytes have arrived and is then checked
+        in one pass: tail, sum CRC and payload are read through a
+        memoryview, so payload bytes are copied once into the queued
+        packet. Incomplete packets are kept for the next call.
+
+        :param bytes buf: Received bytes.
+        :param int timeout_ms: Drop a buffered incomplete packet older than
+                               this, None keeps it until it completes.
+        :return: True if at least one packet was queued.
+        """
         if self._verbose:
             print("[HOST] <<< [Chain]: ", end="")
             print(" ".join(["%02X" % b for b in buf]))
 
+        now = time.ticks_ms()
+        if (
+            self._rx
+            and timeout_ms is not None
+            and time.ticks_diff(now, self._rx_time) > timeout_ms
+        ):
+            self._rx = b""
+        data = self._rx + buf if self._rx else bytes(buf)
+        mv = memoryview(data)
+        end = len(data)
+        pos = 0
         decoded = False
 
-        for b in buf:
-            # if self._verbose:
-            #     print("current state:", self._recv_data.state)
-            if self._recv_data.state == self.RECV_STATE_HEAD1:
-                # 查找帧头 0xAA
-                if b == 0xAA:
-                    # 初始化接收数据
-                    self._recv_data.recv_time = time.ticks_ms()
-                    self._recv_data.payload = bytearray()
-                    self._recv_data.length = 0
-                    self._recv_data.payload_len = 0
-                    self._recv_data.crc = 0
-                    # 转到下一个状态
-                    self._recv_data.state = self.RECV_STATE_HEAD2
-            elif self._recv_data.state == self.RECV_STATE_HEAD2:
-                # 查找帧头 55
-                if b == 0x55:
-                    self._recv_data.state = self.RECV_STATE_LEN1
-                else:
-                    self._recv_data.state = self.RECV_STATE_HEAD1
-            elif self._recv_data.state == self.RECV_STATE_LEN1:
-                self._recv_data.length = b
-                self._recv_data.state = self.RECV_STATE_LEN2
-            elif self._recv_data.state == self.RECV_STATE_LEN2:
-                self._recv_data.length = self._recv_data.length | (b << 8)
-                self._recv_data.payload_len = 0
-                self._recv_data.state = self.RECV_STATE_DEVICE_ID
-            elif self._recv_data.state == self.RECV_STATE_DEVICE_ID:
-                self._recv_data.device_id = b
-                self._recv_data.state = self.RECV_STATE_CMD
-            elif self._recv_data.state == self.RECV_STATE_CMD:
-                self._recv_data.cmd = b
-                if self._recv_data.length - 3 == 0:
-                    self._recv_data.state = self.RECV_STATE_CRC
-                else:
-                    self._recv_data.state = self.RECV_STATE_PAYLOAD
-            elif self._recv_data.state == self.RECV_STATE_PAYLOAD:
-                self._recv_data.payload.append(b)
-                self._recv_data.payload_len += 1
-                if self._recv_data.payload_len == self._recv_data.length - 3:
-                    self._recv_data.state = self.RECV_STATE_CRC
-            elif self._recv_data.state == self.RECV_STATE_CRC:
-                self._recv_data.crc = b
-                self._recv_data.state = self.RECV_STATE_TAIL1
-            elif self._recv_data.state == self.RECV_STATE_TAIL1:
-                if b == 0x55:
-                    self._recv_data.state = self.RECV_STATE_TAIL2
-                else:
-                    self._recv_data.state = self.RECV_STATE_HEAD1
-            elif self._recv_data.state == self.RECV_STATE_TAIL2:
-                self._recv_data.state = self.RECV_STATE_HEAD1
-                if b == 0xAA:
-                    crc = self._crc(
-                        self._recv_data.cmd, self._recv_data.device_id, self._recv_data.payload
-                    )
-                    if crc != self._recv_data.crc:
-                        warnings.warn("CRC check failed")
-                    else:
-                        if self._recv_data.cmd not in (CMD_HEARTBEAT, CMD_ENUM_REQUEST):
-                            self._packet_queue.append(
-                                (
-                                    self._recv_data.recv_time,
-                                    self._recv_data.device_id,
-                                    self._recv_data.cmd,
-                                    self._recv_data.payload,
-                                )
-                            )
-                            if self._verbose:
-                                print("[HOST] <<< [Chain]: ", end="")
-                                print(
-                                    "time=%d,device_id=%02X,cmd=%02X,payload=%s"
-                                    % (
-                                        self._recv_data.recv_time,
-                                        self._recv_data.device_id,
-                                        self._recv_data.cmd,
-                                        " ".join(["%02X" % b for b in self._recv_data.payload]),
-                                    )
-                                )
-                            decoded = True
+        while True:
+            start = data.find(b"\xaa\x55", pos)
+            if start < 0:
+                # keep a trailing 0xAA, it may be the first half of a header
+                pos = end - 1 if end and data[end - 1] == 0xAA else end
+                break
+            if start + 4 > end:
+                pos = start
+                break
+            length = data[start + 2] | (data[start + 3] << 8)
+            if length < 3 or length + 6 > self.MAX_PACKET_LEN:
+                pos = start + 1
+                continue
+            tail = start + 4 + length
+            if tail + 2 > end:
+                pos = start
+                break
+            if data[tail] != 0x55 or data[tail + 1] != 0xAA:
+                # not a packet, resync behind this header
+                pos = start + 1
+                continue
+            pos = tail + 2
+            if sum(mv[start + 4 : tail - 1]) & 0xFF != data[tail - 1]:
+                warnings.warn("CRC check failed")
+                continue
+            device_id = data[start + 4]
+            cmd = data[start + 5]
+            if cmd in (CMD_HEARTBEAT, CMD_ENUM_REQUEST):
+                continue
+            payload = bytearray(mv[start + 6 : tail - 1])
+            self._queue_packet(now, device_id, cmd, payload)
+            if self._verbose:
+                print("[HOST] <<< [Chain]: ", end="")
+                print(
+                    "time=%d,device_id=%02X,cmd=%02X,payload=%s"
+                    % (now, device_id, cmd, " ".join(["%02X" % b for b in payload]))
+                )
+            decoded = True
+
+        if pos < end:
+            if not self._rx or pos > 0:
+                self._rx_time = now
+            self._rx = data[pos:]
+        else:
+            self._rx = b""
         return decoded
 
+    def _queue_packet(self, recv_time, device_id, cmd, payload):
+        key = (device_id << 8) | cmd
+        with self._packets_lock:
+            queue = self._packets.get(key)
+            if queue is None:
+                queue = self._packets[key] = []
+            queue.append((recv_time, payload))
+            if len(queue) > self.MAX_QUEUED_PACKETS:
+                queue.pop(0)
+        with self._waiters_lock:
+            waiters = self._waiters.pop(key, None)
+            if waiters:
+                for waiter in waiters:
+                    waiter[0].release()
+
+    def _expire_waiters(self, now=None):
+        """唤醒已超时的等待者；now 为 None 时唤醒全部等待者。"""
+        with self._waiters_lock:
+            for waiters in self._waiters.values():
+                for waiter in waiters[:]:
+                    if now is None or time.ticks_diff(now, waiter[1]) >= 0:
+                        waiters.remove(waiter)
+                        waiter[0].release()
+
     def _clear_old_packets(self):
         """清理队列中超过 5 秒的旧数据包。"""
         current_time = time.ticks_ms()
-        for i in range(len(self._packet_queue) - 1, -1, -1):
-            pkt_time = self._packet_queue[i][0]
-            if time.ticks_diff(current_time, pkt_time) > 5000:
-                del self._packet_queue[i]
+        with self._packets_lock:
+            for queue in self._packets.values():
+                while queue and time.ticks_diff(current_time, queue[0][0]) > 5000:
+                    queue.pop(0)
 
     def _receive_packet(
         self, device_id, cmd, remove_repeated=False, timeout_ms=3000
@@ -231,66 +242,52 @@ class ChainLinkLayer:
           并返回其中最新的一条；若为 False，则返回并移除遇到的第一条。
         - timeout_ms: 超时毫秒数。
         返回 (state, payload): state=True 表示获取成功，payload 为数据；否则返回 (False, 空 bytearray)。
+
+        接收线程运行时，等待者阻塞在一个锁上，解码到匹配的数据包或超时时由接收线程唤醒，
+        而不是每 10 ms 轮询一次队列。
         """
-        start = time.ticks_ms()
+        key = (device_id << 8) | cmd
+        deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
         while True:
-            if not remove_repeated:
-                # 旧行为：命中第一条即返回
-                for i, (_, dev_id, command, payload) in enumerate(self._packet_queue):
-                    if dev_id == device_id and command == cmd:
-                        del self._packet_queue[i]
-                        return (True, payload)
-            else:
-                # 删除重复项：收集所有匹配项索引，删除并返回最新一条
-                match_indices = [
-                    i
-                    for i, (_, dev_id, command, _) in enumerate(self._packet_queue)
-                    if dev_id == device_id and command == cmd
-                ]
-                if match_indices:
-                    last_idx = match_indices[-1]
-                    payload = self._packet_queue[last_idx][2]
-                    # 反向删除，避免索引移动
-                    for idx in reversed(match_indices):
-                        del self._packet_queue[idx]
-                    return (True, payload)
-
-            if time.ticks_diff(time.ticks_ms(), start) > timeout_ms:
-                break
-            time.sleep_ms(10)
-        return (False, bytearray())
+            waiter = None
+            if self._dispatching:
+                # 先登记再检查队列，避免错过两者之间解码到的数据包
+                waiter = [_thread.allocate_lock(), deadline]
+                waiter[0].acquire()
+                with self._waiters_lock:
+                    self._waiters.setdefault(key, []).append(waiter)
+            state, payload = self.receive_packet(device_id, cmd, remove_repeated)
+            expired = time.ticks_diff(time.ticks_ms(), deadline) >= 0
+            if state or expired or waiter is None:
+                if waiter is not None:
+                    with self._waiters_lock:
+                        waiters = self._waiters.get(key)
+                        if waiters and waiter in waiters:
+                            waiters.remove(waiter)
+                if state or expired:
+                    return (state, payload)
+                time.sleep_ms(1)
+                continue
+            waiter[0].acquire()
 
     def receive_packet(self, device_id, cmd, remove_repeated=False) -> (bool, bytearray):
-        """从队列中等待并获取匹配的数据包。
+        """从队列中获取匹配的数据包（不等待）。
 
         - device_id/cmd: 目标设备与命令。
         - remove_repeated: 若为 True，则删除队列中所有与 (device_id, cmd) 匹配的重复项，
-          并返回其中最新的一条；若为 False，则返回并移除遇到的第一条。
-        - timeout_ms: 超时毫秒数。
+          并返回其中最新的一条；若为 False，则返回并移除最早的一条。
         返回 (state, payload): state=True 表示获取成功，payload 为数据；否则返回 (False, 空 bytearray)。
         """
-
-        if not remove_repeated:
-            # 旧行为：命中第一条即返回
-            for i, (_, dev_id, command, payload) in enumerate(self._packet_queue):
-                if dev_id == device_id and command == cmd:
-                    del self._packet_queue[i]
-                    return (True, payload)
-        else:
-            # 删除重复项：收集所有匹配项索引，删除并返回最新一条
-            match_indices = [
-                i
-                for i, (_, dev_id, command, _) in enumerate(self._packet_queue)
-                if dev_id == device_id and command == cmd
-            ]
-            if match_indices:
-                last_idx = match_indices[-1]
-                payload = self._packet_queue[last_idx][2]
-                # 反向删除，避免索引移动
-                for idx in reversed(match_indices):
-                    del self._packet_queue[idx]
-                return (True, payload)
-        return (False, bytearray())
+        with self._packets_lock:
+            queue = self._packets.get((device_id << 8) | cmd)
+            if not queue:
+                return (False, bytearray())
+            if remove_repeated:
+                payload = queue[-1][1]
+                del queue[:]
+            else:
+                payload = queue.pop(0)[1]
+        return (True, payload)
 
     def set_rgb_color(self, device_id: int, index: int, color: int) -> bool:
         """set RGB color.
@@ -513,7 +510,7 @@ class ChainBus:
 
             .. code-block:: python
 
-                chainbus_0.send(1, 0x20, b"\x00\x01\xFF\x00\x00", 3000)
+                chainbus_0.send(1, 0x20, b"\x00\x01\xff\x00\x00", 3000)
         """
         for _ in range(3):
             self.chainll._send_packet(device_id, cmd, payload)
@@ -555,6 +552,15 @@ class ChainBus:
         self.disconnect_device_handler = handler
 
     def _recv_task(self):
+        self.chainll._dispatching = True
+        try:
+            self._recv_loop()
+        finally:
+            # 接收线程退出后不再有人唤醒等待者
+            self.chainll._dispatching = False
+            self.chainll._expire_waiters()
+
+    def _recv_loop(self):
         decoded = False
         last_clear_time = time.ticks_ms()
         while self._running:
@@ -581,7 +587,12 @@ class ChainBus:
                 self.chainll._clear_old_packets()
                 last_clear_time = time.ticks_ms()
 
-            time.sleep_ms(10)
+            # 有等待者时缩短轮询间隔，使响应在接近线路时间内返回
+            if any(self.chainll._waiters.values()):
+                self.chainll._expire_waiters(time.ticks_ms())
+                time.sleep_ms(1)
+            else:
+                time.sleep_ms(10)
 
     def _device_connect_task(self, timer):
         new_device_num = self.chainll.get_device_num()
@@ -0,0 +1,260 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import time
+from .chain import ChainLinkLayer, CMD_ENUM_RESPONSE
+
+
+class _AsyncLinkLayer(ChainLinkLayer):
+    """ChainLinkLayer that wakes asyncio waiters and event subscribers."""
+
+    def __init__(self, uart, verbose=False):
+        super().__init__(uart, verbose=verbose)
+        # (device_id << 8) | cmd -> [asyncio.Event, ...]
+        self._async_waiters = {}
+        # (device_id << 8) | cmd -> [ChainEvents, ...]
+        self._subscribers = {}
+
+    def _queue_packet(self, recv_time, device_id, cmd, payload):
+        key = (device_id << 8) | cmd
+        subscribers = self._subscribers.get(key)
+        if subscribers:
+            # 事件数据包直接交给订阅者，不进入响应队列
+            for sub in subscribers:
+                sub._put(payload)
+            return
+        super()._queue_packet(recv_time, device_id, cmd, payload)
+        waiters = self._async_waiters.pop(key, None)
+        if waiters:
+            for event in waiters:
+                event.set()
+
+
+class ChainEvents:
+    """Async iterator over unsolicited packets of one device and command.
+
+    Returned by :meth:`AsyncChainBus.events`, every iteration returns the
+    payload of the next packet. At most ``maxlen`` unread packets are kept,
+    older ones are dropped.
+    """
+
+    def __init__(self, link, key, maxlen=16, convert=None):
+        self._link = link
+        self._key = key
+        self._maxlen = maxlen
+        self._convert = convert
+        self._queue = []
+        self._event = asyncio.Event()
+        link._subscribers.setdefault(key, []).append(self)
+
+    def _put(self, payload):
+        self._queue.append(payload)
+        if len(self._queue) > self._maxlen:
+            self._queue.pop(0)
+        self._event.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._queue:
+            self._event.clear()
+            await self._event.wait()
+        payload = self._queue.pop(0)
+        if self._convert is not None:
+            return self._convert(payload)
+        return payload
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        subscribers = self._link._subscribers.get(self._key)
+        if subscribers and self in subscribers:
+            subscribers.remove(self)
+
+
+class ChainValues:
+    """Async iterator that polls a value and returns it when it changed.
+
+    :param getter: Coroutine function returning the current value, None on
+                   failure.
+    :param int interval_ms: Poll interval in milliseconds.
+    """
+
+    def __init__(self, getter, interval_ms=50):
+        self._getter = getter
+        self._interval = interval_ms / 1000
+        self._last = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            value = await self._getter()
+            if value is not None and value != self._last:
+                self._last = value
+                return value
+            await asyncio.sleep(self._interval)
+
+
+class AsyncChainBus:
+    """Create a Chain bus driven by asyncio.
+
+    Received bytes are read with an ``asyncio.StreamReader`` over the UART and
+    decoded in one background task, so commands to several devices can be
+    awaited concurrently from one event loop without threads. Device classes
+    accept an AsyncChainBus for their ``*_async`` methods.
+
+    :param int id: UART ID.
+    :param int tx: TX pin.
+    :param int rx: RX pin.
+    :param bool verbose: Enable verbose mode. Default is False.
+    :param uart: Stream to use instead of creating a UART, e.g. a fake UART
+                 in tests.
+
+    MicroPython Code Block:
+
+        .. code-block:: python
+
+            import asyncio
+            from chain import AsyncChainBus, EncoderChain, KeyChain
+
+            async def main():
+                bus = AsyncChainBus(2, 32, 33)
+                await bus.start()
+                encoder = EncoderChain(bus, 1)
+                key = KeyChain(bus, 2)
+                async for value in encoder.values_async():
+                    print(value)
+
+            asyncio.run(main())
+    """
+
+    def __init__(self, id=None, tx=None, rx=None, verbose=False, uart=None):
+        if uart is None:
+            import machine
+
+            uart = machine.UART(id, baudrate=115200, tx=tx, rx=rx, rxbuf=2048)
+        self.uart = uart
+        self._verbose = verbose
+        self._device = []
+        self.chainll = _AsyncLinkLayer(self.uart, verbose=self._verbose)
+        self._stream = asyncio.StreamReader(self.uart)
+        self._locks = {}
+        self._task = None
+        self.device_num = 0
+
+    def register_device(self, device):
+        """Register a Chain device.
+
+        :param device: Chain device instance.
+        """
+        self._device.append(device)
+
+    async def start(self) -> int:
+        """Start the receive task and enumerate the devices.
+
+        :return: Number of connected devices.
+        :rtype: int
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._recv_task())
+        self.device_num = await self.get_device_num_async()
+        return self.device_num
+
+    async def _recv_task(self):
+        last_clear_time = time.ticks_ms()
+        while True:
+            data = await self._stream.read(256)
+            if data:
+                self.chainll._decode_packet(data)
+            if time.ticks_diff(time.ticks_ms(), last_clear_time) > 5000:
+                self.chainll._clear_old_packets()
+                last_clear_time = time.ticks_ms()
+
+    async def _wait_packet(self, device_id, cmd, timeout_ms):
+        key = (device_id << 8) | cmd
+        state, response = self.chainll.receive_packet(device_id, cmd)
+        if state:
+            return (state, response)
+        event = asyncio.Event()
+        self.chainll._async_waiters.setdefault(key, []).append(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            waiters = self.chainll._async_waiters.get(key)
+            if waiters and event in waiters:
+                waiters.remove(event)
+            return (False, bytearray())
+        return self.chainll.receive_packet(device_id, cmd)
+
+    async def send_async(
+        self, device_id: int, cmd: int, payload: bytes = b"", timeout_ms: int = 3000
+    ) -> bytes:
+        """Send custom command to device and wait for the response.
+
+        Commands to different devices or with different command codes run
+        concurrently, commands with the same device and command code are
+        sent one after another.
+
+        :param int device_id: Device ID.
+        :param int cmd: Command.
+        :param bytes payload: Data.
+        :param int timeout_ms: receive timeout in milliseconds.
+
+        :return: Response data, empty if the device did not answer.
+        :rtype: bytes
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                response = await bus.send_async(1, 0x20, b"\\x00\\x01\\xFF\\x00\\x00")
+        """
+        key = (device_id << 8) | cmd
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:
+            for _ in range(3):
+                self._stream.write(self.chainll._encode_packet(device_id, cmd, payload))
+                await self._stream.drain()
+                state, response = await self._wait_packet(device_id, cmd, timeout_ms)
+                if state:
+                    return response
+        return b""
+
+    async def get_device_num_async(self) -> int:
+        """Get connected device number.
+
+        :return: Number of connected devices.
+        :rtype: int
+        """
+        response = await self.send_async(0xFF, CMD_ENUM_RESPONSE, b"\x00")
+        if response:
+            self.chainll._device_num = response[0]
+            return response[0]
+        return 0
+
+    def events(self, device_id: int, cmd: int, maxlen: int = 16, convert=None) -> ChainEvents:
+        """Subscribe to unsolicited packets of a device.
+
+        While subscribed, packets with this device ID and command are only
+        delivered to the returned iterator.
+
+        :param int device_id: Device ID.
+        :param int cmd: Command of the event packets.
+        :param int maxlen: Maximum number of unread events.
+        :param convert: Optional function applied to every payload.
+        :return: Async iterator of payloads.
+        :rtype: ChainEvents
+        """
+        return ChainEvents(self.chainll, (device_id << 8) | cmd, maxlen, convert)
+
+    def deinit(self):
+        """Stop the receive task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
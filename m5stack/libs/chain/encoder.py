@@ -174,3 +174,57 @@ class EncoderChain(KeyChain):
             # Convert to bool: 0 -> True (clockwise increase), 1 -> False (clockwise decrease)
             return response[0] == 0
         return False
+
+    async def get_encoder_value_async(self) -> int:
+        """Get the encoder value (async, requires an AsyncChainBus).
+
+        :return: Encoder value as int16_t (-32768 to 32767), or None if failed.
+        :rtype: int
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                value = await encoder_0.get_encoder_value_async()
+        """
+        response = await self.bus.send_async(self.device_id, self.CMD_GET_VALUE)
+        if len(response) >= 2:
+            return struct.unpack("<h", bytes([response[0], response[1]]))[0]
+        return None
+
+    async def get_encoder_increment_async(self) -> int:
+        """Get the encoder increment value (async, requires an AsyncChainBus).
+
+        :return: Encoder increment value as int16_t (-32768 to 32767), or None if failed.
+        :rtype: int
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                increment = await encoder_0.get_encoder_increment_async()
+        """
+        response = await self.bus.send_async(self.device_id, self.CMD_GET_INCREMENT)
+        if len(response) >= 2:
+            return struct.unpack("<h", bytes([response[0], response[1]]))[0]
+        return None
+
+    def values_async(self, interval_ms: int = 50):
+        """Get an async iterator of encoder value changes (requires an AsyncChainBus).
+
+        The encoder is polled every interval_ms, a value is returned when it
+        differs from the previous one.
+
+        :param int interval_ms: Poll interval in milliseconds.
+        :return: Async iterator of encoder values.
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                async for value in encoder_0.values_async():
+                    print(value)
+        """
+        from .chain_async import ChainValues
+
+        return ChainValues(self.get_encoder_value_async, interval_ms)
@@ -41,6 +41,13 @@ class KeyChain:
     MODE_EVENT = 0x01
     """Button Event mode"""
 
+    EVENT_CLICK = 0x00
+    """Button click event"""
+    EVENT_DOUBLE_CLICK = 0x01
+    """Button double click event"""
+    EVENT_LONG_PRESS = 0x02
+    """Button long press event"""
+
     def __init__(self, bus: ChainBus, device_id: int):
         self.bus = bus
         self.device_id = device_id
@@ -67,6 +74,43 @@ class KeyChain:
             return response[0] == 1
         return False
 
+    async def get_button_state_async(self) -> bool:
+        """get button state (async, requires an AsyncChainBus).
+
+        :return: Button state, True if pressed, False otherwise.
+        :rtype: bool
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                await keychain_0.get_button_state_async()
+        """
+        response = await self.bus.send_async(self.device_id, self.CMD_KEY_STATE)
+        if response:
+            return response[0] == 1
+        return False
+
+    def events_async(self):
+        """get an async iterator of button events (requires an AsyncChainBus).
+
+        The button has to be in :attr:`MODE_EVENT`. Every iteration returns
+        :attr:`EVENT_CLICK`, :attr:`EVENT_DOUBLE_CLICK` or
+        :attr:`EVENT_LONG_PRESS`. Callbacks set with ``set_*_callback`` are
+        not used with an AsyncChainBus.
+
+        :return: Async iterator of button events.
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                async for event in keychain_0.events_async():
+                    if event == KeyChain.EVENT_CLICK:
+                        print("click")
+        """
+        return self.bus.events(self.device_id, self.CMD_KEY_PRESS, convert=lambda p: p[0])
+
     def set_click_callback(self, callback) -> None:
         """set button click callback.
 
@@ -9,6 +9,7 @@ package(
         "angle.py",
         "encoder.py",
         "chain.py",
+        "chain_async.py",
         "joystick.py",
         "key.py",
         "tof.py",
@@ -57,6 +57,7 @@ package(
         "simcom/toolkit/umqtt/simple.py",
         "simcom/toolkit/umqtt/robust.py",
         "umodem/__init__.py",
+        "umodem/engine.py",
         "umodem/modem.py",
         "umodem/parser.py",
         "ads1110.py",
@@ -98,6 +99,7 @@ package(
         "sths34pf80.py",
         "tca8418.py",
         "tcs3472.py",
+        "timer_scheduler.py",
         "timer_thread.py",
         "vl53l0x.py",
         "paj7620.py",
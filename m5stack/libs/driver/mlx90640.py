@@ -7,6 +7,20 @@ import struct
 import math
 import time
 import gc
+from array import array
+
+try:
+    import micropython
+except ImportError:  # CPython, e.g. to check the calculations on a PC
+
+    class micropython:
+        @staticmethod
+        def native(f):
+            return f
+
+        viper = native
+
+    ptr8 = ptr16 = None
 
 try:
     from typing import List, Optional, Tuple, Union
@@ -26,6 +40,58 @@ MLX90640_DEVICEID1 = 0x2407
 OPENAIR_TA_SHIFT = 8
 
 
+try:
+
+    @micropython.viper
+    def _swap16(src: ptr8, dst: ptr16, n: int):
+        # big endian words of src to the native uint16 of dst
+        for i in range(n):
+            dst[i] = (src[2 * i] << 8) | src[2 * i + 1]
+
+except (AttributeError, NameError):
+
+    def _swap16(src, dst, n):
+        for i in range(n):
+            dst[i] = (src[2 * i] << 8) | src[2 * i + 1]
+
+
+@micropython.native
+def _pixels_to(frame, pixels, offset, kta, kv, alpha, ilc, result, k):
+    # temperatures of the pixels of one subpage, see _calculate_to
+    gain, ta_25, vdd_33, cp, emissivity, ksta, ta_tr, ks_to, ct, alpha_corr_r = k
+    ks1 = ks_to[1]
+    ks1_273 = 1 - ks1 * 273.15
+    ct1 = ct[1]
+    ct2 = ct[2]
+    ct3 = ct[3]
+    sqrt = math.sqrt
+    for p in pixels:
+        ir_data = frame[p]
+        if ir_data > 32767:
+            ir_data -= 65536
+        ir_data = ir_data * gain - offset[p] * (1 + kta[p] * ta_25) * (1 + kv[p] * vdd_33)
+        if ilc is not None:
+            ir_data += ilc[p]
+        ir_data = (ir_data - cp) / emissivity
+
+        a = alpha[p] * ksta
+        sx = sqrt(sqrt(a * a * a * (ir_data + a * ta_tr))) * ks1
+        to = sqrt(sqrt(ir_data / (a * ks1_273 + sx) + ta_tr)) - 273.15
+
+        if to < ct1:
+            r = 0
+        elif to < ct2:
+            r = 1
+        elif to < ct3:
+            r = 2
+        else:
+            r = 3
+        result[p] = (
+            sqrt(sqrt(ir_data / (a * alpha_corr_r[r] * (1 + ks_to[r] * (to - ct[r]))) + ta_tr))
+            - 273.15
+        )
+
+
 class RefreshRate:  # pylint: disable=too-few-public-methods
     """Enum-like class for MLX90640's refresh rate"""
 
@@ -76,7 +142,11 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
         self._i2cread_words(0x2400, eeData)
         # print(eeData)
         self._extract_parameters()
-        self._framebuf = [0] * 768
+        self._framebuf = array("f", bytes(4 * 768))
+        # raw frame: 832 words of RAM, control register and subpage
+        self._frame = array("H", bytes(2 * 834))
+        self._rawbuf = bytearray(2 * 832)
+        self._precompute()
         self.RefreshRate = RefreshRate()
         self.refresh_rate = self.RefreshRate.REFRESH_0_5_HZ
 
@@ -104,23 +174,24 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
         value |= control_register[0] & 0xFC7F
         self._i2cwrite_word(0x800D, value)
 
-    def get_frame(self) -> bytes:
+    def get_frame(self) -> array:
         """Request both 'halves' of a frame from the sensor, merge them
-        and calculate the temperature in C for each of 32x24 pixels. Placed
-        into the 768-element array passed in!"""
+        and calculate the temperature in C for each of 32x24 pixels.
+
+        Returns the 768-element ``array("f")`` of the driver, which is
+        overwritten by the next call; use ``list()`` on it to keep a copy or
+        to serialize it with ``json``."""
         emissivity = 0.95
         tr = 23.15
-        gc.collect()
-        mlx90640frame = [0] * 834
+        frame = self._frame
 
         for _ in range(2):
-            status = self._get_frame_data(mlx90640frame)
+            status = self._get_frame_data(frame)
             if status < 0:
                 raise RuntimeError("Frame data error")
             # For a MLX90640 in the open air the shift is -8 degC.
-            tr = self._get_ta(mlx90640frame) - OPENAIR_TA_SHIFT
-            self._calculate_to(mlx90640frame, emissivity, tr, self._framebuf)
-        del mlx90640frame
+            tr = self._get_ta(frame) - OPENAIR_TA_SHIFT
+            self._calculate_to(frame, emissivity, tr, self._framebuf)
         return self._framebuf
 
     def _get_frame_data(self, frameData: List[int]) -> int:
@@ -137,7 +208,7 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
         while (data_ready != 0) and (cnt < 5):
             self._i2cwrite_word(0x8000, 0x0030)
             # print("Read frame", cnt)
-            self._i2cread_words(0x0400, frameData, end=832)
+            self._read_ram(frameData)
 
             self._i2cread_words(0x8000, status_register)
             data_ready = status_register[0] & 0x0008
@@ -182,10 +253,7 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
     def _calculate_to(
         self, frameData: List[int], emissivity: float, tr: float, result: List[float]
     ) -> None:
-        # pylint: disable=too-many-locals, too-many-branches, too-many-statements
         subpage = frameData[833]
-        alpha_corr_r = [0] * 4
-        ir_data_cp = [0, 0]
 
         vdd = self._get_vdd(frameData)
         ta = self._get_ta(frameData)
@@ -198,14 +266,12 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
         tr4 = tr4 * tr4
         ta_tr = tr4 - (tr4 - ta4) / emissivity
 
-        kta_scale = math.pow(2, self.kta_scale)
-        kv_scale = math.pow(2, self.kv_scale)
-        alpha_scale = math.pow(2, self.alpha_scale)
-
-        alpha_corr_r[0] = 1 / (1 + self.ksTo[0] * 40)
-        alpha_corr_r[1] = 1
-        alpha_corr_r[2] = 1 + self.ksTo[1] * self.ct[2]
-        alpha_corr_r[3] = alpha_corr_r[2] * (1 + self.ksTo[2] * (self.ct[3] - self.ct[2]))
+        alpha_corr_r = (
+            1 / (1 + self.ksTo[0] * 40),
+            1,
+            1 + self.ksTo[1] * self.ct[2],
+            (1 + self.ksTo[1] * self.ct[2]) * (1 + self.ksTo[2] * (self.ct[3] - self.ct[2])),
+        )
 
         # --------- Gain calculation -----------------------------------
         gain = frameData[778]
@@ -216,116 +282,73 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
         # --------- to calculation -------------------------------------
         mode = (frameData[832] & 0x1000) >> 5
 
-        ir_data_cp[0] = frameData[776]
-        ir_data_cp[1] = frameData[808]
-        for i in range(2):
-            if ir_data_cp[i] > 32767:
-                ir_data_cp[i] -= 65536
-            ir_data_cp[i] *= gain
-
-        ir_data_cp[0] -= (
-            self.cpOffset[0] * (1 + self.cp_kta * (ta - 25)) * (1 + self.cp_kv * (vdd - 3.3))
+        ir_data_cp = frameData[808] if subpage else frameData[776]
+        if ir_data_cp > 32767:
+            ir_data_cp -= 65536
+        ir_data_cp *= gain
+        cp_offset = self.cpOffset[subpage]
+        if subpage and mode != self.calibrationModeEE:
+            cp_offset += self.il_chess_c[0]
+        ir_data_cp -= cp_offset * (1 + self.cp_kta * (ta - 25)) * (1 + self.cp_kv * (vdd - 3.3))
+
+        for pixel_number in self.brokenPixels + self.outlierPixels:
+            result[pixel_number] = -273.15
+
+        k = (
+            gain,
+            ta - 25,
+            vdd - 3.3,
+            self.tgc * ir_data_cp,
+            emissivity,
+            1 + self.KsTa * (ta - 25),
+            ta_tr,
+            self.ksTo,
+            self.ct,
+            alpha_corr_r,
+        )
+        _pixels_to(
+            frameData,
+            self._pixels[(mode != 0) * 2 + subpage],
+            self._offset_f,
+            self._kta_f,
+            self._kv_f,
+            self._alpha_f,
+            self._ilc_f if mode != self.calibrationModeEE else None,
+            result,
+            k,
         )
-        if mode == self.calibrationModeEE:
-            ir_data_cp[1] -= (
-                self.cpOffset[1] * (1 + self.cp_kta * (ta - 25)) * (1 + self.cp_kv * (vdd - 3.3))
+
+    def _precompute(self) -> None:
+        # fold the EEPROM constants into per-pixel tables, so that a frame
+        # only needs the arithmetic that depends on Ta and Vdd
+        kta_scale = math.pow(2, self.kta_scale)
+        kv_scale = math.pow(2, self.kv_scale)
+        alpha_scale = SCALEALPHA * math.pow(2, self.alpha_scale)
+        self._offset_f = array("f", self.offset)
+        self._kta_f = array("f", bytes(4 * 768))
+        self._kv_f = array("f", bytes(4 * 768))
+        self._alpha_f = array("f", bytes(4 * 768))
+        self._ilc_f = array("f", bytes(4 * 768))
+        # pixels of interleaved subpage 0 and 1, chess subpage 0 and 1
+        pixels = ([], [], [], [])
+        for p in range(768):
+            self._kta_f[p] = self.kta[p] / kta_scale
+            self._kv_f[p] = self.kv[p] / kv_scale
+            self._alpha_f[p] = alpha_scale / self.alpha[p]
+            il_pattern = p // 32 - (p // 64) * 2
+            chess_pattern = il_pattern ^ (p - (p // 2) * 2)
+            conversion_pattern = ((p + 2) // 4 - (p + 3) // 4 + (p + 1) // 4 - p // 4) * (
+                1 - 2 * il_pattern
             )
-        else:
-            ir_data_cp[1] -= (
-                (self.cpOffset[1] + self.il_chess_c[0])
-                * (1 + self.cp_kta * (ta - 25))
-                * (1 + self.cp_kv * (vdd - 3.3))
+            self._ilc_f[p] = (
+                self.il_chess_c[2] * (2 * il_pattern - 1) - self.il_chess_c[1] * conversion_pattern
             )
-
-        for pixel_number in range(768):
-            if self._is_pixel_bad(pixel_number):
-                # print("Fixing broken pixel %d" % pixel_number)
-                result[pixel_number] = -273.15
+            if self._is_pixel_bad(p):
                 continue
-
-            il_pattern = pixel_number // 32 - (pixel_number // 64) * 2
-            chess_pattern = il_pattern ^ (pixel_number - (pixel_number // 2) * 2)
-            conversion_pattern = (
-                (pixel_number + 2) // 4
-                - (pixel_number + 3) // 4
-                + (pixel_number + 1) // 4
-                - pixel_number // 4
-            ) * (1 - 2 * il_pattern)
-
-            if mode == 0:
-                pattern = il_pattern
-            else:
-                pattern = chess_pattern
-
-            if pattern == frameData[833]:
-                ir_data = frameData[pixel_number]
-                if ir_data > 32767:
-                    ir_data -= 65536
-                ir_data *= gain
-
-                kta = self.kta[pixel_number] / kta_scale
-                kv = self.kv[pixel_number] / kv_scale
-                ir_data -= (
-                    self.offset[pixel_number] * (1 + kta * (ta - 25)) * (1 + kv * (vdd - 3.3))
-                )
-
-                if mode != self.calibrationModeEE:
-                    ir_data += (
-                        self.il_chess_c[2] * (2 * il_pattern - 1)
-                        - self.il_chess_c[1] * conversion_pattern
-                    )
-
-                ir_data = ir_data - self.tgc * ir_data_cp[subpage]
-                ir_data /= emissivity
-
-                alpha_compensated = SCALEALPHA * alpha_scale / self.alpha[pixel_number]
-                alpha_compensated *= 1 + self.KsTa * (ta - 25)
-
-                sx = (
-                    alpha_compensated
-                    * alpha_compensated
-                    * alpha_compensated
-                    * (ir_data + alpha_compensated * ta_tr)
-                )
-                sx = math.sqrt(math.sqrt(sx)) * self.ksTo[1]
-
-                to = (
-                    math.sqrt(
-                        math.sqrt(
-                            ir_data / (alpha_compensated * (1 - self.ksTo[1] * 273.15) + sx)
-                            + ta_tr
-                        )
-                    )
-                    - 273.15
-                )
-
-                if to < self.ct[1]:
-                    torange = 0
-                elif to < self.ct[2]:
-                    torange = 1
-                elif to < self.ct[3]:
-                    torange = 2
-                else:
-                    torange = 3
-
-                to = (
-                    math.sqrt(
-                        math.sqrt(
-                            ir_data
-                            / (
-                                alpha_compensated
-                                * alpha_corr_r[torange]
-                                * (1 + self.ksTo[torange] * (to - self.ct[torange]))
-                            )
-                            + ta_tr
-                        )
-                    )
-                    - 273.15
-                )
-
-                result[pixel_number] = to
-
-    # pylint: enable=too-many-locals, too-many-branches, too-many-statements
+            pixels[il_pattern].append(p)
+            pixels[2 + chess_pattern].append(p)
+        self._pixels = tuple(array("H", x) for x in pixels)
+        gc.collect()
 
     def _extract_parameters(self) -> None:
         self._extract_vddparameters()
@@ -795,6 +818,13 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
 
         return False
 
+    def _read_ram(self, frameData) -> None:
+        # read the 832 words of RAM into frameData without allocating
+        self.i2c_device.writeto(self.i2c_addr, b"\x04\x00", False)
+        time.sleep_ms(1)
+        self.i2c_device.readfrom_into(self.i2c_addr, self._rawbuf)
+        _swap16(self._rawbuf, frameData, 832)
+
     def _i2cwrite_word(self, writeAddress: int, data: int) -> None:
         cmd = bytearray(4)
         cmd[0] = writeAddress >> 8
@@ -824,7 +854,8 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
             readwords = end
 
         # print("remainingWords: {}".format(readwords))
-        gc.collect()
+        if readwords > 64:
+            gc.collect()
         # addrbuf = bytearray(2)
         # inbuf = bytearray(2 * readwords)
         # addrbuf[0] = addr >> 8  # MSB
@@ -839,4 +870,5 @@ class MLX90640:  # pylint: disable=too-many-instance-attributes
 
         del inbuf
         del outdata
-        gc.collect()
+        if readwords > 64:
+            gc.collect()
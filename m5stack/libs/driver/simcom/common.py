@@ -4,9 +4,9 @@
 # SPDX-License-Identifier: MIT
 
 import sys
-import time
 from . import utils
 from collections import namedtuple
+from driver.umodem.engine import ATEngine
 
 AT_CMD = namedtuple("AT_CMD", ["command", "response", "timeout"])
 ATCommand = namedtuple("ATCommand", ["cmd", "rsp1", "rsp2", "timeout"])
@@ -59,6 +59,9 @@ class Modem(object):
             # Setup UART
             self.uart = machine.UART(1, 115200, timeout=1000, rx=tx_pin, tx=rx_pin, rxbuf=1024)
 
+        # room for the largest data read, e.g. +SHREAD and +CIPRXGET
+        self._engine = ATEngine(self.uart, size=4096 + 64, verbose=verbose)
+
     def check_modem_is_ready(self):
         # Check if modem is ready for AT command
         at = AT_CMD("AT", "OK", 10)
@@ -149,9 +152,8 @@ class Modem(object):
     # Execute AT commands
     # ----------------------
     def execute_at_command(self, command: AT_CMD, repeat=False, clean_output=True):
-        # Clear the uart buffer
-        dummy = AT_CMD("", "", 0)
-        self.response_at_command(dummy)
+        # Dispatch or drop what is left in the uart buffer
+        self._engine.poll()
 
         # Execute the AT command
         cmdstr = "{}\r\n".format(command.command)
@@ -161,23 +163,20 @@ class Modem(object):
 
     def response_at_command(self, command: AT_CMD, repeat=False, clean_output=True):
         # Support vars
-        processed_lines = 0
         pre_end = True
         find_keyword = False
-        output = ""
+        lines = []
         error = False
         empty_reads = 0
-        in_cmd = False
-        if command.command != "":
-            command_string_for_at = "{}\r\n".format(command.command)
-            in_cmd = True
+        if command.command == "":
+            self._engine.poll()
+            return ("", False)
+        command_string_for_at = "{}\r\n".format(command.command)
 
         while True:
-            line = self.uart.readline()
+            # returns as soon as a line arrived, None after a second without
+            line = self._engine.readline(1000)
             if not line:
-                if not in_cmd:
-                    break
-                time.sleep(1)
                 if repeat:
                     self.uart.write(command_string_for_at)
                 empty_reads += 1
@@ -223,15 +222,14 @@ class Modem(object):
                 else:
                     pre_end = False
 
-                # Keep track of processed lines and stop if exceeded
-                processed_lines += 1
-
                 # Save this line unless in particular conditions
-                output += line_str
+                lines.append(line_str)
 
-                if find_keyword and self.uart.any() == 0:
+                if find_keyword and (line_str == "OK\r\n" or self._engine.any() == 0):
                     break
 
+        output = "".join(lines)
+
         # Remove the command string from the output
         output = output.replace(command.command + "\r\r\n", "")
 
@@ -255,67 +253,10 @@ class Modem(object):
     def execute_at_command2(
         self, cmd: ATCommand, repeat=False, clean_output=True, line_end="\r\n"
     ):
-        # clear the uart buffer
-        self.uart.write(b"\r\n")
-
-        # execute the AT command
-        cmdstr = "{}\r\n".format(cmd.cmd)
-        self._verbose and print("TE -> TA:", repr(cmdstr))
-        self.uart.write(cmdstr.encode("utf-8"))
+        return self._engine.execute(cmd.cmd, cmd.rsp1, cmd.rsp2, cmd.timeout, line_end)
 
-        # wait for response
-        return self.response_at_command2(cmd, repeat, clean_output, line_end)
-
-    # @utils.measure_time
     def response_at_command2(
         self, command: ATCommand, repeat=False, clean_output=True, line_end="\r\n"
     ):
-        # Support vars
-        find_keyword = False
-        output = bytearray()
-        error = self.ERR_NONE
-        rsp1 = command.rsp1.encode("utf-8")
-        rsp2 = command.rsp2.encode("utf-8")
-        line_end = line_end.encode("utf-8")
-
-        ticks = time.ticks_ms()
-        while time.ticks_diff(time.ticks_ms(), ticks) < command.timeout:
-            if self.uart.any() == 0:
-                time.sleep_ms(10)
-                continue
-
-            line = self.uart.read(self.uart.any())
-            self._verbose and print("TE <- TA:", repr(line))
-            output.extend(line)
-
-            # Do we have an error?
-            if output.rfind(rsp2) != -1:
-                if output.endswith(line_end):
-                    print("Get AT command error response:", repr(output))
-                    error = self.ERR_GENERIC
-                    find_keyword = True
-
-            # If we had a pre-end, do we have the expected end?
-            if output.rfind(rsp1) != -1:
-                if output.endswith(line_end):
-                    find_keyword = True
-
-            if find_keyword:
-                break
-
-        if time.ticks_diff(time.ticks_ms(), ticks) > command.timeout:
-            print("Timeout for command:", repr(command.cmd))
-            error = self.ERR_TIMEOUT
-
-        # Also, clean output if needed
-        # if clean_output:
-        #     output = output.replace("OK", "")
-        #     output = output.replace("\r\n", "")
-        #     output = output.replace("\r", "")
-        #     if output.startswith("\n"):
-        #         output = output[1:]
-        #     if output.endswith("\n"):
-        #         output = output[:-1]
-
-        # Return
-        return (output, error)
+        # the rest of the response of a command, e.g. after sending data
+        return self._engine.wait(command.rsp1, command.rsp2, command.timeout, line_end)
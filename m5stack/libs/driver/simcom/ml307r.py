@@ -923,39 +923,6 @@ class ML307R(umodem.UModem):
             raise SIMComError("MQTT client is not create")
 
     def write_read(self, cmd: str, rsp1="OK", rsp2="ERROR", line_end="\r\n", timeout: int = 10000):
-        cmdstr = "AT+" + "{}\r\n".format(cmd)
-        self._verbose and print("TE -> TA:", repr(cmdstr))
-        self.uart.write(cmdstr.encode("utf-8"))
-        output = bytearray()
-        ticks = time.ticks_ms()
-
-        rsp1_bytes = rsp1.encode("utf-8")
-        rsp2_bytes = rsp2.encode("utf-8")
-        line_end_bytes = line_end.encode("utf-8")
-
-        find_keyword = False
-
-        while time.ticks_diff(time.ticks_ms(), ticks) < timeout:
-            if self.uart.any() == 0:
-                time.sleep_ms(10)
-                continue
-
-            line = self.uart.read(self.uart.any())
-            self._verbose and print("TE <- TA:", repr(line))
-            output.extend(line)
-
-            # Do we have an error?
-            if output.rfind(rsp2_bytes) != -1:
-                if output.endswith(line_end_bytes):
-                    print("Get AT command error response:", repr(output))
-                    find_keyword = True
-
-            # If we had a pre-end, do we have the expected end?
-            if output.rfind(rsp1_bytes) != -1:
-                if output.endswith(line_end_bytes):
-                    find_keyword = True
-
-            if find_keyword:
-                break
-
+        # the engine keeps URCs that arrive meanwhile away from the response
+        output, _ = self._engine.execute("AT+" + cmd, rsp1, rsp2, timeout, line_end)
         return output.decode("utf-8")
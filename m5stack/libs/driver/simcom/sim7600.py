@@ -123,6 +123,7 @@ class _socket:
             "AT+CIPCLOSE={}".format(self._fd), "OK", "ERROR", self._modem._default_timeout
         )
         self._modem.execute_at_command2(close)
+        self._modem._rx_pending[self._fd] = False
         self._modem.release_fd(self._fd)
         self._fd = -1
         self._state = self._STATE_CLOSE
@@ -157,6 +158,7 @@ class _socket:
             "ERROR",
             120000,  # Maximum Response Time
         )
+        self._modem._rx_pending[self._fd] = False
         output, error = self._modem.execute_at_command2(cipstart)
         if error == self._modem.ERR_NONE:
             self._state = self._STATE_OPEN
@@ -275,52 +277,36 @@ class _socket:
         return to_send
 
     def _recv(self) -> None:
-        ciprxget = ATCommand(
-            "AT+CIPRXGET=4,{}".format(self._fd),
-            "OK",
-            "ERROR",
-            self._modem._default_timeout,
-        )
-        output, error = self._modem.execute_at_command2(ciprxget)
-        if error == self._modem.ERR_GENERIC:
-            errno = utils.extract_int(output, "+IP ERROR: ", "\r\n")
-            raise SIMComError(SIMComError.D_TCPIP_ERR_INFO, errno, ciprxget.cmd)
-        elif error == self._modem.ERR_TIMEOUT:
-            raise SIMComError(SIMComError.D_GENERIC, error, ciprxget.cmd)
-
-        to_recv = int(utils.extract_text(output, "+CIPRXGET: 4,{},".format(self._fd), "\r\n"))
-        if to_recv == 0:
+        modem = self._modem
+        if not modem._rx_pending[self._fd]:
+            # the modem reports new data with a +CIPRXGET: 1,<fd> URC
+            modem._engine.poll(10)
+            if not modem._rx_pending[self._fd]:
+                return
+
+        to_recv = 1500 - self._ringio.any()
+        if to_recv <= 0:
             return
 
-        to_recv = (1500 - self._ringio.any()) if to_recv > (1500 - self._ringio.any()) else to_recv
-
         ciprxget = ATCommand(
             "AT+CIPRXGET=2,{},{}".format(self._fd, to_recv),
             "OK",
             "ERROR",
-            self._modem._default_timeout,
+            modem._default_timeout,
         )
-        output, error = self._modem.execute_at_command2(ciprxget)
-        if error == self._modem.ERR_GENERIC:
+        # the data is passed to _on_rx_data() and written to the ring buffer
+        modem._rx_socket = self
+        try:
+            output, error = modem.execute_at_command2(ciprxget)
+        finally:
+            modem._rx_socket = None
+        if error == modem.ERR_GENERIC:
+            modem._rx_pending[self._fd] = False
             errno = utils.extract_int(output, "+IP ERROR: ", "\r\n")
             raise SIMComError(SIMComError.D_TCPIP_ERR_INFO, errno, ciprxget.cmd)
-        elif error == self._modem.ERR_TIMEOUT:
+        elif error == modem.ERR_TIMEOUT:
             raise SIMComError(SIMComError.D_GENERIC, error, ciprxget.cmd)
 
-        # prase data
-        read_len = utils.extract_text(output, "+CIPRXGET: 2,{},".format(self._fd), ",")
-        read_len = int(read_len) if read_len else 0
-        rest_len = utils.extract_text(
-            output, "+CIPRXGET: 2,{},{},".format(self._fd, read_len), "\r\n"
-        )
-        rest_len = int(rest_len) if rest_len else 0
-        fstr = utils.converter(
-            "+CIPRXGET: 2,{},{},{}\r\n".format(self._fd, read_len, rest_len), type(output)
-        )
-        start = output.find(fstr) + len(fstr)
-
-        self._ringio.write(output[start : start + read_len])
-
     def recv(self, bufsize) -> bytes | None:
         return self.recvfrom(bufsize)
 
@@ -709,6 +695,12 @@ class SIM7600(Modem):
         super().__init__(uart, pwrkey_pin, reset_pin, power_pin, tx_pin, rx_pin, verbose)
         self._default_timeout = 5000
 
+        # fd -> the modem has received data that was not read yet
+        self._rx_pending = [False] * 10
+        self._rx_socket = None
+        self._engine.urc(b"+CIPRXGET: 1,", self._on_rx_urc)
+        self._engine.urc(b"+CIPRXGET: 2,", self._on_rx_data, self._rx_data_len)
+
         # disable echo
         self.execute_at_command2(ATCommand("ATE0", "OK", "ERROR", self._default_timeout))
 
@@ -751,6 +743,23 @@ class SIM7600(Modem):
                 )
                 self._session_id[i] = -1
 
+    def _on_rx_urc(self, line):
+        # +CIPRXGET: 1,<fd>
+        self._rx_pending[int(line[13:])] = True
+
+    @staticmethod
+    def _rx_data_len(line):
+        # +CIPRXGET: 2,<fd>,<read_len>,<rest_len>
+        return int(line.split(b",")[2])
+
+    def _on_rx_data(self, line, data):
+        fields = line.split(b",")
+        fd = int(fields[1])
+        self._rx_pending[fd] = int(fields[3]) > 0
+        sock = self._rx_socket
+        if sock is not None and sock._fd == fd:
+            sock._ringio.write(data)
+
     """fd/port management"""
 
     def apply_fd(self) -> int:
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 from driver.simcom.toolkit.umqtt import robust
+from umqtt.topic import TopicTrie
 from micropython import schedule
 
 
@@ -37,28 +38,18 @@ class MQTTClient(robust.MQTTClient):
             modem, client_id, server, port, user, password, keepalive, ssl, ssl_params1
         )
         self.set_callback(self._callback)
-        self._topics = {}
+        self._topics = TopicTrie()
 
     def _callback(self, topic, msg):
-        if isinstance(topic, bytes):
-            handler = self._topics.get(topic.decode())
-            if handler is None:
-                handler = self._topics.get(topic)
-        elif isinstance(topic, str):
-            handler = self._topics.get(topic)
-            if handler is None:
-                handler = self._topics.get(topic.encode())
-
-        if handler is not None:
+        for handler in self._topics.match(topic):
             schedule(handler, (topic, msg))
 
     def subscribe(self, topic, handler, qos=0):
-        self._topics[topic] = handler
+        self._topics.add(topic, handler)
         return super().subscribe(topic, qos)
 
     def unsubscribe(self, topic):
-        if topic in self._topics:
-            del self._topics[topic]
+        self._topics.remove(topic)
         return super().unsubscribe(topic)
 
     @staticmethod
@@ -2,73 +2,45 @@
 #
 # SPDX-License-Identifier: MIT
 
-import _thread
-import time
-
-PERIODIC = 0x00
-ONE_SHOT = 0x01
+from .timer_scheduler import get_scheduler, PERIODIC, ONE_SHOT
 
 
 class SoftTimerScheduler:
+    """Compatibility wrapper, the timers run on the shared
+    :class:`driver.timer_scheduler.TimerScheduler`.
+
+    Like before, all SoftTimers share one thread, so a callback that blocks,
+    e.g. on a network request, delays the other SoftTimers. Drivers that
+    poll hardware use :class:`driver.timer_thread.TimerThread`, which has a
+    thread of its own."""
+
     _instance = None
 
     def __new__(cls, *args, **kw):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self):
-        if self._initialized:
-            return
-        self._tims = []
-        self._run = False
-        self._initialized = True
-
     def add_timer(self, tim):
-        if tim in self._tims:
-            return
-
-        self._tims.append(tim)
-        if not self._run:
-            _thread.start_new_thread(self._cb, ())
-            self._run = True
+        if tim._timer is not None and tim._timer.dead:
+            get_scheduler().schedule(tim._timer)
 
     def del_timer(self, tim):
-        while tim in self._tims:
-            time.sleep_ms(100)
-
-    def _cb(self):
-        while self._run:
-            # print("running...", self._tims)
-
-            for tim in self._tims:
-                if not tim.dead:
-                    self.update(tim)
-
-            time.sleep_ms(10)
-
-        self._wait = False
-        self._run = False
+        if tim._timer is not None:
+            tim._timer.cancel()
 
     def update(self, tim: "SoftTimer"):
-        if time.ticks_ms() > tim.next_time:
-            tim.next_time = time.ticks_ms() + tim.period
-            if tim.mode == ONE_SHOT:
-                tim.dead = True
-            if tim.callback:
-                tim.callback(tim)
+        pass
 
     def deinit(self, tim: "SoftTimer"):
-        self._wait = True
-        self._run = False
-        while self._wait:
-            time.sleep_ms(100)
+        self.del_timer(tim)
 
 
 class SoftTimer:
-    PERIODIC = 0x00
-    ONE_SHOT = 0x01
+    PERIODIC = PERIODIC
+    ONE_SHOT = ONE_SHOT
+
+    _timer = None
 
     def __init__(self, mode=PERIODIC, period=-1, callback=None):
         if period < 10:
@@ -76,13 +48,25 @@ class SoftTimer:
         self.init(mode, period, callback)
 
     def init(self, mode=PERIODIC, period=-1, callback=None):
-        # SoftTimerScheduler().del_timer(self)
+        if self._timer is not None:
+            self._timer.cancel()
         self.callback = callback
-        self.next_time = time.ticks_ms() + period
         self.period = period
         self.mode = mode
-        self.dead = False
-        SoftTimerScheduler().add_timer(self)
+        self._timer = get_scheduler().add(period, self._fire, mode)
+
+    def _fire(self, _):
+        if self.callback:
+            self.callback(self)
+
+    @property
+    def next_time(self):
+        return self._timer.deadline
+
+    @property
+    def dead(self):
+        return self._timer is None or self._timer.dead
 
     def deinit(self):
-        self.dead = True
+        if self._timer is not None:
+            self._timer.cancel()
@@ -0,0 +1,255 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+import _thread
+import time
+
+PERIODIC = 0x00
+ONE_SHOT = 0x01
+
+
+class Timer:
+    """A timer of a :class:`TimerScheduler`, returned by
+    :meth:`TimerScheduler.add`."""
+
+    PERIODIC = PERIODIC
+    ONE_SHOT = ONE_SHOT
+
+    def __init__(self, scheduler, period, mode, callback):
+        self._scheduler = scheduler
+        self.period = period
+        self.mode = mode
+        self.callback = callback
+        self.deadline = time.ticks_add(time.ticks_ms(), period)
+        # position in the heap, -1 when not scheduled
+        self._index = -1
+
+    @property
+    def dead(self):
+        return self._index < 0
+
+    def cancel(self):
+        """Stop the timer. Does nothing if the timer already stopped."""
+        self._scheduler.cancel(self)
+
+    deinit = cancel
+
+
+class TimerScheduler:
+    """Run the callbacks of many software timers from one thread or asyncio
+    task.
+
+    The timers are kept in a min-heap ordered by deadline, so adding and
+    cancelling a timer takes O(log n) and the scheduler only looks at the
+    earliest deadline. Deadlines are compared with ``time.ticks_diff()``,
+    which handles the wraparound of ``time.ticks_ms()``.
+
+    With the ``"thread"`` backend the callbacks run in a thread that blocks
+    while there are no timers and otherwise sleeps until the next deadline,
+    but no longer than ``resolution`` milliseconds at a time, because a
+    timer added from another thread can't wake it up earlier. With the
+    ``"asyncio"`` backend the callbacks run in an asyncio task that sleeps
+    exactly until the next deadline, and callbacks can be coroutine
+    functions; timers must then be added from the event loop.
+
+    :param str backend: ``"thread"`` or ``"asyncio"``.
+    :param int resolution: longest sleep of the thread backend in
+                           milliseconds.
+
+    MicroPython Code Block:
+
+        .. code-block:: python
+
+            from driver.timer_scheduler import TimerScheduler, PERIODIC
+
+            scheduler = TimerScheduler()
+            tim = scheduler.add(500, lambda t: print("tick"), PERIODIC)
+            ...
+            tim.cancel()
+    """
+
+    def __init__(self, backend="thread", resolution=10):
+        if backend not in ("thread", "asyncio"):
+            raise ValueError("backend must be 'thread' or 'asyncio'")
+        self.backend = backend
+        self.resolution = resolution
+        self._heap = []
+        self._lock = _thread.allocate_lock()
+        # the thread waits on it while there are no timers
+        self._wake = _thread.allocate_lock()
+        self._wake.acquire()
+        self._idle = False
+        self._running = False
+        self._event = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, period, callback, mode=PERIODIC):
+        """Start a timer.
+
+        :param int period: the period in milliseconds.
+        :param callback: the function called with the timer as argument.
+        :param int mode: ``PERIODIC`` or ``ONE_SHOT``.
+        :return: the timer.
+        :rtype: Timer
+        """
+        tim = Timer(self, period, mode, callback)
+        self.schedule(tim)
+        return tim
+
+    def schedule(self, tim):
+        """Start a timer again, or move it to ``tim.deadline``."""
+        with self._lock:
+            if tim._index >= 0:
+                self._remove(tim._index)
+            heap = self._heap
+            tim._index = len(heap)
+            heap.append(tim)
+            self._sift_up(tim._index)
+            first = heap[0] is tim
+            wake = self._idle
+            self._idle = False
+            # checked under the lock, so that only one runner is started
+            start = not self._running
+            self._running = True
+        if wake:
+            self._wake.release()
+        if start:
+            self._start()
+        elif first and self._event is not None:
+            self._event.set()
+
+    def cancel(self, tim):
+        """Stop a timer.
+
+        :param Timer tim: the timer.
+        """
+        with self._lock:
+            if tim._index >= 0:
+                self._remove(tim._index)
+
+    def _start(self):
+        if self.backend == "thread":
+            _thread.start_new_thread(self._run_thread, ())
+        else:
+            import asyncio
+
+            self._event = asyncio.Event()
+            asyncio.create_task(self._run_async())
+
+    def _remove(self, i):
+        heap = self._heap
+        tim = heap[i]
+        tim._index = -1
+        last = heap.pop()
+        if last is not tim:
+            heap[i] = last
+            last._index = i
+            self._sift_up(i)
+            self._sift_down(last._index)
+
+    def _sift_up(self, i):
+        heap = self._heap
+        tim = heap[i]
+        while i:
+            parent = (i - 1) >> 1
+            if time.ticks_diff(tim.deadline, heap[parent].deadline) >= 0:
+                break
+            heap[i] = heap[parent]
+            heap[i]._index = i
+            i = parent
+        heap[i] = tim
+        tim._index = i
+
+    def _sift_down(self, i):
+        heap = self._heap
+        n = len(heap)
+        tim = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if (
+                child + 1 < n
+                and time.ticks_diff(heap[child + 1].deadline, heap[child].deadline) < 0
+            ):
+                child += 1
+            if time.ticks_diff(heap[child].deadline, tim.deadline) >= 0:
+                break
+            heap[i] = heap[child]
+            heap[i]._index = i
+            i = child
+        heap[i] = tim
+        tim._index = i
+
+    def _next(self):
+        # returns (timer to run now or None, ms until the next deadline)
+        with self._lock:
+            heap = self._heap
+            if not heap:
+                self._idle = self.backend == "thread"
+                return None, -1
+            tim = heap[0]
+            now = time.ticks_ms()
+            delay = time.ticks_diff(tim.deadline, now)
+            if delay > 0:
+                return None, delay
+            if tim.mode == ONE_SHOT:
+                self._remove(0)
+            else:
+                tim.deadline = time.ticks_add(tim.deadline, tim.period)
+                if time.ticks_diff(tim.deadline, now) <= 0:
+                    # too late for a period, don't fire several times in a row
+                    tim.deadline = time.ticks_add(now, tim.period)
+                self._sift_down(0)
+            return tim, 0
+
+    def _run_thread(self):
+        while True:
+            tim, delay = self._next()
+            if tim is not None:
+                try:
+                    tim.callback(tim)
+                except Exception as e:
+                    print("timer callback error:", e)
+            elif delay < 0:
+                self._wake.acquire()
+            else:
+                time.sleep_ms(min(delay, self.resolution))
+
+    async def _run_async(self):
+        import asyncio
+
+        while True:
+            tim, delay = self._next()
+            if tim is not None:
+                try:
+                    ret = tim.callback(tim)
+                    if hasattr(ret, "send"):
+                        asyncio.create_task(ret)
+                except Exception as e:
+                    print("timer callback error:", e)
+                continue
+            self._event.clear()
+            if delay < 0:
+                await self._event.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._event.wait(), delay / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+
+_default = None
+
+
+def get_scheduler():
+    """Return the scheduler with the thread backend that is shared by the
+    :class:`driver.soft_timer.SoftTimer` timers. Its callbacks run one after
+    the other, so they must not block."""
+    global _default
+    if _default is None:
+        _default = TimerScheduler()
+    return _default
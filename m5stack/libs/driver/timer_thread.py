@@ -2,73 +2,34 @@
 #
 # SPDX-License-Identifier: MIT
 
-import _thread
-import time
+from .timer_scheduler import TimerScheduler, Timer, PERIODIC, ONE_SHOT
 
-PERIODIC = 0x00
-ONE_SHOT = 0x01
 
+class TimerThread:
+    """Compatibility wrapper, the timers run on a
+    :class:`driver.timer_scheduler.TimerScheduler` of their own. Like
+    before, every TimerThread has its own thread, so a callback that blocks
+    doesn't delay the timers of other drivers."""
+
+    PERIODIC = PERIODIC
+    ONE_SHOT = ONE_SHOT
 
-class Timer:
-    PERIODIC = 0x00
-    ONE_SHOT = 0x01
+    def __init__(self):
+        self._scheduler = None
 
-    def __init__(self, period, mode, callback):
-        self.callback = callback
-        self.nextTime = time.ticks_ms() + period
-        self.period = period
-        self.mode = mode
-        self.dead = False
+    def check_init(self):
+        if self._scheduler is None:
+            self._scheduler = TimerScheduler()
 
-    def update(self):
-        if time.ticks_ms() > self.nextTime:
-            self.nextTime = time.ticks_ms() + self.period
+    def add_timer(self, period, mode, callback) -> Timer:
+        def fire(_):
             try:
-                self.callback()
+                callback()
             except:
                 pass
-            if self.mode == Timer.ONE_SHOT:
-                self.dead = True
-
-    def deinit(self):
-        self.dead = True
-
-
-delete_num = []
 
-
-class TimerThread:
-    PERIODIC = 0x00
-    ONE_SHOT = 0x01
-
-    def __init__(self):
-        self.timerList = []
-        self._thread_run = False
-
-    def check_init(self):
-        if not self._thread_run:
-            self._thread_run = True
-            _thread.start_new_thread(self.time_cb, ())
-
-    def add_timer(self, period, mode, callback):
         self.check_init()
-        timer = Timer(period, mode, callback)
-        self.timerList.append(timer)
-        return timer
-
-    def time_cb(self):
-        global delete_num
-        while True:
-            for i in self.timerList:
-                if i.dead:
-                    delete_num.append(i)
-                else:
-                    i.update()
-            if delete_num:
-                for i in delete_num:
-                    self.timerList.remove(i)
-                delete_num = []
-            time.sleep_ms(10)
+        return self._scheduler.add(period, fire, mode)
 
     def deinit(self):
         pass
@@ -0,0 +1,199 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+import time
+
+
+class ATEngine:
+    """Line based AT command engine shared by the modem drivers.
+
+    Everything the modem sends is read from the UART into one receive
+    buffer and split into lines as it arrives. Lines that start with a
+    registered prefix, such as the URC ``+CIPRXGET: 1,<fd>``, are handed to
+    their handler whenever they show up, also in the middle of the response
+    to another command. A command completes as soon as its final result
+    line was received.
+
+    :param uart: the UART of the modem.
+    :param int size: size of the receive buffer in bytes, the longest line
+                     or payload should fit in it.
+    :param bool verbose: print the traffic.
+    """
+
+    ERR_NONE = 0
+    ERR_GENERIC = 1
+    ERR_TIMEOUT = 2
+
+    def __init__(self, uart, size=2048, verbose=False):
+        self.uart = uart
+        self._verbose = verbose
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        # unparsed data is self._buf[self._start:self._end]
+        self._start = 0
+        self._end = 0
+        # [(prefix, handler, length), ...]
+        self._urcs = []
+
+    def urc(self, prefix, handler, length=None) -> None:
+        """Register the handler of the lines that start with ``prefix``.
+
+        The handler is called with the line. If ``length`` is given, it is
+        called with the line and returns the number of bytes of binary data
+        that follow the line, and the handler is called with the line and
+        the data.
+
+        :param bytes prefix: the start of the line.
+        :param handler: the function called for the line.
+        :param length: None, or a function that returns the length of the
+                       data that follows the line.
+        """
+        self._urcs.append((prefix, handler, length))
+
+    def any(self) -> int:
+        """Return the number of received bytes that were not parsed yet."""
+        return self._end - self._start + self.uart.any()
+
+    def _fill(self) -> int:
+        n = self.uart.any()
+        if not n:
+            return 0
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif self._end == len(self._buf):
+            # move the unparsed data to the front
+            size = self._end - self._start
+            self._buf[:size] = self._buf[self._start : self._end]
+            self._start = 0
+            self._end = size
+        n = min(n, len(self._buf) - self._end)
+        if not n:
+            # drop the line that doesn't fit, so the next commands still work
+            self._start = self._end = 0
+            raise OSError("AT receive buffer overflow")
+        n = self.uart.readinto(self._mv[self._end : self._end + n]) or 0
+        self._verbose and print("TE <- TA:", repr(bytes(self._mv[self._end : self._end + n])))
+        self._end += n
+        return n
+
+    def _line(self):
+        # the next complete line, None if there is none yet
+        i = self._buf.find(b"\n", self._start, self._end)
+        if i < 0:
+            return None
+        line = bytes(self._mv[self._start : i + 1])
+        self._start = i + 1
+        return line
+
+    def read(self, n, timeout=1000) -> bytes:
+        """Read ``n`` bytes of binary data.
+
+        :param int n: the number of bytes.
+        :param int timeout: timeout in milliseconds.
+        """
+        ticks = time.ticks_ms()
+        while self._end - self._start < n:
+            if not self._fill():
+                if time.ticks_diff(time.ticks_ms(), ticks) > timeout:
+                    raise OSError("AT data timeout")
+                time.sleep_ms(1)
+        data = bytes(self._mv[self._start : self._start + n])
+        self._start += n
+        return data
+
+    def _dispatch(self, line) -> bool:
+        for prefix, handler, length in self._urcs:
+            if line.startswith(prefix):
+                if length is None:
+                    handler(line)
+                else:
+                    handler(line, self.read(length(line)))
+                return True
+        return False
+
+    def readline(self, timeout=0):
+        """Return the next line that is not handled by a registered handler.
+
+        :param int timeout: time to wait for a line in milliseconds.
+        :return: the line with its line break, None on timeout.
+        """
+        ticks = time.ticks_ms()
+        while True:
+            line = self._line()
+            if line is not None:
+                if not self._dispatch(line):
+                    return line
+                continue
+            if not self._fill():
+                if time.ticks_diff(time.ticks_ms(), ticks) >= timeout:
+                    return None
+                time.sleep_ms(1)
+
+    def poll(self, timeout=0) -> None:
+        """Dispatch the received lines to their handlers and drop the other
+        lines, e.g. the rest of a response that timed out.
+
+        :param int timeout: time to wait for a line in milliseconds.
+        """
+        line = self.readline(timeout)
+        while line is not None:
+            self._verbose and print("AT dropped:", repr(line))
+            line = self.readline()
+
+    def execute(self, cmd, rsp1="OK", rsp2="ERROR", timeout=5000, line_end="\r\n"):
+        """Send a command and wait for its response, see :meth:`wait`.
+
+        :param cmd: the command, without line break.
+        """
+        self.poll()
+        if isinstance(cmd, str):
+            cmd = cmd.encode()
+        self._verbose and print("TE -> TA:", repr(cmd))
+        self.uart.write(cmd + b"\r\n")
+        return self.wait(rsp1, rsp2, timeout, line_end)
+
+    def wait(self, rsp1="OK", rsp2="ERROR", timeout=5000, line_end="\r\n"):
+        """Collect the response lines until a line contains ``rsp1`` or
+        ``rsp2``.
+
+        :param str rsp1: the text of the final line of a success.
+        :param str rsp2: the text of the final line of an error.
+        :param int timeout: timeout in milliseconds.
+        :param str line_end: empty to also look for ``rsp1`` in data that is
+                             not terminated by a line break, e.g. the ``>``
+                             prompt.
+        :return: the response and ``ERR_NONE``, ``ERR_GENERIC`` or
+                 ``ERR_TIMEOUT``.
+        :rtype: (bytearray, int)
+        """
+        rsp1 = rsp1.encode() if isinstance(rsp1, str) else rsp1
+        rsp2 = rsp2.encode() if isinstance(rsp2, str) else rsp2
+        output = bytearray()
+        ticks = time.ticks_ms()
+        while True:
+            line = self._line()
+            if line is not None:
+                if self._dispatch(line):
+                    continue
+                output.extend(line)
+                if rsp2 and rsp2 in line:
+                    print("Get AT command error response:", repr(output))
+                    return output, self.ERR_GENERIC
+                if rsp1 in line:
+                    return output, self.ERR_NONE
+                continue
+            if not line_end and self._buf.find(rsp1, self._start, self._end) >= 0:
+                output.extend(self._mv[self._start : self._end])
+                self._start = self._end
+                return output, self.ERR_NONE
+            if self._start == 0 and self._end == len(self._buf):
+                # a line longer than the buffer, e.g. binary data, goes to the
+                # response in pieces
+                output.extend(self._buf)
+                self._end = 0
+            if not self._fill():
+                if time.ticks_diff(time.ticks_ms(), ticks) >= timeout:
+                    print("Timeout for command, response:", repr(output))
+                    return output, self.ERR_TIMEOUT
+                time.sleep_ms(1)
@@ -4,6 +4,7 @@
 
 import time
 import machine
+from .engine import ATEngine
 
 
 def _measure_time(func):
@@ -66,71 +67,21 @@ class UModem:
     def __init__(self, uart: machine.UART, verbose=False):
         self.uart = uart
         self._verbose = verbose
+        # room for the largest data read, e.g. 4095 bytes of +MIPRD
+        self._engine = ATEngine(uart, size=4096 + 64, verbose=verbose)
 
     def execute(self, command: Command, repeat: bool = False, line_end: str = "\r\n") -> Response:
-        # clear the uart buffer
-        if self.uart.any():
-            self.uart.read(self.uart.any())
-
-        # execute the AT command
-        self._log("TE -> TA:", repr(command()))
-        self.uart.write(command())
-
-        # wait for response
-        return self.response_at_command2(command, repeat, line_end=line_end)
+        # the engine dispatches or drops what is left in the uart buffer first
+        output, error = self._engine.execute(
+            command()[:-2], command.rsp1, command.rsp2, command.timeout, line_end
+        )
+        return Response(error, output)
 
-    @_measure_time
     def response_at_command2(
         self, command: Command, repeat: bool = False, clean_output: bool = True, line_end="\r\n"
     ) -> Response:
-        # Support vars
-        find_keyword = False
-        output = bytearray()
-        error = Response.ERR_NONE
-        rsp1 = command.rsp1.encode("utf-8")
-        rsp2 = command.rsp2.encode("utf-8")
-        line_end = line_end.encode("utf-8")
-
-        ticks = time.ticks_ms()
-        while time.ticks_diff(time.ticks_ms(), ticks) < command.timeout:
-            if self.uart.any() == 0:
-                time.sleep_ms(10)
-                continue
-
-            line = self.uart.read(self.uart.any())
-            self._log("TE <- TA:", repr(line))
-            output.extend(line)
-
-            # Do we have an error?
-            if output.rfind(rsp2) != -1:
-                if output.endswith(line_end):
-                    print("Get AT command error response:", repr(output))
-                    error = Response.ERR_GENERIC
-                    find_keyword = True
-
-            # If we had a pre-end, do we have the expected end?
-            if output.rfind(rsp1) != -1:
-                if output.endswith(line_end):
-                    find_keyword = True
-
-            if find_keyword:
-                break
-
-        if time.ticks_diff(time.ticks_ms(), ticks) > command.timeout:
-            print("Timeout for command:", repr(command.cmd))
-            error = Response.ERR_TIMEOUT
-
-        # Also, clean output if needed
-        # if clean_output:
-        #     output = output.replace("OK", "")
-        #     output = output.replace("\r\n", "")
-        #     output = output.replace("\r", "")
-        #     if output.startswith("\n"):
-        #         output = output[1:]
-        #     if output.endswith("\n"):
-        #         output = output[:-1]
-
-        # Return
+        # the rest of the response of a command, e.g. after sending data
+        output, error = self._engine.wait(command.rsp1, command.rsp2, command.timeout, line_end)
         return Response(error, output)
 
     def _log(self, *args, **kwargs) -> None:
@@ -102,7 +102,11 @@ class EzData:
         headers["Content-Type"] = str(form.content_type())
         url = "{0}/{1}/uploadFile".format(_server, self._device_token)
         try:
-            rsp = requests.post(url, headers=headers, data=form.content())
+            import requests2
+
+            # the files are read while the body is sent
+            with form.body() as body:
+                rsp = requests2.post(url, headers=headers, data=body)
             if rsp.status_code == 200:
                 rsp_data = json.loads(rsp.text)
                 rsp.close()
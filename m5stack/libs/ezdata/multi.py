@@ -24,15 +24,12 @@ class MultiPartForm:
             mimetype = "application/octet-stream"
         self.files.append((field, filename, mimetype, file_size))
 
-    def content_length(self):
-        res = 0
+    def _parts(self):
+        # the body as a list of bytes and (filename, file_size) items
+        parts = []
         part_boundary = ("--" + self.boundary).encode()
         needs_clrf = False
         for name, value in self.fields:
-            if needs_clrf:
-                res += len(b"\r\n")
-            needs_clrf = True
-
             block = [
                 part_boundary,
                 ('Content-Disposition: form-data; name="%s"' % name).encode(),
@@ -40,13 +37,10 @@ class MultiPartForm:
                 b"",
                 value.encode(),
             ]
-            res += len(b"\r\n".join(block))
-
-        for field, filename, content_type, file_size in self.files:
-            if needs_clrf:
-                res += len(b"\r\n")
+            parts.append((b"\r\n" if needs_clrf else b"") + b"\r\n".join(block))
             needs_clrf = True
 
+        for field, filename, content_type, file_size in self.files:
             block = [
                 part_boundary,
                 (
@@ -54,57 +48,122 @@ class MultiPartForm:
                 ).encode(),
                 ("Content-Type: %s" % content_type).encode(),
                 b"",
-            ]
-
-            res += len(b"\r\n".join(block))
-            res += len(b"\r\n")
-            res += file_size
-        res += len("\r\n--" + self.boundary + "--\r\n")
-        return res
-
-    def content(self):
-        data = b""
-        part_boundary = ("--" + self.boundary).encode()
-
-        needs_clrf = False
-        for name, value in self.fields:
-            if needs_clrf:
-                data += b"\r\n"
-            needs_clrf = True
-
-            block = [
-                part_boundary,
-                ('Content-Disposition: form-data; name="%s"' % name).encode(),
-                b"Content-Type: multipart/form-data",
                 b"",
-                value.encode(),
             ]
-
-            data += b"\r\n".join(block)
-
-        for field, filename, content_type, _ in self.files:
-            if needs_clrf:
-                data += b"\r\n"
+            parts.append((b"\r\n" if needs_clrf else b"") + b"\r\n".join(block))
+            parts.append((filename, file_size))
             needs_clrf = True
+        parts.append(("\r\n--" + self.boundary + "--\r\n").encode())
+        return parts
 
-            block = [
-                part_boundary,
-                (
-                    'Content-Disposition: form-data; name="%s"; filename="%s"' % (field, filename)
-                ).encode(),
-                ("Content-Type: %s" % content_type).encode(),
-                b"",
-            ]
+    def content_length(self):
+        res = 0
+        for part in self._parts():
+            res += part[1] if isinstance(part, tuple) else len(part)
+        return res
 
-            data += b"\r\n".join(block)
-            data += b"\r\n"
+    def body(self):
+        """Get the body as a file like object that reads the files while it
+        is sent, so the body is never held in memory.
 
-            with open(filename, "rb") as f:
-                while True:
-                    ch = f.read(1024)
-                    if not ch:
-                        break
-                    data += ch
+        :return: the body, ``len()`` of it is :meth:`content_length`.
+        :rtype: MultiPartBody
+        """
+        return MultiPartBody(self._parts())
 
-        data += ("\r\n--" + self.boundary + "--\r\n").encode()
+    def content(self):
+        """Get the whole body, see :meth:`body` to send it without holding
+        it in memory.
+
+        :return: the body.
+        :rtype: bytearray
+        """
+        with self.body() as body:
+            data = bytearray(len(body))
+            body.readinto(data)
         return data
+
+
+class MultiPartBody:
+    """Reader of the body of a :class:`MultiPartForm`, returned by
+    :meth:`MultiPartForm.body`.
+
+    The files are opened one at a time and read straight into the buffer
+    passed to :meth:`readinto`. ``requests2`` sends it with a Content-Length
+    header, and rewinds it with ``seek()`` to send it again.
+    """
+
+    def __init__(self, parts):
+        self._parts = parts
+        self._length = 0
+        for part in parts:
+            self._length += part[1] if isinstance(part, tuple) else len(part)
+        self._file = None
+        self.seek(0)
+
+    def __len__(self):
+        return self._length
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += self._length
+        self.close()
+        self._pos = max(0, min(offset, self._length))
+        # find the part at the position
+        self._index = 0
+        self._offset = self._pos
+        for part in self._parts:
+            size = part[1] if isinstance(part, tuple) else len(part)
+            if self._offset < size:
+                break
+            self._offset -= size
+            self._index += 1
+        return self._pos
+
+    def readinto(self, buf):
+        mv = memoryview(buf)
+        n = 0
+        while n < len(mv) and self._index < len(self._parts):
+            part = self._parts[self._index]
+            if isinstance(part, tuple):
+                if self._file is None:
+                    self._file = open(part[0], "rb")
+                    self._file.seek(self._offset)
+                r = self._file.readinto(mv[n : n + part[1] - self._offset])
+                if not r:
+                    raise OSError("file %s changed size" % part[0])
+                size = part[1]
+            else:
+                size = len(part)
+                r = min(len(mv) - n, size - self._offset)
+                mv[n : n + r] = part[self._offset : self._offset + r]
+            n += r
+            self._offset += r
+            if self._offset == size:
+                self.close()
+                self._index += 1
+                self._offset = 0
+        self._pos += n
+        return n
+
+    def read(self, n=-1):
+        if n < 0:
+            n = self._length - self._pos
+        buf = bytearray(min(n, self._length - self._pos))
+        return bytes(memoryview(buf)[: self.readinto(buf)])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -6,6 +6,7 @@ from microdot.microdot import (
     redirect,
     send_file,
     URLPattern,
+    StaticFiles,
     AsyncBytesIO,
     iscoroutine,
 )  # noqa: F401
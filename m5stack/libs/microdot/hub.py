@@ -0,0 +1,209 @@
+import asyncio
+import json
+from microdot import Response
+from microdot.microdot import MUTED_SOCKET_ERRORS
+from microdot.sse import sse_event
+from microdot.websocket import WebSocket, WebSocketError, websocket_upgrade
+
+
+class Message:
+    """A message published to a :class:`Hub`.
+
+    The data is serialized once when the message is created, and the SSE and
+    WebSocket frames are built the first time a client of that kind needs
+    them, so the cost of a message does not grow with the number of clients.
+
+    :param data: The message data. Dictionaries and lists are serialized to
+                 JSON and bytes are sent as binary WebSocket messages.
+    :param event: An optional SSE event name.
+    """
+
+    def __init__(self, data, event=None):
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+        self.binary = isinstance(data, (bytes, bytearray))
+        if not self.binary:
+            data = str(data).encode()
+        self.data = data
+        self.event = event
+        self._sse = None
+        self._ws = None
+
+    def sse(self):
+        """Return the message encoded as a Server-Sent Event."""
+        if self._sse is None:
+            self._sse = sse_event(self.data, self.event)
+        return self._sse
+
+    def websocket(self):
+        """Return the message encoded as a WebSocket frame."""
+        if self._ws is None:
+            self._ws = bytes(
+                WebSocket._encode_websocket_frame(
+                    self.data, WebSocket.BINARY if self.binary else WebSocket.TEXT
+                )
+            )
+        return self._ws
+
+
+class Subscriber:
+    """A client of a :class:`Hub` with its queue of pending messages.
+
+    When the queue is full the oldest message is dropped, so a slow client
+    skips frames instead of holding memory or delaying the other clients.
+
+    :param hub: The hub.
+    :param maxlen: The maximum number of queued messages.
+    """
+
+    def __init__(self, hub, maxlen):
+        self.hub = hub
+        self.maxlen = maxlen
+        self.queue = []
+        self.event = asyncio.Event()
+        #: The number of messages dropped because the queue was full.
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, message):
+        self.queue.append(message)
+        if len(self.queue) > self.maxlen:
+            self.queue.pop(0)
+            self.dropped += 1
+        self.event.set()
+
+    async def get(self):
+        """Wait for the next message.
+
+        Returns ``None`` once the subscriber is closed.
+        """
+        while not self.queue:
+            if self.closed:
+                return None
+            self.event.clear()
+            await self.event.wait()
+        return self.queue.pop(0)
+
+    def close(self):
+        """Stop receiving messages."""
+        self.closed = True
+        if self in self.hub.subscribers:
+            self.hub.subscribers.remove(self)
+        self.event.set()
+
+
+class Hub:
+    """A broadcast hub that sends every published message to all its
+    Server-Sent Events and WebSocket clients.
+
+    :param maxlen: The maximum number of messages queued per client. Older
+                   messages are dropped for clients that are not keeping up.
+
+    Example::
+
+        from microdot import Microdot
+        from microdot.hub import Hub
+
+        app = Microdot()
+        hub = Hub()
+
+        app.route('/events')(hub.sse)
+        app.route('/ws')(hub.websocket)
+
+        async def sensor_task():
+            while True:
+                hub.publish({'temperature': read_temperature()})
+                await asyncio.sleep(1)
+    """
+
+    def __init__(self, maxlen=8):
+        self.maxlen = maxlen
+        self.subscribers = []
+
+    def subscribe(self, maxlen=None):
+        """Add a subscriber.
+
+        :param maxlen: The maximum number of queued messages. If omitted, the
+                       ``maxlen`` of the hub is used.
+        """
+        subscriber = Subscriber(self, maxlen or self.maxlen)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def publish(self, data, event=None):
+        """Send a message to all the subscribers.
+
+        :param data: The message data, given as a string, bytes, dict or
+                     list.
+        :param event: An optional event name for SSE clients.
+
+        This method does not block, messages are written to the clients by
+        their own tasks. Returns the :class:`Message` object.
+        """
+        message = Message(data, event)
+        for subscriber in self.subscribers:
+            subscriber.put(message)
+        return message
+
+    def close(self):
+        """Close all the subscribers, which ends their connections once the
+        queued messages are sent."""
+        for subscriber in self.subscribers[:]:
+            subscriber.close()
+
+    async def sse(self, request):
+        """A route handler that streams the hub's messages as Server-Sent
+        Events."""
+        subscriber = self.subscribe()
+
+        class sse_loop:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                message = await subscriber.get()
+                if message is None:
+                    raise StopAsyncIteration
+                return message.sse()
+
+            async def aclose(self):
+                subscriber.close()
+
+        return sse_loop(), 200, {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+
+    async def websocket(self, request):
+        """A route handler that upgrades the connection to a WebSocket and
+        sends the hub's messages to it.
+
+        Messages sent by the client are discarded.
+        """
+        ws = await websocket_upgrade(request)
+        subscriber = self.subscribe()
+
+        async def receive():
+            # answer pings and notice when the client goes away
+            try:
+                while True:
+                    await ws.receive()
+            except (OSError, WebSocketError, EOFError):
+                pass
+            subscriber.close()
+
+        task = asyncio.create_task(receive())
+        try:
+            while True:
+                message = await subscriber.get()
+                if message is None:
+                    break
+                await request.sock[1].awrite(message.websocket())
+        except OSError as exc:
+            if exc.errno not in MUTED_SOCKET_ERRORS:  # pragma: no cover
+                raise
+        finally:
+            subscriber.close()
+            task.cancel()
+            try:
+                await ws.close()
+            except Exception:  # pragma: no cover
+                pass
+        return Response.already_handled
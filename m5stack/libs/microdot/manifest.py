@@ -6,7 +6,12 @@ package(
     "microdot",
     (
         "__init__.py",
+        "helpers.py",
+        "hub.py",
         "microdot.py",
+        "multipart.py",
+        "sse.py",
+        "websocket.py",
     ),
     base_path="..",
     opt=0,
@@ -5,8 +5,10 @@ microdot
 The ``microdot`` module defines a few classes that help implement HTTP-based
 servers for MicroPython and standard Python.
 """
+
 import asyncio
 import io
+import os
 import re
 import time
 
@@ -616,6 +618,15 @@ class Response:
             # this applies to bytes, file-like objects or generators
             self.body = body
         self.is_head = False
+        #: The HTTP version of the status line, set to ``'1.1'`` by the
+        #: server when the client speaks HTTP/1.1.
+        self.http_version = "1.0"
+        #: Whether the body is sent with chunked transfer encoding, set by
+        #: the server for streamed bodies on persistent connections.
+        self.chunked = False
+        #: Buffer that file bodies are read into, set by the server to one
+        #: buffer shared by all the responses of a connection.
+        self.buffer = None
 
     def set_cookie(
         self,
@@ -699,8 +710,8 @@ class Response:
                 else ("OK" if self.status_code == 200 else "N/A")
             )
             await stream.awrite(
-                "HTTP/1.0 {status_code} {reason}\r\n".format(
-                    status_code=self.status_code, reason=reason
+                "HTTP/{version} {status_code} {reason}\r\n".format(
+                    version=self.http_version, status_code=self.status_code, reason=reason
                 ).encode()
             )
 
@@ -719,6 +730,11 @@ class Response:
                 async for body in iter:
                     if isinstance(body, str):  # pragma: no cover
                         body = body.encode()
+                    if self.chunked:
+                        if not body:
+                            # an empty chunk would end the body
+                            continue
+                        body = "{:x}\r\n".format(len(body)).encode() + body + b"\r\n"
                     try:
                         await stream.awrite(body)
                     except OSError as exc:  # pragma: no cover
@@ -728,6 +744,8 @@ class Response:
                         raise
                 if hasattr(iter, "aclose"):  # pragma: no branch
                     await iter.aclose()
+                if self.chunked:
+                    await stream.awrite(b"0\r\n\r\n")
 
         except OSError as exc:  # pragma: no cover
             if exc.errno in MUTED_SOCKET_ERRORS or exc.args[0] == "Connection lost":
@@ -774,6 +792,14 @@ class Response:
                     except StopIteration:
                         await self.aclose()
                         raise StopAsyncIteration
+                buf = response.buffer
+                if buf is not None and hasattr(response.body, "readinto"):
+                    # fill the connection's buffer instead of allocating a
+                    # new one for every chunk
+                    n = response.body.readinto(buf)
+                    if n < len(buf):
+                        self.i = self.ITER_NO_BODY
+                    return memoryview(buf)[:n]
                 buf = response.body.read(response.send_file_buffer_size)
                 if iscoroutine(buf):  # pragma: no cover
                     buf = await buf
@@ -866,6 +892,210 @@ class Response:
         return cls(body=f, status_code=status_code, headers=headers)
 
 
+class FileRange:
+    """A file-like object that reads a byte range of an open file.
+
+    :param f: The open file, positioned at the start of the range.
+    :param length: The number of bytes to read.
+    """
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        buf = self.f.read(size)
+        self.remaining -= len(buf)
+        return buf
+
+    def readinto(self, buf):
+        if len(buf) > self.remaining:
+            buf = memoryview(buf)[: self.remaining]
+        n = self.f.readinto(buf) if self.remaining else 0
+        self.remaining -= n
+        return n
+
+    def close(self):
+        self.f.close()
+
+
+class StaticFiles:
+    """A request handler that serves the files of a directory.
+
+    Responses carry ``ETag`` and ``Last-Modified`` headers derived from
+    ``os.stat()``, conditional requests are answered with a 304 status code
+    and single ``Range`` requests with a 206 status code. When the client
+    accepts gzip and a file with an additional ``.gz`` extension exists, the
+    compressed file is sent instead.
+
+    :param directory: The directory with the files.
+    :param max_age: The ``Cache-Control`` header's ``max-age`` value in
+                    seconds. If omitted, the value of the
+                    :attr:`Response.default_send_file_max_age` attribute is
+                    used.
+    :param index: The file sent for paths that end with a slash.
+
+    Applications normally use :meth:`Microdot.static` instead of creating
+    instances of this class directly.
+    """
+
+    #: The maximum number of files whose validators are cached.
+    cache_size = 32
+
+    def __init__(self, directory, max_age=None, index="index.html"):
+        self.directory = directory.rstrip("/")
+        self.max_age = max_age
+        self.index = index
+        self.cache = {}
+
+    @staticmethod
+    def http_date(t):
+        t = time.gmtime(t)
+        return "{}, {:02d} {} {:04d} {:02d}:{:02d}:{:02d} GMT".format(
+            ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")[t[6]],
+            t[2],
+            (
+                "Jan",
+                "Feb",
+                "Mar",
+                "Apr",
+                "May",
+                "Jun",
+                "Jul",
+                "Aug",
+                "Sep",
+                "Oct",
+                "Nov",
+                "Dec",
+            )[t[1] - 1],
+            t[0],
+            t[3],
+            t[4],
+            t[5],
+        )
+
+    def file_info(self, filename):
+        """Return the size, ETag and Last-Modified values of a file, or
+        ``None`` if it is not a regular file.
+
+        :param filename: The path of the file.
+        """
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        if st[0] & 0x4000:  # directory
+            return None
+        size, mtime = st[6], int(st[8])
+        info = self.cache.get(filename)
+        if info is None or info[0] != size or info[3] != mtime:
+            if len(self.cache) >= self.cache_size:
+                del self.cache[next(iter(self.cache))]
+            info = (size, '"{:x}-{:x}"'.format(mtime, size), self.http_date(mtime), mtime)
+            self.cache[filename] = info
+        return info
+
+    @staticmethod
+    def byte_range(header, size):
+        """Parse a ``Range`` header.
+
+        Returns the ``(start, stop)`` offsets of the requested bytes, where
+        ``start >= stop`` means the range cannot be satisfied, or ``None`` if
+        the header should be ignored.
+        """
+        if not header.startswith("bytes=") or "," in header:
+            return None
+        try:
+            first, last = header[6:].strip().split("-", 1)
+            if first:
+                start = int(first)
+                stop = int(last) + 1 if last else size
+                if last and stop <= start:
+                    return None
+            else:
+                start = max(size - int(last), 0) if int(last) else size
+                stop = size
+        except ValueError:
+            return None
+        return start, min(stop, size)
+
+    def __call__(self, req, path=""):
+        if "\\" in path or "\x00" in path or ".." in path.split("/"):
+            return "Not found", 404
+        filename = self.directory + "/" + path
+        if not path or path.endswith("/"):
+            filename += self.index
+        info = None
+        encoding = None
+        if "gzip" in req.headers.get("Accept-Encoding", ""):
+            info = self.file_info(filename + ".gz")
+            if info is not None:
+                encoding = "gzip"
+        if info is None:
+            info = self.file_info(filename)
+        if info is None:
+            try:
+                if os.stat(filename)[0] & 0x4000:
+                    return Response.redirect(req.path + "/", status_code=301)
+            except OSError:
+                pass
+            return "Not found", 404
+        size, etag, last_modified, _ = info
+
+        ext = filename.split(".")[-1]
+        headers = {
+            "Content-Type": Response.types_map.get(ext, "application/octet-stream"),
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Accept-Ranges": "bytes",
+            "Vary": "Accept-Encoding",
+            "Content-Length": str(size),
+        }
+        max_age = self.max_age
+        if max_age is None:
+            max_age = Response.default_send_file_max_age
+        if max_age is not None:
+            headers["Cache-Control"] = "max-age={}".format(max_age)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = req.headers.get("If-None-Match")
+        if if_none_match is not None:
+            not_modified = if_none_match.strip() == "*" or etag in [
+                tag.strip().replace("W/", "") for tag in if_none_match.split(",")
+            ]
+        else:
+            not_modified = req.headers.get("If-Modified-Since") == last_modified
+        if not_modified:
+            return Response(b"", 304, headers, reason="Not Modified")
+
+        start, stop = 0, size
+        status_code = 200
+        if "Range" in req.headers and req.headers.get("If-Range", etag) in (etag, last_modified):
+            byte_range = self.byte_range(req.headers["Range"], size)
+            if byte_range is not None:
+                start, stop = byte_range
+                if start >= stop:
+                    headers["Content-Range"] = "bytes */{}".format(size)
+                    headers["Content-Length"] = "0"
+                    return Response(b"", 416, headers, reason="Range Not Satisfiable")
+                status_code = 206
+                headers["Content-Range"] = "bytes {}-{}/{}".format(start, stop - 1, size)
+                headers["Content-Length"] = str(stop - start)
+
+        if req.method == "HEAD":
+            reason = "Partial Content" if status_code == 206 else None
+            return Response(b"", status_code, headers, reason=reason)
+        f = open(filename + (".gz" if encoding else ""), "rb")
+        if status_code == 206:
+            f.seek(start)
+            f = FileRange(f, stop - start)
+            return Response(f, status_code, headers, reason="Partial Content")
+        return Response(f, status_code, headers)
+
+
 class URLPattern:
     """A class that represents the URL pattern for a route.
 
@@ -886,6 +1116,8 @@ class URLPattern:
     segment_parsers = {
         "int": lambda value: int(value),
     }
+    # changed by register_type, route indexes built before are rebuilt
+    types_version = 0
 
     @classmethod
     def register_type(cls, type_name, pattern="[^/]+", parser=None):
@@ -901,6 +1133,7 @@ class URLPattern:
         """
         cls.segment_patterns[type_name] = "/({})".format(pattern)
         cls.segment_parsers[type_name] = parser
+        URLPattern.types_version += 1
 
     def __init__(self, url_pattern):
         self.url_pattern = url_pattern
@@ -966,6 +1199,137 @@ class URLPattern:
         return "URLPattern: {}".format(self.url_pattern)
 
 
+class RouteIndex:
+    """An index of the routes of an application.
+
+    Static path segments are stored in a trie, ``string``, ``int`` and
+    ``path`` segments are matched without regular expressions. Routes that
+    use ``re:`` segments, custom segment types registered with
+    :meth:`URLPattern.register_type`, or static segments with regular
+    expression characters are matched with their regular expression as
+    before.
+
+    :param url_map: The URL map of the application.
+    """
+
+    # segment types matched by the index, with the pattern they are
+    # equivalent to
+    index_types = {
+        "string": "/([^/]+)",
+        "int": "/(-?\\d+)",
+        "path": "/(.+)",
+    }
+    regex_chars = ".^$*+?{}[]\\|()"
+
+    def __init__(self, url_map):
+        self.size = len(url_map)
+        self.types_version = URLPattern.types_version
+        self.root = self._node()
+        self.regex_routes = []
+        for index, route in enumerate(url_map):
+            if not self._insert(index, route[1].url_pattern):
+                self.regex_routes.append((index, route[1]))
+
+    @staticmethod
+    def _node():
+        # static children, (type, child) parameter children, (index, names)
+        return [{}, [], []]
+
+    def _insert(self, index, url_pattern):
+        node = self.root
+        names = []
+        for segment in url_pattern.lstrip("/").split("/"):
+            if segment and segment[0] == "<":
+                if segment[-1] != ">":
+                    return False
+                segment = segment[1:-1]
+                if ":" in segment:
+                    type_, name = segment.rsplit(":", 1)
+                else:
+                    type_ = "string"
+                    name = segment
+                if type_ not in self.index_types or self.index_types[
+                    type_
+                ] != URLPattern.segment_patterns.get(type_):
+                    return False
+                for param_type, child in node[1]:
+                    if param_type == type_:
+                        break
+                else:
+                    child = self._node()
+                    node[1].append((type_, child))
+                names.append((name, type_))
+                node = child
+            else:
+                for c in segment:
+                    if c in self.regex_chars:
+                        return False
+                child = node[0].get(segment)
+                if child is None:
+                    child = node[0][segment] = self._node()
+                node = child
+        node[2].append((index, names))
+        return True
+
+    def _search(self, node, segments, i, values, found):
+        if i == len(segments):
+            for index, names in node[2]:
+                if index not in found:
+                    found[index] = (names, values[:])
+            return
+        segment = segments[i]
+        child = node[0].get(segment)
+        if child is not None:
+            self._search(child, segments, i + 1, values, found)
+        for type_, child in node[1]:
+            if type_ == "path":
+                # greedy, like the regular expression
+                for j in range(len(segments), i, -1):
+                    value = "/".join(segments[i:j])
+                    if value:
+                        values.append(value)
+                        self._search(child, segments, j, values, found)
+                        values.pop()
+            elif segment and (
+                type_ == "string" or (segment[1:] if segment[0] == "-" else segment).isdigit()
+            ):
+                values.append(segment)
+                self._search(child, segments, i + 1, values, found)
+                values.pop()
+
+    def match(self, path):
+        """Find all routes that match a path.
+
+        Returns a list of ``(index, url_args)`` tuples, sorted by the
+        position of the route in the URL map.
+        """
+        found = {}
+        if path[:1] == "/":
+            self._search(self.root, path[1:].split("/"), 0, [], found)
+        matches = []
+        parsers = URLPattern.segment_parsers
+        for index, (names, values) in found.items():
+            args = {}
+            for i in range(len(names)):
+                name, type_ = names[i]
+                value = values[i]
+                parser = parsers.get(type_)
+                if parser:
+                    value = parser(value)
+                    if value is None:
+                        break
+                args[name] = value
+            else:
+                matches.append((index, args))
+        for index, pattern in self.regex_routes:
+            args = pattern.match(path)
+            if args is not None:
+                matches.append((index, args))
+        if len(matches) > 1:
+            matches.sort(key=lambda m: m[0])
+        return matches
+
+
 class HTTPException(Exception):
     def __init__(self, status_code, reason=None):
         self.status_code = status_code
@@ -989,8 +1353,28 @@ class Microdot:
         app = Microdot()
     """
 
+    #: Seconds a connection may stay idle waiting for its first request, or
+    #: for the next one on a persistent HTTP/1.1 connection, before the
+    #: server closes it. Set to 0 to close every connection after one
+    #: request, the first request is then awaited without a time limit.
+    #:
+    #: Example::
+    #:
+    #:    Microdot.keep_alive_timeout = 15
+    keep_alive_timeout = 5
+
+    #: Maximum number of requests served on one persistent connection.
+    max_keep_alive_requests = 100
+
+    #: Maximum number of connections served at the same time. Further
+    #: connections are answered with a 503 status code and closed. Set to 0
+    #: for no limit.
+    max_connections = 8
+
     def __init__(self):
         self.url_map = []
+        self.connections = 0
+        self.route_index = None
         self.before_request_handlers = []
         self.after_request_handlers = []
         self.after_error_request_handlers = []
@@ -1034,6 +1418,7 @@ class Microdot:
             self.url_map.append(
                 ([m.upper() for m in (methods or ["GET"])], URLPattern(url_pattern), f, "", None)
             )
+            self.route_index = None
             return f
 
         return decorated
@@ -1224,6 +1609,7 @@ class Microdot:
                     _subapp or subapp,
                 )
             )
+        self.route_index = None
         if not local:
             for handler in subapp.before_request_handlers:
                 self.before_request_handlers.append(handler)
@@ -1238,6 +1624,37 @@ class Microdot:
                 self.error_handlers[status_code] = handler
             subapp.error_handlers = {}
 
+    def static(self, url_prefix, directory, max_age=None, index="index.html"):
+        """Serve the files of a directory under the given URL prefix.
+
+        :param url_prefix: The URL prefix, for example ``'/static'``.
+        :param directory: The directory with the files.
+        :param max_age: The ``Cache-Control`` header's ``max-age`` value in
+                        seconds. If omitted, the value of the
+                        :attr:`Response.default_send_file_max_age` attribute
+                        is used.
+        :param index: The file sent for the URL prefix itself and for paths
+                      that end with a slash.
+
+        Files are sent with ``ETag``, ``Last-Modified`` and
+        ``Content-Length`` headers, so browsers can revalidate them with
+        conditional requests that are answered with a 304 status code, and
+        can request parts of a file with the ``Range`` header. If the client
+        accepts gzip encoding and a compressed copy of the file with an
+        additional ``.gz`` extension exists, the compressed copy is sent.
+
+        Example::
+
+            app.static('/static', '/flash/www', max_age=3600)
+        """
+        handler = StaticFiles(directory, max_age=max_age, index=index)
+        url_prefix = url_prefix.rstrip("/")
+        if url_prefix:
+            self.route(url_prefix)(lambda req: Response.redirect(req.path + "/", 301))
+        self.route(url_prefix + "/")(handler)
+        self.route(url_prefix + "/<path:path>")(handler)
+        return handler
+
     @staticmethod
     def abort(status_code, reason=None):
         """Abort the current request and return an error response with the
@@ -1304,6 +1721,10 @@ class Microdot:
             if not hasattr(writer, "awrite"):  # pragma: no cover
                 # CPython provides the awrite and aclose methods in 3.8+
                 async def awrite(self, data):
+                    if isinstance(data, memoryview):
+                        # the transport may keep a reference to the data,
+                        # which can be a view of a reused buffer
+                        data = bytes(data)
                     self.write(data)
                     await self.drain()
 
@@ -1316,7 +1737,21 @@ class Microdot:
                 writer.awrite = MethodType(awrite, writer)
                 writer.aclose = MethodType(aclose, writer)
 
-            await self.handle_request(reader, writer)
+            if self.max_connections and self.connections >= self.max_connections:
+                try:
+                    await writer.awrite(
+                        b"HTTP/1.1 503 Service Unavailable\r\n"
+                        b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+                    )
+                    await writer.aclose()
+                except OSError:  # pragma: no cover
+                    pass
+                return
+            self.connections += 1
+            try:
+                await self.handle_request(reader, writer)
+            finally:
+                self.connections -= 1
 
         if self.debug:  # pragma: no cover
             print("Starting async server on {host}:{port}...".format(host=host, port=port))
@@ -1399,56 +1834,143 @@ class Microdot:
         f = 404
         p = ""
         s = None
-        for route_methods, route_pattern, route_handler, url_prefix, subapp in self.url_map:
-            req.url_args = route_pattern.match(req.path)
-            if req.url_args is not None:
-                p = url_prefix
-                s = subapp
-                if method in route_methods:
-                    f = route_handler
-                    break
-                else:
-                    f = 405
+        req.url_args = None
+        for index, url_args in self.match_routes(req.path):
+            route_methods, _, route_handler, url_prefix, subapp = self.url_map[index]
+            p = url_prefix
+            s = subapp
+            if method in route_methods:
+                req.url_args = url_args
+                f = route_handler
+                break
+            else:
+                f = 405
         return f, p, s
 
+    def match_routes(self, path):
+        """Return the ``(index, url_args)`` tuples of all routes in the URL
+        map that match the given path, in URL map order.
+
+        The :class:`RouteIndex` used for this is built on first use and
+        rebuilt after routes are added or segment types are registered.
+        """
+        index = self.route_index
+        if (
+            index is None
+            or index.size != len(self.url_map)
+            or index.types_version != URLPattern.types_version
+        ):
+            self.route_index = RouteIndex(self.url_map)
+        return self.route_index.match(path)
+
     def default_options_handler(self, req):
         allow = []
-        for route_methods, route_pattern, _, _, _ in self.url_map:
-            if route_pattern.match(req.path) is not None:
-                allow.extend(route_methods)
+        for index, _ in self.match_routes(req.path):
+            allow.extend(self.url_map[index][0])
         if "GET" in allow:
             allow.append("HEAD")
         allow.append("OPTIONS")
         return {"Allow": ", ".join(allow)}
 
     async def handle_request(self, reader, writer):
-        req = None
-        try:
-            req = await Request.create(self, reader, writer, writer.get_extra_info("peername"))
-        except OSError as exc:  # pragma: no cover
-            if exc.errno in MUTED_SOCKET_ERRORS:
-                pass
-            else:
-                raise
-        except Exception as exc:  # pragma: no cover
-            print_exception(exc)
-
-        res = await self.dispatch_request(req)
+        requests = 0
+        buffer = None
+        while True:
+            req = None
+            try:
+                coro = Request.create(self, reader, writer, writer.get_extra_info("peername"))
+                if self.keep_alive_timeout:
+                    # an idle client must not hold a connection slot, also
+                    # before its first request
+                    req = await asyncio.wait_for(coro, self.keep_alive_timeout)
+                else:
+                    req = await coro
+                if req is None and requests:
+                    break
+            except asyncio.TimeoutError:
+                break
+            except OSError as exc:  # pragma: no cover
+                if exc.errno in MUTED_SOCKET_ERRORS:
+                    if requests:
+                        break
+                else:
+                    raise
+            except Exception as exc:  # pragma: no cover
+                print_exception(exc)
+            requests += 1
+
+            res = await self.dispatch_request(req)
+            keep_alive = self.prepare_connection(req, res, requests)
+            if hasattr(res.body, "readinto"):
+                # file bodies of this connection share one read buffer
+                if buffer is None or len(buffer) != res.send_file_buffer_size:
+                    buffer = bytearray(res.send_file_buffer_size)
+                res.buffer = buffer
+            try:
+                if res != Response.already_handled:  # pragma: no branch
+                    await res.write(writer)
+            except OSError as exc:  # pragma: no cover
+                if exc.errno in MUTED_SOCKET_ERRORS:
+                    keep_alive = False
+                else:
+                    raise
+            if self.debug and req:  # pragma: no cover
+                print(
+                    "{method} {path} {status_code}".format(
+                        method=req.method, path=req.path, status_code=res.status_code
+                    )
+                )
+            if not keep_alive:
+                break
         try:
-            if res != Response.already_handled:  # pragma: no branch
-                await res.write(writer)
             await writer.aclose()
         except OSError as exc:  # pragma: no cover
             if exc.errno in MUTED_SOCKET_ERRORS:
                 pass
             else:
                 raise
-        if self.debug and req:  # pragma: no cover
-            print(
-                "{method} {path} {status_code}".format(
-                    method=req.method, path=req.path, status_code=res.status_code
-                )
+
+    def prepare_connection(self, req, res, requests):
+        """Decide if the connection stays open after a response and set the
+        HTTP version, ``Connection`` header and body framing of the response
+        accordingly.
+
+        :param req: The request, or ``None`` if it could not be parsed.
+        :param res: The response to the request.
+        :param requests: The number of requests served on this connection.
+
+        Returns ``True`` if the connection can be used for another request.
+        """
+        if res == Response.already_handled:
+            return False
+        keep_alive = False
+        if req is not None and self.keep_alive_timeout:
+            if req.http_version == "1.1":
+                res.http_version = "1.1"
+            connection = req.headers.get("Connection", "").lower()
+            keep_alive = (
+                requests < self.max_keep_alive_requests
+                and "close" not in connection
+                and (req.http_version == "1.1" or "keep-alive" in connection)
+                # the next request can only be found if this body was read
+                and len(req.body) == req.content_length
+                and "Transfer-Encoding" not in req.headers
+                and res.headers.get("Connection", "").lower() != "close"
             )
+        if (
+            keep_alive
+            and not isinstance(res.body, bytes)
+            and "Content-Length" not in res.headers
+            and not res.is_head
+        ):
+            if res.http_version == "1.1":
+                res.chunked = True
+                res.headers["Transfer-Encoding"] = "chunked"
+            else:
+                # no way to tell the client where the body ends
+                keep_alive = False
+        res.headers["Connection"] = "keep-alive" if keep_alive else "close"
+        return keep_alive
 
     def get_request_handlers(self, req, attr, local_first=True):
         handlers = getattr(self, attr + "_handlers")
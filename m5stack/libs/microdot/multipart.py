@@ -0,0 +1,258 @@
+from microdot import Request, AsyncBytesIO, abort
+from microdot.microdot import MultiDict, iscoroutine
+from microdot.helpers import wraps
+
+
+class FileUpload:
+    """A file uploaded in a multipart form.
+
+    The contents are read from the request as they are needed, so they must
+    be consumed before the next part of the form is requested. The object
+    can be used as an async iterator that returns the contents in chunks of
+    at most :attr:`chunk_size` bytes.
+
+    :param filename: The name of the file, as given by the client.
+    :param content_type: The content type of the file.
+    :param read: A coroutine function that returns up to the given number of
+                 bytes of the file, or empty bytes at the end of the file.
+    """
+
+    #: The size of the chunks used when iterating over or saving the file.
+    chunk_size = 512
+
+    def __init__(self, filename, content_type, read):
+        self.filename = filename
+        self.content_type = content_type
+        self._read = read
+
+    async def read(self, n=-1):
+        """Read from the file.
+
+        :param n: The maximum number of bytes to read. If omitted, the rest
+                  of the file is returned.
+        """
+        if n >= 0:
+            return await self._read(n)
+        data = b""
+        while True:
+            chunk = await self._read(self.chunk_size)
+            if not chunk:
+                return data
+            data += chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self._read(self.chunk_size)
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+    async def save(self, path_or_file):
+        """Write the file to disk, one chunk at a time.
+
+        :param path_or_file: The path of the file to write, or an open file
+                             object.
+        """
+        if isinstance(path_or_file, str):
+            f = open(path_or_file, "wb")
+        else:
+            f = path_or_file
+        try:
+            async for chunk in self:
+                ret = f.write(chunk)
+                if iscoroutine(ret):  # pragma: no cover
+                    await ret
+        finally:
+            if f is not path_or_file:
+                f.close()
+
+    async def close(self):
+        """Discard the rest of the file."""
+        while await self._read(self.chunk_size):
+            pass
+
+
+class FormDataIter:
+    """Asynchronous iterator that parses a ``multipart/form-data`` body.
+
+    The body is read from :attr:`Request.stream` through a buffer of fixed
+    size, so the memory used does not depend on the size of the request.
+    Every iteration returns a ``(name, value)`` tuple, where the value is a
+    string for plain fields and a :class:`FileUpload` for files.
+
+    :param request: The request with the form.
+
+    Example::
+
+        @app.post('/upload')
+        async def upload(request):
+            async for name, value in FormDataIter(request):
+                if isinstance(value, FileUpload):
+                    await value.save('/flash/' + name)
+                else:
+                    print(name, value)
+
+    Large uploads require :attr:`Request.max_content_length` to be raised.
+    """
+
+    #: The number of bytes read from the request at a time.
+    buffer_size = 512
+
+    def __init__(self, request):
+        self.stream = request.stream
+        self.remaining = request.content_length
+        boundary = None
+        for param in (request.content_type or "").split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "boundary":
+                boundary = value.strip('"')
+        if not boundary or not (request.content_type or "").lower().startswith(
+            "multipart/form-data"
+        ):
+            abort(400)
+        self.delimiter = b"\r\n--" + boundary.encode()
+        # the first boundary is not preceded by a line break
+        self.buffer = b"\r\n"
+        self.in_part = True
+        self.done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.done:
+            raise StopAsyncIteration
+        # skip the preamble or whatever was not read from the previous part
+        while self.in_part:
+            await self._read(self.buffer_size)
+        await self._fill(2)
+        if self.buffer[:2] == b"--":
+            # last boundary, discard the epilogue
+            self.done = True
+            while self.remaining:
+                await self._fill(len(self.buffer) + 1)
+                self.buffer = b""
+            raise StopAsyncIteration
+        self.buffer = self.buffer[2:]
+
+        name = filename = content_type = None
+        while True:
+            line = await self._readline()
+            if not line:
+                break
+            header, _, value = line.partition(":")
+            header = header.strip().lower()
+            if header == "content-disposition":
+                for param in value.split(";")[1:]:
+                    key, _, v = param.strip().partition("=")
+                    if key == "name":
+                        name = v.strip('"')
+                    elif key == "filename":
+                        filename = v.strip('"')
+            elif header == "content-type":
+                content_type = value.strip()
+        self.in_part = True
+
+        if filename is None:
+            value = b""
+            while True:
+                chunk = await self._read(self.buffer_size)
+                if not chunk:
+                    break
+                value += chunk
+                if len(value) > Request.max_body_length:
+                    abort(413)
+            return name, value.decode()
+        return name, FileUpload(filename, content_type, self._read)
+
+    async def _fill(self, n):
+        # make sure that there are at least n bytes in the buffer
+        while len(self.buffer) < n:
+            if not self.remaining:
+                abort(400)
+            data = await self.stream.read(min(self.buffer_size, self.remaining))
+            if not data:
+                abort(400)
+            self.remaining -= len(data)
+            self.buffer += data
+
+    async def _readline(self):
+        while True:
+            i = self.buffer.find(b"\r\n")
+            if i >= 0:
+                line = self.buffer[:i]
+                self.buffer = self.buffer[i + 2 :]
+                return line.decode()
+            if len(self.buffer) > Request.max_readline:
+                abort(400)
+            await self._fill(len(self.buffer) + 1)
+
+    async def _read(self, n):
+        # return up to n bytes of the current part, empty bytes at its end
+        if not self.in_part:
+            return b""
+        while True:
+            i = self.buffer.find(self.delimiter)
+            if i == 0:
+                self.buffer = self.buffer[len(self.delimiter) :]
+                self.in_part = False
+                return b""
+            if i > 0:
+                size = min(i, n)
+            else:
+                # the end of the buffer could be the start of the delimiter
+                size = min(len(self.buffer) - len(self.delimiter) + 1, n)
+            if size > 0:
+                data = self.buffer[:size]
+                self.buffer = self.buffer[size:]
+                return data
+            await self._fill(len(self.buffer) + 1)
+
+
+def with_form_data(f):
+    """Decorator that parses a ``multipart/form-data`` body before the route
+    runs.
+
+    The fields are stored in :attr:`Request.form` and the files in
+    :attr:`Request.files`. Files are kept in memory, each one limited to
+    :attr:`Request.max_body_length` bytes. Use :class:`FormDataIter` to
+    process uploads that do not fit in memory.
+
+    Example::
+
+        @app.post('/upload')
+        @with_form_data
+        async def upload(request):
+            await request.files['config'].save('/flash/config.json')
+            return request.form['name']
+    """
+
+    @wraps(f)
+    async def wrapper(request, *args, **kwargs):
+        form = MultiDict()
+        files = MultiDict()
+        async for name, value in FormDataIter(request):
+            if isinstance(value, FileUpload):
+                data = b""
+                while True:
+                    chunk = await value.read(FileUpload.chunk_size)
+                    if not chunk:
+                        break
+                    data += chunk
+                    if len(data) > Request.max_body_length:
+                        abort(413)
+                files[name] = FileUpload(
+                    value.filename, value.content_type, AsyncBytesIO(data).read
+                )
+            else:
+                form[name] = value
+        request._form = form
+        request._files = files
+        ret = f(request, *args, **kwargs)
+        if iscoroutine(ret):
+            ret = await ret
+        return ret
+
+    return wrapper
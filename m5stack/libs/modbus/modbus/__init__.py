@@ -5,7 +5,9 @@
 
 __version__ = "0.1.0"
 
+from .gateway import ModbusGateway
 from .master import ModbusRTUMaster
 from .master import ModbusTCPClient
+from .poll import PollPlan
 from .slave import ModbusRTUSlave
 from .slave import ModbusTCPServer
@@ -3,6 +3,75 @@
 #
 # SPDX-License-Identifier: MIT
 
+import struct
+from array import array
+
+try:
+    from m5utils import crc16_modbus as _crc16_native
+except ImportError:
+    _crc16_native = None
+
+
+def _make_crc16_table() -> array:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return array("H", table)
+
+
+_CRC16_TABLE = _make_crc16_table()
+
+
+def crc16(data, length: int = None) -> int:
+    """Calculate the modbus CRC16 of data[:length].
+
+    Uses ``m5utils.crc16_modbus`` when the firmware provides it, otherwise a
+    256-entry lookup table with one table access per byte.
+
+    :param data: Bytes to checksum.
+    :param int length: Number of bytes to include. Defaults to len(data).
+    :returns: CRC16, low byte is sent first.
+    :rtype: int
+    """
+    if length is None:
+        length = len(data)
+    elif length > len(data):
+        return 0
+    if _crc16_native is not None:
+        return _crc16_native(memoryview(data)[:length])
+    table = _CRC16_TABLE
+    crc = 0xFFFF
+    for i in range(length):
+        crc = (crc >> 8) ^ table[(crc ^ data[i]) & 0xFF]
+    return crc
+
+
+def _encode_request_pdu(buf, offset, func_code, register, length=None, data=None) -> int:
+    """Write a request PDU into buf.
+
+    :returns: Number of bytes written.
+    :rtype: int
+    """
+    buf[offset] = func_code
+    struct.pack_into(">H", buf, offset + 1, register)
+    pos = offset + 3
+    if func_code in (0x01, 0x02, 0x03, 0x04, 0x0F, 0x10):
+        struct.pack_into(">H", buf, pos, length)
+        pos += 2
+    if func_code in (0x0F, 0x10):
+        buf[pos] = len(data)
+        pos += 1
+    if func_code in (0x05, 0x06, 0x0F, 0x10):
+        buf[pos : pos + len(data)] = data
+        pos += len(data)
+    return pos - offset
+
 
 class ModbusFrame:
     def __init__(
@@ -112,30 +181,69 @@ class ModbusFrame:
         self.pdu = None
         self.frame = None
 
-    def _create_pdu(self) -> None:
-        self.pdu = bytearray([])
-        self.pdu += bytearray([self.func_code])
+    def pdu_length(self) -> int:
+        """Size of the encoded PDU in bytes.
 
+        :rtype: int
+        """
+        data_len = 0 if self.data is None else len(self.data)
         if self.type == "request":
-            self.pdu += bytearray([self.register >> 8, self.register & 0xFF])
-            if self.func_code in [0x01, 0x02, 0x03, 0x04, 0x0F, 0x10]:
-                self.pdu += bytearray([self.length >> 8, self.length & 0xFF])
-            if self.func_code in [0x0F, 0x10]:
-                self.pdu += bytearray([len(self.data)])
-            if self.func_code in [0x05, 0x06, 0x0F, 0x10]:
-                self.pdu += self.data
-
-        if self.type == "response":
-            if self.func_code in [0x01, 0x02, 0x03, 0x04]:
-                self.pdu += bytearray([len(self.data)])
-            if self.func_code in [0x05, 0x06, 0x0F, 0x10]:
-                self.pdu += bytearray([self.register >> 8, self.register & 0xFF])
-            if self.func_code in [0x01, 0x02, 0x03, 0x04, 0x05, 0x06]:
-                self.pdu += self.data
+            if self.func_code in [0x05, 0x06]:
+                return 3 + data_len
             if self.func_code in [0x0F, 0x10]:
-                self.pdu += bytearray([self.length >> 8, self.length & 0xFF])
-            if self.func_code in [0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x8F, 0x90]:
-                self.pdu += bytearray([self.error_code])
+                return 6 + data_len
+            return 5
+        if self.func_code in [0x01, 0x02, 0x03, 0x04]:
+            return 2 + data_len
+        if self.func_code in [0x05, 0x06]:
+            return 3 + data_len
+        if self.func_code in [0x0F, 0x10]:
+            return 5
+        return 2
+
+    def encode_pdu_into(self, buf, offset: int = 0) -> int:
+        """Write the PDU into a preallocated buffer.
+
+        :param buf: Writable buffer, at least offset + pdu_length() bytes.
+        :param int offset: Position of the function code in buf.
+        :returns: Number of bytes written.
+        :rtype: int
+        """
+        if self.type == "request":
+            return _encode_request_pdu(
+                buf, offset, self.func_code, self.register, self.length, self.data
+            )
+
+        buf[offset] = self.func_code
+        pos = offset + 1
+        if self.func_code in [0x01, 0x02, 0x03, 0x04]:
+            buf[pos] = len(self.data)
+            pos += 1
+        if self.func_code in [0x05, 0x06, 0x0F, 0x10]:
+            struct.pack_into(">H", buf, pos, self.register)
+            pos += 2
+        if self.func_code in [0x01, 0x02, 0x03, 0x04, 0x05, 0x06]:
+            buf[pos : pos + len(self.data)] = self.data
+            pos += len(self.data)
+        if self.func_code in [0x0F, 0x10]:
+            struct.pack_into(">H", buf, pos, self.length)
+            pos += 2
+        if self.func_code in [0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x8F, 0x90]:
+            buf[pos] = self.error_code
+            pos += 1
+        return pos - offset
+
+    def _create_pdu(self) -> None:
+        self.pdu = bytearray(self.pdu_length())
+        self.encode_pdu_into(self.pdu)
+
+    def frame_length(self) -> int:
+        """Override in derived Class"""
+        raise NotImplementedError
+
+    def encode_into(self, buf) -> int:
+        """Override in derived Class"""
+        raise NotImplementedError
 
     def _create_frame(self) -> None:
         """Override in derived Class"""
@@ -164,11 +272,79 @@ class ModbusRTUFrame(ModbusFrame):
         self.device_addr = device_addr
         self.frame = None
 
+    def frame_length(self) -> int:
+        """Size of the encoded RTU frame in bytes.
+
+        :rtype: int
+        """
+        return self.pdu_length() + 3
+
+    def encode_into(self, buf) -> int:
+        """Write the RTU frame (address, PDU, CRC) into a preallocated buffer.
+
+        :param buf: Writable buffer, at least frame_length() bytes.
+        :returns: Number of bytes written.
+        :rtype: int
+        """
+        buf[0] = self.device_addr
+        return ModbusRTUFrame._finish(buf, 1 + self.encode_pdu_into(buf, 1))
+
     def _create_frame(self) -> None:
-        self._create_pdu()
-        self.frame = bytearray([self.device_addr]) + self.pdu
-        crc = ModbusRTUFrame._crc16(self.frame)
-        self.frame += bytearray([crc & 0xFF, crc >> 8])
+        self.frame = bytearray(self.frame_length())
+        self.encode_into(self.frame)
+
+    @classmethod
+    def _finish(cls, buf, length: int) -> int:
+        crc = cls._crc16(buf, length)
+        buf[length] = crc & 0xFF
+        buf[length + 1] = crc >> 8
+        return length + 2
+
+    @classmethod
+    def encode_request_into(
+        cls,
+        buf,
+        device_addr: int,
+        func_code: int,
+        register: int,
+        length: int = None,
+        data: bytearray = None,
+    ) -> int:
+        """Write a request frame into a preallocated buffer without creating a
+        ModbusRTUFrame object.
+
+        :param buf: Writable buffer, 256 bytes are enough for every request.
+        :param int device_addr: Slave address.
+        :param int func_code: Function code (1-6,15,16).
+        :param int register: Start register.
+        :param length: Quantity for function codes 1-4,15,16.
+        :type length: int or None
+        :param data: Payload for function codes 5,6,15,16.
+        :type data: bytearray or None
+        :returns: Number of bytes written.
+        :rtype: int
+        """
+        buf[0] = device_addr
+        n = _encode_request_pdu(buf, 1, func_code, register, length, data)
+        return cls._finish(buf, 1 + n)
+
+    @classmethod
+    def decode_read_response(cls, frame, func_code: int) -> memoryview:
+        """Return the payload of a read response (function code 1-4) as a
+        memoryview into frame, without copying it.
+
+        :param frame: Received frame.
+        :param int func_code: Function code of the request.
+        :returns: Payload, None for exception responses or invalid frames.
+        :rtype: memoryview or None
+        """
+        n = len(frame)
+        if n < 5 or frame[1] != func_code:
+            return None
+        bc = frame[2]
+        if n < bc + 5 or cls._crc16(frame, 3 + bc) != frame[3 + bc] | (frame[4 + bc] << 8):
+            return None
+        return memoryview(frame)[3 : 3 + bc]
 
     def __str__(self) -> str:
         return "<ModbusRTUFrame ({}): device: {}, func_code: {}, frame:{}>".format(
@@ -179,20 +355,8 @@ class ModbusRTUFrame(ModbusFrame):
         )
 
     @classmethod
-    def _crc16(cls, data: bytearray) -> int:
-        offset = 0
-        length = len(data)
-        if data is None or offset < 0 or offset > len(data) - 1 and offset + length > len(data):
-            return 0
-        crc = 0xFFFF
-        for i in range(0, length):
-            crc ^= data[offset + i]
-            for j in range(0, 8):
-                if (crc & 1) > 0:
-                    crc = (crc >> 1) ^ 0xA001
-                else:
-                    crc = crc >> 1
-        return crc
+    def _crc16(cls, data: bytearray, length: int = None) -> int:
+        return crc16(data, length)
 
     @classmethod
     def parse_frame(
@@ -298,7 +462,7 @@ class ModbusRTUFrame(ModbusFrame):
             func_code = frame[1]
             if func_code not in [0x05, 0x06]:
                 return False
-            return cls._crc16(frame[0:6]) == (frame[7] << 8) + frame[6]
+            return cls._crc16(frame, 6) == (frame[7] << 8) + frame[6]
         except:
             return False
 
@@ -314,11 +478,11 @@ class ModbusRTUFrame(ModbusFrame):
         try:
             func_code = frame[1]
             if func_code in [0x01, 0x02, 0x03, 0x04]:
-                return cls._crc16(frame[0:6]) == (frame[7] << 8) + frame[6]
+                return cls._crc16(frame, 6) == (frame[7] << 8) + frame[6]
             if func_code in [0x10, 0x0F]:
                 bc = frame[6]
                 if len(frame) >= 8 + bc:
-                    return cls._crc16(frame[0 : 7 + bc]) == (frame[8 + bc] << 8) + frame[7 + bc]
+                    return cls._crc16(frame, 7 + bc) == (frame[8 + bc] << 8) + frame[7 + bc]
                 else:
                     return False
         except:
@@ -338,11 +502,11 @@ class ModbusRTUFrame(ModbusFrame):
             if func_code in [0x01, 0x02, 0x03, 0x04]:
                 bc = frame[2]
                 if len(frame) >= bc + 5:
-                    return cls._crc16(frame[0 : 3 + bc]) == (frame[4 + bc] << 8) + frame[3 + bc]
+                    return cls._crc16(frame, 3 + bc) == (frame[4 + bc] << 8) + frame[3 + bc]
             if func_code in [0x10, 0x0F]:
-                return cls._crc16(frame[0:6]) == (frame[7] << 8) + frame[6]
+                return cls._crc16(frame, 6) == (frame[7] << 8) + frame[6]
             if func_code in [0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x8F, 0x90]:
-                return cls._crc16(frame[0:3]) == (frame[4] << 8) + frame[3]
+                return cls._crc16(frame, 3) == (frame[4] << 8) + frame[3]
         except:
             return False
 
@@ -385,14 +549,80 @@ class ModbusTCPFrame(ModbusFrame):
         self.unit_id = unit_id
         self.frame = None
 
+    def frame_length(self) -> int:
+        """Size of the encoded TCP frame (MBAP header and PDU) in bytes.
+
+        :rtype: int
+        """
+        return self.pdu_length() + 7
+
+    def encode_into(self, buf) -> int:
+        """Write the TCP frame (MBAP header and PDU) into a preallocated buffer.
+
+        :param buf: Writable buffer, at least frame_length() bytes.
+        :returns: Number of bytes written.
+        :rtype: int
+        """
+        n = self.encode_pdu_into(buf, 7)
+        # Transaction ID, Protocol ID, Length, Unit ID
+        struct.pack_into(">HHHB", buf, 0, self.transaction_id & 0xFFFF, 0, n + 1, self.unit_id)
+        return n + 7
+
     def _create_frame(self) -> None:
-        self._create_pdu()
-        self.frame = bytearray([self.transaction_id >> 8, self.transaction_id & 0xFF])
-        self.frame += bytearray([0x00, 0x00])  # Protocol ID
-        l = len(self.pdu) + 1
-        self.frame += bytearray([l >> 8, l & 0xFF])
-        self.frame += bytearray([self.unit_id])
-        self.frame += self.pdu
+        self.frame = bytearray(self.frame_length())
+        self.encode_into(self.frame)
+
+    @classmethod
+    def encode_request_into(
+        cls,
+        buf,
+        transaction_id: int,
+        unit_id: int,
+        func_code: int,
+        register: int,
+        length: int = None,
+        data: bytearray = None,
+    ) -> int:
+        """Write a request frame into a preallocated buffer without creating a
+        ModbusTCPFrame object.
+
+        :param buf: Writable buffer, 260 bytes are enough for every request.
+        :param int transaction_id: Transaction ID.
+        :param int unit_id: Unit address.
+        :param int func_code: Function code (1-6,15,16).
+        :param int register: Start register.
+        :param length: Quantity for function codes 1-4,15,16.
+        :type length: int or None
+        :param data: Payload for function codes 5,6,15,16.
+        :type data: bytearray or None
+        :returns: Number of bytes written.
+        :rtype: int
+        """
+        n = _encode_request_pdu(buf, 7, func_code, register, length, data)
+        struct.pack_into(">HHHB", buf, 0, transaction_id & 0xFFFF, 0, n + 1, unit_id)
+        return n + 7
+
+    @classmethod
+    def decode_read_response(cls, frame, func_code: int, transaction_id: int = None) -> memoryview:
+        """Return the payload of a read response (function code 1-4) as a
+        memoryview into frame, without copying it.
+
+        :param frame: Received frame.
+        :param int func_code: Function code of the request.
+        :param transaction_id: If given, the response must carry this ID.
+        :type transaction_id: int or None
+        :returns: Payload, None for exception responses or invalid frames.
+        :rtype: memoryview or None
+        """
+        n = len(frame)
+        if n < 9 or frame[7] != func_code:
+            return None
+        if transaction_id is not None and (frame[0] << 8) | frame[1] != transaction_id & 0xFFFF:
+            return None
+        bc = frame[8]
+        if n < bc + 9 or (frame[4] << 8) | frame[5] != bc + 3:
+            return None
+        return memoryview(frame)[9 : 9 + bc]
 
     def __str__(self) -> str:
         return "<ModbusTCPFrame ({}): func_code: {}, frame:{}>".format(
@@ -0,0 +1,316 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import struct
+import time
+import asyncio
+from .frame import ModbusRTUFrame, ModbusTCPFrame, crc16
+from .master import _ticks_ms, _ticks_diff
+
+# Modbus exception codes used by the gateway
+_SERVER_BUSY = 0x06
+_PATH_UNAVAILABLE = 0x0A
+_TARGET_FAILED = 0x0B
+
+_READ_FUNCTIONS = (0x01, 0x02, 0x03, 0x04)
+_WRITE_FUNCTIONS = (0x05, 0x06, 0x0F, 0x10)
+
+
+class _RTUBus:
+    def __init__(self, master) -> None:
+        self.master = master
+        # 3.5 character times between two frames, rounded up to milliseconds
+        self.gap_ms = (getattr(master, "_inter_frame_delay", 1750) + 999) // 1000
+        self.last_ms = _ticks_ms()
+        self.queue = []
+        self.event = asyncio.Event()
+        self.task = None
+
+
+class _Pending:
+    def __init__(self, request: bytearray) -> None:
+        self.request = request
+        self.response = None
+        self.done = asyncio.Event()
+
+
+class ModbusGateway:
+    def __init__(
+        self,
+        server,
+        routes: dict,
+        cache_ttl: int = 0,
+        cache_size: int = 32,
+        max_queue: int = 16,
+        timeout: int = 1000,
+        verbose: bool = False,
+    ) -> None:
+        """Modbus TCP to RTU gateway.
+
+        Requests received by server are routed by their unit id to an RTU
+        master and sent on that bus as RTU frames. Every bus handles one
+        transaction at a time and keeps the 3.5 character inter-frame gap,
+        requests for a busy bus wait in a queue.
+
+        :param server: ModbusTCPServer accepting the requests, its context is
+                       replaced by the gateway.
+        :param dict routes: Unit id to ModbusRTUMaster, several unit ids may
+                            share one master.
+        :param int cache_ttl: Time in milliseconds read responses are reused
+                              for identical requests, 0 disables the cache.
+        :param int cache_size: Maximum number of cached responses.
+        :param int max_queue: Maximum number of queued requests per bus.
+        :param int timeout: RTU response timeout in milliseconds.
+        :param bool verbose: Enable verbose logging.
+        """
+        self._server = server
+        self._verbose = verbose
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cache = {}
+        self._buses = {}
+        self._routes = {}
+        for unit_id, master in routes.items():
+            key = id(master)
+            if key not in self._buses:
+                self._buses[key] = _RTUBus(master)
+            self._routes[unit_id] = self._buses[key]
+        self.reset_stats()
+
+        server.context = None
+        server.ignore_unit_id = True
+        server.forward_message = self.forward
+        server.forward_message_async = self.forward_async
+
+    def reset_stats(self) -> None:
+        """Reset all counters to 0."""
+        self._requests = 0
+        self._cache_hits = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._max_queue_depth = 0
+        self._latency_total = 0
+        self._latency_max = 0
+        self._transactions = 0
+
+    def get_stats(self) -> dict:
+        """Get the gateway counters.
+
+        :returns: dict with the keys ``requests``, ``cache_hits``,
+                  ``timeouts``, ``rejected``, ``queue_depth``,
+                  ``max_queue_depth``, ``latency_avg`` and ``latency_max``
+                  (milliseconds from receiving a request until its RTU
+                  response arrived, including the time in the queue).
+        :rtype: dict
+        """
+        return {
+            "requests": self._requests,
+            "cache_hits": self._cache_hits,
+            "timeouts": self._timeouts,
+            "rejected": self._rejected,
+            "queue_depth": sum(len(bus.queue) for bus in self._buses.values()),
+            "max_queue_depth": self._max_queue_depth,
+            "latency_avg": self._latency_total // self._transactions if self._transactions else 0,
+            "latency_max": self._latency_max,
+        }
+
+    def _encode_request(self, frame: ModbusTCPFrame) -> bytearray:
+        buf = bytearray(frame.pdu_length() + 3)
+        buf[0] = frame.unit_id
+        ModbusRTUFrame._finish(buf, 1 + frame.encode_pdu_into(buf, 1))
+        return buf
+
+    def _error(self, frame: ModbusTCPFrame, error_code: int) -> ModbusTCPFrame:
+        return ModbusTCPFrame(
+            transaction_id=frame.transaction_id,
+            unit_id=frame.unit_id,
+            func_code=0x80 + frame.func_code,
+            fr_type="response",
+            error_code=error_code,
+        )
+
+    def _response(self, frame: ModbusTCPFrame, pdu) -> ModbusTCPFrame:
+        """Build the TCP response from the RTU response without CRC."""
+        mbap = struct.pack(">HHH", frame.transaction_id, 0, len(pdu))
+        return ModbusTCPFrame.parse_frame(mbap + pdu, verbose=self._verbose)
+
+    def _cache_get(self, request: bytearray):
+        if self.cache_ttl <= 0 or request[1] not in _READ_FUNCTIONS:
+            return None
+        entry = self._cache.get(bytes(request))
+        if entry is None:
+            return None
+        if _ticks_diff(_ticks_ms(), entry[0]) >= self.cache_ttl:
+            del self._cache[bytes(request)]
+            return None
+        self._cache_hits += 1
+        return entry[1]
+
+    def _cache_put(self, request: bytearray, pdu) -> None:
+        if self.cache_ttl <= 0:
+            return
+        if request[1] in _WRITE_FUNCTIONS:
+            # the unit changed, drop everything read from it
+            for key in [k for k in self._cache if k[0] == request[0]]:
+                del self._cache[key]
+            return
+        if request[1] not in _READ_FUNCTIONS or pdu[1] >= 0x80:
+            return
+        now = _ticks_ms()
+        if len(self._cache) >= self.cache_size:
+            for key in [
+                k for k, v in self._cache.items() if _ticks_diff(now, v[0]) >= self.cache_ttl
+            ]:
+                del self._cache[key]
+            if len(self._cache) >= self.cache_size:
+                return
+        self._cache[bytes(request)] = (now, pdu)
+
+    def _check_response(self, request: bytearray, response) -> bytes:
+        """Validate an RTU response and strip the CRC.
+
+        :returns: Response without CRC or None if it is invalid
+        :rtype: bytes or None
+        """
+        if len(response) < 5 or response[0] != request[0] or crc16(response) != 0:
+            return None
+        if response[1] & 0x7F != request[1]:
+            return None
+        return bytes(response[:-2])
+
+    def _finish(self, frame: ModbusTCPFrame, request: bytearray, response, start: int):
+        latency = _ticks_diff(_ticks_ms(), start)
+        self._transactions += 1
+        self._latency_total += latency
+        if latency > self._latency_max:
+            self._latency_max = latency
+        pdu = None if response is None else self._check_response(request, response)
+        if pdu is None:
+            self._timeouts += 1
+            self._log("unit {} failed to respond".format(frame.unit_id))
+            return self._error(frame, _TARGET_FAILED)
+        self._cache_put(request, pdu)
+        return self._response(frame, pdu)
+
+    def forward(self, frame: ModbusTCPFrame) -> ModbusTCPFrame:
+        """Forward one request and wait for the response (blocking).
+
+        Used as ``forward_message`` of the server by :meth:`start` and
+        ``tick()``.
+
+        :param ModbusTCPFrame frame: Request received by the server.
+        :returns: Response frame
+        :rtype: ModbusTCPFrame
+        """
+        self._requests += 1
+        bus = self._routes.get(frame.unit_id)
+        if bus is None:
+            self._rejected += 1
+            return self._error(frame, _PATH_UNAVAILABLE)
+        request = self._encode_request(frame)
+        pdu = self._cache_get(request)
+        if pdu is not None:
+            return self._response(frame, pdu)
+        start = _ticks_ms()
+        wait = bus.gap_ms - _ticks_diff(start, bus.last_ms)
+        if wait > 0:
+            time.sleep(wait / 1000)
+        state, response = bus.master._send(request, self.timeout)
+        bus.last_ms = _ticks_ms()
+        return self._finish(frame, request, response if state else None, start)
+
+    async def forward_async(self, frame: ModbusTCPFrame) -> ModbusTCPFrame:
+        """Queue one request on its bus and wait for the response.
+
+        Used as ``forward_message_async`` of the server by
+        :meth:`serve_async`. A full queue is answered with exception 0x06
+        (server busy), an unknown unit id with 0x0A (path unavailable) and a
+        missing or invalid RTU response with 0x0B (target failed to respond).
+
+        :param ModbusTCPFrame frame: Request received by the server.
+        :returns: Response frame
+        :rtype: ModbusTCPFrame
+        """
+        self._requests += 1
+        bus = self._routes.get(frame.unit_id)
+        if bus is None:
+            self._rejected += 1
+            return self._error(frame, _PATH_UNAVAILABLE)
+        request = self._encode_request(frame)
+        pdu = self._cache_get(request)
+        if pdu is not None:
+            return self._response(frame, pdu)
+        if len(bus.queue) >= self.max_queue:
+            self._rejected += 1
+            return self._error(frame, _SERVER_BUSY)
+        start = _ticks_ms()
+        pending = _Pending(request)
+        bus.queue.append(pending)
+        if len(bus.queue) > self._max_queue_depth:
+            self._max_queue_depth = len(bus.queue)
+        bus.event.set()
+        # every transaction ahead in the queue and this one take at most the
+        # RTU timeout and the inter-frame gap, the rest is slack for the bus
+        limit = len(bus.queue) * (self.timeout + bus.gap_ms) + self.timeout
+        try:
+            await asyncio.wait_for(pending.done.wait(), limit / 1000)
+        except asyncio.TimeoutError:
+            if pending in bus.queue:
+                bus.queue.remove(pending)
+            self._log("unit {} request timed out on the bus".format(frame.unit_id))
+        return self._finish(frame, request, pending.response, start)
+
+    async def _bus_worker(self, bus: _RTUBus) -> None:
+        while True:
+            if not bus.queue:
+                bus.event.clear()
+                await bus.event.wait()
+                continue
+            pending = bus.queue.pop(0)
+            wait = bus.gap_ms - _ticks_diff(_ticks_ms(), bus.last_ms)
+            if wait > 0:
+                await asyncio.sleep(wait / 1000)
+            try:
+                state, response = await bus.master._send_async(pending.request, self.timeout)
+                if state:
+                    pending.response = response
+            except Exception as e:
+                # answered with 0x0B, the worker keeps serving the bus
+                self._log("bus error", e)
+            finally:
+                bus.last_ms = _ticks_ms()
+                pending.done.set()
+
+    def start(self) -> None:
+        """Start the server for blocking operation with its ``tick()``."""
+        self._server.start()
+
+    def tick(self) -> None:
+        """Handle pending requests of the server (blocking)."""
+        self._server.tick()
+
+    async def serve_async(self, max_clients: int = 8) -> None:
+        """Serve TCP clients and drive all RTU buses until the server is
+        stopped.
+
+        :param int max_clients: Maximum number of simultaneous connections.
+        """
+        for bus in self._buses.values():
+            bus.task = asyncio.create_task(self._bus_worker(bus))
+        try:
+            await self._server.serve_async(max_clients=max_clients)
+        finally:
+            for bus in self._buses.values():
+                bus.task.cancel()
+                bus.task = None
+
+    def stop(self) -> None:
+        """Stop the gateway."""
+        self._server.stop()
+
+    def _log(self, *args, **kwargs) -> None:
+        if self._verbose:
+            print(*args, **kwargs)
@@ -7,7 +7,10 @@ package(
     (
         "__init__.py",
         "frame.py",
+        "gateway.py",
         "master.py",
+        "poll.py",
+        "regmap.py",
         "slave.py",
     ),
     base_path="..",
@@ -10,6 +10,8 @@
 # - modbus master (rtu) -> factory for slaves
 
 from .frame import ModbusFrame, ModbusRTUFrame, ModbusTCPFrame
+from .poll import PollPlan
+import errno
 import socket
 import time
 import math
@@ -21,6 +23,24 @@ if sys.implementation.name == "micropython":
     import machine
     import micropython
 
+    _ticks_ms = time.ticks_ms
+    _ticks_diff = time.ticks_diff
+else:
+
+    def _ticks_ms():
+        return time.monotonic_ns() // 1000000
+
+    def _ticks_diff(a, b):
+        return a - b
+
+
+def _is_timeout(e: OSError) -> bool:
+    # MicroPython raises OSError(ETIMEDOUT) or OSError(EAGAIN), CPython
+    # raises socket.timeout
+    if isinstance(e, getattr(socket, "timeout", ())):
+        return True
+    return bool(e.args) and e.args[0] in (errno.ETIMEDOUT, errno.EAGAIN)
+
 
 class ModbusMaster:
     def __init__(self, ms_type: str = "tcp") -> None:
@@ -29,6 +49,8 @@ class ModbusMaster:
         :param str ms_type: Modbus type (tcp or rtu)
         """
         self.ms_type = ms_type
+        # largest request: MBAP header (7) + FC16 PDU (6 + 246)
+        self._tx_buf = bytearray(260)
 
     def _send(self, frame: ModbusFrame, timeout: int = 2000) -> ModbusFrame:
         """MUST BE OVERRIDDEN
@@ -149,11 +171,22 @@ class ModbusMaster:
         data = self._read_registers(address, register, quantity, 3, timeout=timeout)
         if data is None:
             return []
-        res = []
-        # TODO: quantity * 2 == len(data)
-        for i in range(0, len(data), 2):
-            res.append(int.from_bytes(data[i : i + 2], "big"))
-        return res
+        return list(struct.unpack_from(">{}H".format(len(data) // 2), data))
+
+    def read_holding_registers_into(
+        self, address: int, register: int, buf, timeout: int = 2000
+    ) -> int:
+        """Read len(buf) holding registers into a preallocated buffer
+
+        :param int address: slave address
+        :param int register: start register
+        :param buf: writable sequence of integers, e.g. ``array("H", 10)``
+        :param int timeout: timeout in milliseconds
+        :returns: number of registers written to buf, -1 on error
+        :rtype: int
+        """
+        data = self._read_registers(address, register, len(buf), 3, timeout=timeout)
+        return self._decode_registers_into(data, buf)
 
     async def read_holding_registers_async(
         self, address: int, register: int, quantity: int, timeout: int = 2000
@@ -170,11 +203,22 @@ class ModbusMaster:
         data = await self._read_registers_async(address, register, quantity, 3, timeout=timeout)
         if data is None:
             return []
-        res = []
-        # TODO: quantity * 2 == len(data)
-        for i in range(0, len(data), 2):
-            res.append(int.from_bytes(data[i : i + 2], "big"))
-        return res
+        return list(struct.unpack_from(">{}H".format(len(data) // 2), data))
+
+    async def read_holding_registers_into_async(
+        self, address: int, register: int, buf, timeout: int = 2000
+    ) -> int:
+        """Read len(buf) holding registers into a preallocated buffer (async)
+
+        :param int address: slave address
+        :param int register: start register
+        :param buf: writable sequence of integers, e.g. ``array("H", 10)``
+        :param int timeout: timeout in milliseconds
+        :returns: number of registers written to buf, -1 on error
+        :rtype: int
+        """
+        data = await self._read_registers_async(address, register, len(buf), 3, timeout=timeout)
+        return self._decode_registers_into(data, buf)
 
     def read_input_registers(
         self, address: int, register: int, quantity: int, timeout: int = 2000
@@ -190,10 +234,22 @@ class ModbusMaster:
         data = self._read_registers(address, register, quantity, 4, timeout=timeout)
         if data is None:
             return []
-        res = []
-        for i in range(0, len(data), 2):
-            res.append(int.from_bytes(data[i : i + 2], "big"))
-        return res
+        return list(struct.unpack_from(">{}H".format(len(data) // 2), data))
+
+    def read_input_registers_into(
+        self, address: int, register: int, buf, timeout: int = 2000
+    ) -> int:
+        """Read len(buf) input registers into a preallocated buffer
+
+        :param int address: slave address
+        :param int register: start register
+        :param buf: writable sequence of integers, e.g. ``array("H", 10)``
+        :param int timeout: timeout in milliseconds
+        :returns: number of registers written to buf, -1 on error
+        :rtype: int
+        """
+        data = self._read_registers(address, register, len(buf), 4, timeout=timeout)
+        return self._decode_registers_into(data, buf)
 
     async def read_input_registers_async(
         self, address: int, register: int, quantity: int, timeout: int = 2000
@@ -211,10 +267,58 @@ class ModbusMaster:
         data = await self._read_registers_async(address, register, quantity, 4, timeout=timeout)
         if data is None:
             return []
-        res = []
-        for i in range(0, len(data), 2):
-            res.append(int.from_bytes(data[i : i + 2], "big"))
-        return res
+        return list(struct.unpack_from(">{}H".format(len(data) // 2), data))
+
+    async def read_input_registers_into_async(
+        self, address: int, register: int, buf, timeout: int = 2000
+    ) -> int:
+        """Read len(buf) input registers into a preallocated buffer (async)
+
+        :param int address: slave address
+        :param int register: start register
+        :param buf: writable sequence of integers, e.g. ``array("H", 10)``
+        :param int timeout: timeout in milliseconds
+        :returns: number of registers written to buf, -1 on error
+        :rtype: int
+        """
+        data = await self._read_registers_async(address, register, len(buf), 4, timeout=timeout)
+        return self._decode_registers_into(data, buf)
+
+    @staticmethod
+    def _decode_read_data(code: int, quantity: int, data) -> list:
+        """Decode the payload of a read response like the read_* methods do
+
+        :param int code: function code (1-4)
+        :param int quantity: number of coils or registers requested
+        :param data: response payload
+        :type data: memoryview or None
+        :returns: list of bool (1, 2) or int (3, 4), None if data is None
+        :rtype: list or None
+        """
+        if data is None:
+            return None
+        if code in [1, 2]:
+            if len(data) * 8 < quantity:
+                return None
+            return [data[i >> 3] & (1 << (i & 7)) != 0 for i in range(quantity)]
+        return list(struct.unpack_from(">{}H".format(len(data) // 2), data))
+
+    @staticmethod
+    def _decode_registers_into(data, buf) -> int:
+        """Decode big-endian register words into buf
+
+        :param data: response payload
+        :type data: memoryview or None
+        :param buf: writable sequence of integers
+        :returns: number of registers written to buf, -1 if data is None
+        :rtype: int
+        """
+        if data is None:
+            return -1
+        n = min(len(data) >> 1, len(buf))
+        for i in range(n):
+            buf[i] = (data[i * 2] << 8) | data[i * 2 + 1]
+        return n
 
     def _read_registers(
         self, address: int, register: int, quantity: int, code: int, timeout: int = 2000
@@ -227,39 +331,23 @@ class ModbusMaster:
         :param int code: function code
         :param int timeout: timeout in milliseconds
 
-        :returns: response
-        :rtype: bytearray
+        :returns: response payload
+        :rtype: memoryview
         """
+        buf = self._tx_buf
         if self.ms_type == "tcp":
-            f = ModbusTCPFrame(
-                transaction_id=self.ti,
-                unit_id=address,
-                func_code=code,
-                register=register,
-                fr_type="request",
-                length=quantity,
-            )
-            state, resp = self._send(f.get_frame(), timeout=timeout)
+            n = ModbusTCPFrame.encode_request_into(buf, self.ti, address, code, register, quantity)
+            state, resp = self._send(memoryview(buf)[:n], timeout=timeout)
             if state is False:
                 return None
-            resp_frame = ModbusTCPFrame.parse_frame(resp, verbose=self._verbose)
             self.ti += 1
+            return ModbusTCPFrame.decode_read_response(resp, code)
         elif self.ms_type == "rtu":
-            f = ModbusRTUFrame(
-                device_addr=address,
-                func_code=code,
-                register=register,
-                fr_type="request",
-                length=quantity,
-            )
-            state, resp = self._send(f.get_frame(), timeout=timeout)
+            n = ModbusRTUFrame.encode_request_into(buf, address, code, register, quantity)
+            state, resp = self._send(memoryview(buf)[:n], timeout=timeout)
             if state is False:
                 return None
-            resp_frame = ModbusRTUFrame.parse_frame(
-                resp, fr_type="response", verbose=self._verbose
-            )
-
-        return resp_frame.data
+            return ModbusRTUFrame.decode_read_response(resp, code)
 
     async def _read_registers_async(
         self, address: int, register: int, quantity: int, code: int, timeout: int = 2000
@@ -271,38 +359,55 @@ class ModbusMaster:
         :param int quantity: number of registers
         :param int code: function code
         :param int timeout: timeout in milliseconds
-        :returns: response
-        :rtype: bytearray
+        :returns: response payload
+        :rtype: memoryview
         """
+        buf = self._tx_buf
         if self.ms_type == "tcp":
-            f = ModbusTCPFrame(
-                transaction_id=self.ti,
-                func_code=code,
-                register=register,
-                fr_type="request",
-                length=quantity,
-            )
-            state, resp = await self._send_async(f.get_frame(), timeout=timeout)
+            n = ModbusTCPFrame.encode_request_into(buf, self.ti, address, code, register, quantity)
+            state, resp = await self._send_async(memoryview(buf)[:n], timeout=timeout)
             if state is False:
                 return None
-            resp_frame = ModbusTCPFrame.parse_frame(resp, verbose=self._verbose)
             self.ti += 1
+            return ModbusTCPFrame.decode_read_response(resp, code)
         elif self.ms_type == "rtu":
-            f = ModbusRTUFrame(
-                device_addr=address,
-                func_code=code,
-                register=register,
-                fr_type="request",
-                length=quantity,
-            )
-            state, resp = await self._send_async(f.get_frame(), timeout=timeout)
+            n = ModbusRTUFrame.encode_request_into(buf, address, code, register, quantity)
+            state, resp = await self._send_async(memoryview(buf)[:n], timeout=timeout)
             if state is False:
                 return None
-            resp_frame = ModbusRTUFrame.parse_frame(
-                resp, fr_type="response", verbose=self._verbose
+            return ModbusRTUFrame.decode_read_response(resp, code)
+
+    def poll(self, plan: PollPlan, timeout: int = 2000) -> dict:
+        """Read all tags of a poll plan
+
+        :param PollPlan plan: the poll plan, see :class:`PollPlan`
+        :param int timeout: timeout in milliseconds per request
+        :returns: tag name to value, None for tags whose request failed
+        :rtype: dict
+        """
+        values = {}
+        for req in plan.requests:
+            data = self._read_registers(
+                req.slave, req.start, req.count, req.func_code, timeout=timeout
             )
+            plan.decode(req, data, values)
+        return values
 
-        return resp_frame.data
+    async def poll_async(self, plan: PollPlan, timeout: int = 2000) -> dict:
+        """Read all tags of a poll plan (async)
+
+        :param PollPlan plan: the poll plan, see :class:`PollPlan`
+        :param int timeout: timeout in milliseconds per request
+        :returns: tag name to value, None for tags whose request failed
+        :rtype: dict
+        """
+        values = {}
+        for req in plan.requests:
+            data = await self._read_registers_async(
+                req.slave, req.start, req.count, req.func_code, timeout=timeout
+            )
+            plan.decode(req, data, values)
+        return values
 
     def write_single_coil(
         self, address: int, register: int, value: bool or int or str, timeout: int = 2000
@@ -497,48 +602,18 @@ class ModbusMaster:
         :rtype: bytearray or int
         :raises: ValueError if value can't be written
         """
-        f = None
+        buf = self._tx_buf
+        if code in [0x05, 0x06]:
+            quantity = None
         if self.ms_type == "tcp":
-            if code in [0x05, 0x06]:
-                f = ModbusTCPFrame(
-                    transaction_id=self.ti,
-                    unit_id=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                )
-            if code in [0x0F, 0x10]:
-                f = ModbusTCPFrame(
-                    transaction_id=self.ti,
-                    unit_id=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                    length=quantity,
-                )
+            n = ModbusTCPFrame.encode_request_into(
+                buf, self.ti, address, code, register, quantity, value
+            )
             self.ti += 1
         elif self.ms_type == "rtu":
-            if code in [0x05, 0x06]:
-                f = ModbusRTUFrame(
-                    device_addr=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                )
-            if code in [0x0F, 0x10]:
-                f = ModbusRTUFrame(
-                    device_addr=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                    length=quantity,
-                )
+            n = ModbusRTUFrame.encode_request_into(buf, address, code, register, quantity, value)
 
-        state, resp = self._send(f.get_frame(), timeout=timeout)
+        state, resp = self._send(memoryview(buf)[:n], timeout=timeout)
         if state is False:
             return None
 
@@ -598,48 +673,18 @@ class ModbusMaster:
         :rtype: bytearray or int
         :raises: ValueError if value can't be written
         """
-        f = None
+        buf = self._tx_buf
+        if code in [0x05, 0x06]:
+            quantity = None
         if self.ms_type == "tcp":
-            if code in [0x05, 0x06]:
-                f = ModbusTCPFrame(
-                    transaction_id=self.ti,
-                    unit_id=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                )
-            if code in [0x0F, 0x10]:
-                f = ModbusTCPFrame(
-                    transaction_id=self.ti,
-                    unit_id=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                    length=quantity,
-                )
+            n = ModbusTCPFrame.encode_request_into(
+                buf, self.ti, address, code, register, quantity, value
+            )
             self.ti += 1
         elif self.ms_type == "rtu":
-            if code in [0x05, 0x06]:
-                f = ModbusRTUFrame(
-                    device_addr=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                )
-            if code in [0x0F, 0x10]:
-                f = ModbusRTUFrame(
-                    device_addr=address,
-                    func_code=code,
-                    register=register,
-                    fr_type="request",
-                    data=value,
-                    length=quantity,
-                )
+            n = ModbusRTUFrame.encode_request_into(buf, address, code, register, quantity, value)
 
-        state, resp = await self._send_async(f.get_frame(), timeout=timeout)
+        state, resp = await self._send_async(memoryview(buf)[:n], timeout=timeout)
         if state is False:
             return None
 
@@ -689,64 +734,319 @@ class ModbusTCPClient(ModbusMaster):
         self.ti = 1
         self._verbose = verbose
         self.exception_cb = None
+        self._rx = bytearray()
+        self._reader = None
+        self._writer = None
         super(ModbusTCPClient, self).__init__(ms_type="tcp")
 
+    def _pop_frame(self) -> bytearray:
+        """Take one complete MBAP frame from the receive buffer
+
+        TCP may split a frame over several reads or deliver several frames in
+        one read, so received bytes are collected in self._rx and cut at the
+        length given in the MBAP header. A header with a protocol id other
+        than 0 or an impossible length means the stream is out of step, then
+        the whole buffer is dropped.
+
+        :returns: frame or None if no complete frame has been received yet
+        :rtype: bytearray or None
+        """
+        rx = self._rx
+        if len(rx) < 6:
+            return None
+        length = (rx[4] << 8) | rx[5]
+        if rx[2] or rx[3] or not 2 <= length <= 254:
+            self._verbose and print("Dropped {} bytes of an invalid MBAP frame".format(len(rx)))
+            self._rx = bytearray()
+            return None
+        n = 6 + length
+        if len(rx) < n:
+            return None
+        frame = rx[:n]
+        rx[:n] = b""
+        return frame
+
+    def _recv_frame(self, timeout: int = 2000) -> bytearray:
+        """Receive one complete MBAP frame
+
+        :param int timeout: timeout in milliseconds
+        :returns: frame or None on timeout
+        :rtype: bytearray or None
+        :raises: OSError if the connection was closed or failed
+        """
+        deadline = _ticks_ms() + timeout
+        # MicroPython sockets have no gettimeout(), they are blocking here
+        prev_timeout = self.sock.gettimeout() if hasattr(self.sock, "gettimeout") else None
+        while True:
+            frame = self._pop_frame()
+            if frame is not None:
+                return frame
+            remaining = _ticks_diff(deadline, _ticks_ms())
+            if remaining <= 0:
+                # a partial frame would be read as the start of the next one
+                self._rx = bytearray()
+                return None
+            self.sock.settimeout(remaining / 1000)
+            try:
+                chunk = self.sock.recv(260)
+            except OSError as e:
+                if _is_timeout(e):
+                    self._rx = bytearray()
+                    return None
+                raise
+            finally:
+                self.sock.settimeout(prev_timeout)
+            if not chunk:
+                raise OSError("connection closed")
+            self._rx.extend(chunk)
+
+    async def _recv_frame_async(self, timeout: int = 2000) -> bytearray:
+        """Receive one complete MBAP frame (async)
+
+        :param int timeout: timeout in milliseconds
+        :returns: frame or None on timeout
+        :rtype: bytearray or None
+        :raises: OSError if the connection was closed
+        """
+        while True:
+            frame = self._pop_frame()
+            if frame is not None:
+                return frame
+            try:
+                chunk = await asyncio.wait_for(self._reader.read(260), timeout / 1000)
+            except asyncio.TimeoutError:
+                # a partial frame would be read as the start of the next one
+                self._rx = bytearray()
+                return None
+            if not chunk:
+                raise OSError("connection closed")
+            self._rx.extend(chunk)
+
     def _send(self, frame: bytearray, timeout: int = 2000) -> bytearray:
         """Send a frame an return the resonse
 
-        Args:
-            frame (bytearray): data to send
+        Responses with a different transaction id (late answers to requests
+        that timed out) are dropped, the timeout covers them too.
 
-        Returns:
-            bytearray: response
+        :param bytearray frame: data to send
+        :param int timeout: timeout in milliseconds
+        :returns: (state, response)
+        :rtype: tuple
         """
-        # self.sock.settimeout(timeout / 1000)
+        tid = (frame[0] << 8) | frame[1]
+        deadline = _ticks_ms() + timeout
         self.sock.send(frame)
-        resp = self.sock.recv(256)
-        state = self._exit_read(resp)
-        return (state, resp)
-
-    def _exit_read(self, response: bytearray) -> bool:
-        response_len = len(response)
-        if response_len >= 2 and response[1] >= 0x80:
-            if response_len < 0x05:
-                return False
-        elif response_len >= 3 and (0x01 <= response[1] <= 0x04):
-            expected_len = (
-                1 + 1 + 1 + response[2] + 2
-            )  # address + function code + byte count + data + crc
-            if response_len < expected_len:
-                return False
-        elif response_len < 0x08:
-            return False
-
-        return True
+        while True:
+            remaining = _ticks_diff(deadline, _ticks_ms())
+            if remaining <= 0:
+                return (False, b"")
+            resp = self._recv_frame(remaining)
+            if resp is None:
+                return (False, b"")
+            if (resp[0] << 8) | resp[1] == tid:
+                return (True, resp)
 
     async def _send_async(self, frame: bytearray, timeout: int = 2000) -> bytearray:
         """Send a frame an return the resonse (async)
 
         :param bytearray frame: data to send
         :param int timeout: timeout in milliseconds
-        :returns: response
-        :rtype: bytearray
+        :returns: (state, response)
+        :rtype: tuple
         """
-        loop = asyncio.get_event_loop()
-        self.sock.send(frame)
-        resp = await loop.sock_recv(self.sock, 256)
-        state = self._exit_read(resp)
-        return (state, resp)
+        if self._writer is None:
+            loop = asyncio.get_event_loop()
+            self.sock.send(frame)
+            resp = await loop.sock_recv(self.sock, 256)
+            return (len(resp) >= 9, resp)
+
+        tid = (frame[0] << 8) | frame[1]
+        deadline = _ticks_ms() + timeout
+        self._writer.write(frame)
+        await self._writer.drain()
+        while True:
+            remaining = _ticks_diff(deadline, _ticks_ms())
+            if remaining <= 0:
+                return (False, b"")
+            resp = await self._recv_frame_async(remaining)
+            if resp is None:
+                return (False, b"")
+            if (resp[0] << 8) | resp[1] == tid:
+                return (True, resp)
+
+    def _send_pipelined(self, req: tuple) -> int:
+        """Encode and send one read request of a pipeline
+
+        :param tuple req: (address, function code, register, quantity)
+        :returns: transaction id of the request
+        :rtype: int
+        """
+        address, code, register, quantity = req
+        tid = self.ti & 0xFFFF
+        self.ti += 1
+        buf = self._tx_buf
+        n = ModbusTCPFrame.encode_request_into(buf, tid, address, code, register, quantity)
+        if self._writer is not None:
+            self._writer.write(memoryview(buf)[:n])
+        else:
+            self.sock.send(memoryview(buf)[:n])
+        return tid
+
+    def _complete_pipelined(self, frame, pending: dict, results: list, raw: bool) -> None:
+        """Match a response to its request by transaction id
+
+        :param frame: received frame
+        :param dict pending: transaction id to (index, function code, quantity, start ticks)
+        :param list results: (values, latency) per request
+        :param bool raw: store the undecoded payload instead of values
+        """
+        req = pending.pop((frame[0] << 8) | frame[1], None)
+        if req is None:
+            # late answer of a request that already timed out
+            return
+        index, code, quantity, start = req
+        data = ModbusTCPFrame.decode_read_response(frame, code)
+        if not raw:
+            data = self._decode_read_data(code, quantity, data)
+        results[index] = (data, _ticks_diff(_ticks_ms(), start))
+
+    def read_pipelined(self, requests: list, window: int = 4, timeout: int = 2000) -> list:
+        """Read several ranges with up to window requests in flight
+
+        Instead of waiting for each response before sending the next
+        request, up to window requests are sent on the connection and the
+        responses are matched by MBAP transaction id. This hides the network
+        round trip time when polling many ranges.
+
+        :param list requests: (address, function code, register, quantity)
+                              tuples, function code 1-4
+        :param int window: maximum number of requests in flight
+        :param int timeout: timeout in milliseconds for each response
+        :returns: (values, latency in milliseconds) per request in request
+                  order, values is a list like the read_* methods return and
+                  None if the request failed or timed out
+        :rtype: list
+        """
+        return self._pipeline(requests, window, timeout, False)
+
+    def _pipeline(self, requests: list, window: int, timeout: int, raw: bool) -> list:
+        results = [(None, -1)] * len(requests)
+        pending = {}
+        nxt = 0
+        while nxt < len(requests) or pending:
+            while nxt < len(requests) and len(pending) < window:
+                tid = self._send_pipelined(requests[nxt])
+                pending[tid] = (nxt, requests[nxt][1], requests[nxt][3], _ticks_ms())
+                nxt += 1
+            frame = self._recv_frame(timeout)
+            if frame is None:
+                pending.clear()
+                continue
+            self._complete_pipelined(frame, pending, results, raw)
+        return results
+
+    async def read_pipelined_async(
+        self, requests: list, window: int = 4, timeout: int = 2000
+    ) -> list:
+        """Read several ranges with up to window requests in flight (async)
+
+        Requires a connection made with :meth:`connect_async`.
+
+        :param list requests: (address, function code, register, quantity)
+                              tuples, function code 1-4
+        :param int window: maximum number of requests in flight
+        :param int timeout: timeout in milliseconds for each response
+        :returns: (values, latency in milliseconds) per request in request order
+        :rtype: list
+        """
+        return await self._pipeline_async(requests, window, timeout, False)
+
+    async def _pipeline_async(self, requests: list, window: int, timeout: int, raw: bool) -> list:
+        results = [(None, -1)] * len(requests)
+        pending = {}
+        nxt = 0
+        while nxt < len(requests) or pending:
+            while nxt < len(requests) and len(pending) < window:
+                tid = self._send_pipelined(requests[nxt])
+                pending[tid] = (nxt, requests[nxt][1], requests[nxt][3], _ticks_ms())
+                nxt += 1
+            await self._writer.drain()
+            frame = await self._recv_frame_async(timeout)
+            if frame is None:
+                pending.clear()
+                continue
+            self._complete_pipelined(frame, pending, results, raw)
+        return results
+
+    def poll(self, plan: PollPlan, timeout: int = 2000, window: int = 1) -> dict:
+        """Read all tags of a poll plan
+
+        :param PollPlan plan: the poll plan, see :class:`PollPlan`
+        :param int timeout: timeout in milliseconds per request
+        :param int window: if greater than 1, pipeline up to window requests
+        :returns: tag name to value, None for tags whose request failed
+        :rtype: dict
+        """
+        if window <= 1:
+            return super(ModbusTCPClient, self).poll(plan, timeout=timeout)
+        results = self._pipeline(
+            [(r.slave, r.func_code, r.start, r.count) for r in plan.requests],
+            window,
+            timeout,
+            True,
+        )
+        return self._decode_poll(plan, results)
+
+    async def poll_async(self, plan: PollPlan, timeout: int = 2000, window: int = 1) -> dict:
+        """Read all tags of a poll plan (async)
+
+        :param PollPlan plan: the poll plan, see :class:`PollPlan`
+        :param int timeout: timeout in milliseconds per request
+        :param int window: if greater than 1, pipeline up to window requests
+        :returns: tag name to value, None for tags whose request failed
+        :rtype: dict
+        """
+        if window <= 1 or self._writer is None:
+            return await super(ModbusTCPClient, self).poll_async(plan, timeout=timeout)
+        results = await self._pipeline_async(
+            [(r.slave, r.func_code, r.start, r.count) for r in plan.requests],
+            window,
+            timeout,
+            True,
+        )
+        return self._decode_poll(plan, results)
+
+    @staticmethod
+    def _decode_poll(plan: PollPlan, results: list) -> dict:
+        values = {}
+        for req, (data, _) in zip(plan.requests, results):
+            plan.decode(req, data, values)
+        return values
 
     def connect(self):
         """Connect socket"""
         if not self.connected:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.host, self.port))
+            self._rx = bytearray()
+            self.connected = True
+
+    async def connect_async(self):
+        """Connect with asyncio streams, used by the async methods"""
+        if not self.connected:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            self._rx = bytearray()
             self.connected = True
 
     def disconnect(self):
         """Disconnect socket"""
         if self.connected:
-            self.sock.close()
+            if self._writer is not None:
+                self._writer.close()
+                self._reader = None
+                self._writer = None
+            else:
+                self.sock.close()
             self.connected = False
 
 
@@ -832,7 +1132,7 @@ class _CModbusRTUMaster(ModbusMaster):
             if self.uart.inWaiting() > 0:
                 data = self.uart.read(1)
                 if startpos == -1:
-                    startpos = data.find(frame[0:1])
+                    startpos = 0 if data[0] == frame[0] else -1
                     response.extend(data)
                     continue
                 response.extend(data)
@@ -865,7 +1165,7 @@ class _CModbusRTUMaster(ModbusMaster):
             if self.uart.inWaiting() > 0:
                 data = self.uart.read(1)
                 if startpos == -1:
-                    startpos = data.find(frame[0:1])
+                    startpos = 0 if data[0] == frame[0] else -1
                     response.extend(data)
                     continue
                 response.extend(data)
@@ -992,7 +1292,7 @@ class _MModbusRTUMaster(ModbusMaster):
             if self.uart.any() > 0:
                 data = self.uart.read(1)
                 if startpos == -1:
-                    startpos = data.find(frame[0:1])
+                    startpos = 0 if data[0] == frame[0] else -1
                     response.extend(data)
                     continue
                 response.extend(data)
@@ -1025,7 +1325,7 @@ class _MModbusRTUMaster(ModbusMaster):
             if self.uart.any() > 0:
                 data = self.uart.read(1)
                 if startpos == -1:
-                    startpos = data.find(frame[0:1])
+                    startpos = 0 if data[0] == frame[0] else -1
                     response.extend(data)
                     continue
                 response.extend(data)
@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import struct
+
+# Maximum quantity of registers in one FC03/FC04 request
+MAX_READ_REGISTERS = 125
+
+_TABLES = {
+    "holding_registers": 0x03,
+    "input_registers": 0x04,
+}
+
+# type: (number of registers, struct format)
+_TYPES = {
+    "uint16": (1, ">H"),
+    "int16": (1, ">h"),
+    "uint32": (2, ">I"),
+    "int32": (2, ">i"),
+    "float32": (2, ">f"),
+}
+
+
+class PollRequest:
+    def __init__(self, slave: int, func_code: int, start: int) -> None:
+        """One read request of a poll plan.
+
+        :param int slave: Slave address
+        :param int func_code: 0x03 or 0x04
+        :param int start: First register
+        """
+        self.slave = slave
+        self.func_code = func_code
+        self.start = start
+        self.count = 0
+        self.tags = []
+
+    def __repr__(self) -> str:
+        return "<PollRequest slave={} fc={} start={} count={} tags={}>".format(
+            self.slave, self.func_code, self.start, self.count, len(self.tags)
+        )
+
+
+class PollPlan:
+    def __init__(self, tags: list, max_gap: int = 8) -> None:
+        """Plan the minimal number of register reads for a list of tags.
+
+        Every tag is a dict with the keys:
+
+        - ``name``: key of the value in the result dict
+        - ``slave``: slave address, defaults to 1
+        - ``table``: ``"holding_registers"`` (default) or ``"input_registers"``
+        - ``address``: first register of the value
+        - ``type``: ``"uint16"`` (default), ``"int16"``, ``"uint32"``, ``"int32"``
+          or ``"float32"``
+        - ``word_order``: ``"big"`` (default, high word first) or ``"little"``
+
+        Tags of the same slave and table are merged into one request as long
+        as the request spans at most 125 registers and the hole between two
+        tags is at most max_gap registers.
+
+        :param list tags: Tag definitions.
+        :param int max_gap: Unused registers that may be read to merge tags.
+        :raises: ValueError if a tag is invalid
+        """
+        self.max_gap = max_gap
+        self.requests = []
+        groups = {}
+        for tag in tags:
+            table = tag.get("table", "holding_registers")
+            if table not in _TABLES:
+                raise ValueError("{} is Invalid table of {}".format(table, tuple(_TABLES)))
+            typ = tag.get("type", "uint16")
+            if typ not in _TYPES:
+                raise ValueError("{} is Invalid type of {}".format(typ, tuple(_TYPES)))
+            word_order = tag.get("word_order", "big")
+            if word_order not in ("big", "little"):
+                raise ValueError("{} is Invalid word order".format(word_order))
+            size = _TYPES[typ][0]
+            key = (tag.get("slave", 1), _TABLES[table])
+            groups.setdefault(key, []).append(
+                (tag["address"], size, tag["name"], typ, word_order == "little")
+            )
+
+        for (slave, func_code), items in groups.items():
+            items.sort(key=lambda item: item[0])
+            req = None
+            for address, size, name, typ, swap in items:
+                end = address + size
+                if (
+                    req is None
+                    or address - (req.start + req.count) > max_gap
+                    or end - req.start > MAX_READ_REGISTERS
+                ):
+                    req = PollRequest(slave, func_code, address)
+                    self.requests.append(req)
+                req.count = max(req.count, end - req.start)
+                req.tags.append((name, address - req.start, typ, swap))
+
+    def decode(self, req: PollRequest, data, values: dict) -> None:
+        """Decode the response of one request into values.
+
+        :param PollRequest req: The request.
+        :param data: Response payload, None if the request failed.
+        :param dict values: Result dict, failed tags are set to None.
+        """
+        if data is None or len(data) < req.count * 2:
+            for tag in req.tags:
+                values[tag[0]] = None
+            return
+        for name, offset, typ, swap in req.tags:
+            size, fmt = _TYPES[typ]
+            pos = offset * 2
+            if size == 2 and swap:
+                word = bytes((data[pos + 2], data[pos + 3], data[pos], data[pos + 1]))
+                values[name] = struct.unpack(fmt, word)[0]
+            else:
+                values[name] = struct.unpack_from(fmt, data, pos)[0]
@@ -0,0 +1,270 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import struct
+from array import array
+
+
+class RegisterMap:
+    def __init__(self, bits: bool = False, regs: list = None) -> None:
+        """Compact storage for one modbus register table.
+
+        Registers are kept as sorted, non-overlapping blocks of consecutive
+        addresses. Every block stores its values in an ``array('H')`` (16 bit
+        registers) or a ``bytearray`` with one byte per coil/discrete input,
+        so lookups are a binary search over the block start addresses instead
+        of a scan over a list of dicts.
+
+        :param bool bits: True for coils/discrete inputs, False for registers.
+        :param list regs: Initial blocks in context format
+                          ``[{"register": int, "value": [...]}, ...]``.
+        """
+        self.bits = bits
+        self._starts = []
+        self._blocks = []
+        if regs:
+            self.load(regs)
+
+    def _new_block(self, values) -> "array or bytearray":
+        if self.bits:
+            return bytearray([1 if v else 0 for v in values])
+        return array("H", values)
+
+    def _find(self, register: int) -> int:
+        """Return the index of the last block starting at or before register.
+
+        :param int register: Register address
+        :returns: Block index, -1 if register is before the first block
+        :rtype: int
+        """
+        starts = self._starts
+        lo = 0
+        hi = len(starts)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if starts[mid] <= register:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def _locate(self, register: int, length: int = 1) -> tuple:
+        """Find the block holding register .. register + length - 1.
+
+        :param int register: Starting register address
+        :param int length: Number of registers
+        :returns: (block, offset) or (None, 0) if the range is not mapped
+        :rtype: tuple
+        """
+        i = self._find(register)
+        if i < 0:
+            return None, 0
+        block = self._blocks[i]
+        offset = register - self._starts[i]
+        if offset + length > len(block):
+            return None, 0
+        return block, offset
+
+    def _merge_next(self, i: int) -> None:
+        starts = self._starts
+        if i + 1 < len(starts) and starts[i] + len(self._blocks[i]) == starts[i + 1]:
+            self._blocks[i].extend(self._blocks[i + 1])
+            del starts[i + 1]
+            del self._blocks[i + 1]
+
+    def load(self, regs: list) -> None:
+        """Replace the content with blocks in context format.
+
+        :param list regs: ``[{"register": int, "value": [...]}, ...]``
+        """
+        self._starts = []
+        self._blocks = []
+        for reg in sorted(regs, key=lambda r: r["register"]):
+            start = reg["register"]
+            if len(reg["value"]) == 0:
+                continue
+            self._starts.append(start)
+            self._blocks.append(self._new_block(reg["value"]))
+            if len(self._starts) > 1:
+                self._merge_next(len(self._starts) - 2)
+
+    def export(self) -> list:
+        """Return the content in context format.
+
+        :returns: ``[{"register": int, "value": [...]}, ...]``
+        :rtype: list
+        """
+        regs = []
+        for start, block in zip(self._starts, self._blocks):
+            if self.bits:
+                value = [v != 0 for v in block]
+            else:
+                value = list(block)
+            regs.append({"register": start, "value": value})
+        return regs
+
+    def add(self, register: int, value) -> None:
+        """Add or overwrite a single register, merging adjacent blocks.
+
+        :param int register: Register address
+        :param value: Register value
+        """
+        if self.bits:
+            value = 1 if value else 0
+        i = self._find(register)
+        if i >= 0:
+            block = self._blocks[i]
+            offset = register - self._starts[i]
+            if offset < len(block):
+                block[offset] = value
+                return
+            if offset == len(block):
+                block.append(value)
+                self._merge_next(i)
+                return
+        self._starts.insert(i + 1, register)
+        self._blocks.insert(i + 1, self._new_block([value]))
+        self._merge_next(i + 1)
+
+    def remove(self, register: int) -> None:
+        """Remove a single register, splitting its block if needed.
+
+        :param int register: Register address
+        """
+        i = self._find(register)
+        if i < 0:
+            return
+        block = self._blocks[i]
+        offset = register - self._starts[i]
+        if offset >= len(block):
+            return
+        if len(block) == 1:
+            del self._starts[i]
+            del self._blocks[i]
+        elif offset == 0:
+            self._starts[i] += 1
+            self._blocks[i] = block[1:]
+        elif offset == len(block) - 1:
+            self._blocks[i] = block[:offset]
+        else:
+            self._blocks[i] = block[:offset]
+            self._starts.insert(i + 1, register + 1)
+            self._blocks.insert(i + 1, block[offset + 1 :])
+
+    def contains(self, register: int, length: int = 1) -> bool:
+        """Check if a register range lies within one mapped block.
+
+        :param int register: Starting register address
+        :param int length: Number of registers
+        :rtype: bool
+        """
+        return self._locate(register, length)[0] is not None
+
+    def get(self, register: int):
+        """Get a single register value.
+
+        :param int register: Register address
+        :returns: bool for bit tables, int otherwise
+        :raises: KeyError if register is not mapped
+        """
+        block, offset = self._locate(register)
+        if block is None:
+            raise KeyError("Register {} not found in context".format(register))
+        if self.bits:
+            return block[offset] != 0
+        return block[offset]
+
+    def get_block(self, register: int, length: int) -> list:
+        """Get a range of register values.
+
+        :param int register: Starting register address
+        :param int length: Number of registers
+        :returns: list of values
+        :rtype: list
+        :raises: KeyError if the range is not mapped
+        """
+        block, offset = self._locate(register, length)
+        if block is None:
+            raise KeyError("Register {} not found in context".format(register))
+        if self.bits:
+            return [v != 0 for v in block[offset : offset + length]]
+        return list(block[offset : offset + length])
+
+    def set(self, register: int, value) -> None:
+        """Set a single existing register.
+
+        :param int register: Register address
+        :param value: Register value
+        :raises: KeyError if register is not mapped
+        """
+        block, offset = self._locate(register)
+        if block is None:
+            raise KeyError("Register {} not found in context".format(register))
+        if self.bits:
+            value = 1 if value else 0
+        block[offset] = value
+
+    def set_block(self, register: int, values) -> None:
+        """Set consecutive existing registers starting at register.
+
+        Values beyond the end of the block holding register are ignored.
+
+        :param int register: Starting register address
+        :param values: Values to write
+        :raises: KeyError if register is not mapped
+        """
+        block, offset = self._locate(register)
+        if block is None:
+            raise KeyError("Register {} not found in context".format(register))
+        n = min(len(values), len(block) - offset)
+        if self.bits:
+            for i in range(n):
+                block[offset + i] = 1 if values[i] else 0
+        else:
+            for i in range(n):
+                block[offset + i] = values[i]
+
+    def pack(self, register: int, length: int) -> bytearray:
+        """Encode a register range as modbus response payload.
+
+        Bit tables are packed LSB first into bytes, register tables are
+        encoded as big-endian 16 bit words.
+
+        :param int register: Starting register address
+        :param int length: Number of registers
+        :returns: payload, None if the range is not mapped
+        :rtype: bytearray or None
+        """
+        block, offset = self._locate(register, length)
+        if block is None:
+            return None
+        if self.bits:
+            res = bytearray((length + 7) >> 3)
+            for i in range(length):
+                if block[offset + i]:
+                    res[i >> 3] |= 1 << (i & 7)
+            return res
+        res = bytearray(length * 2)
+        struct.pack_into(">{}H".format(length), res, 0, *block[offset : offset + length])
+        return res
+
+    def unpack_into(self, register: int, length: int, data) -> bool:
+        """Decode a modbus request payload directly into the mapped range.
+
+        :param int register: Starting register address
+        :param int length: Number of registers
+        :param data: bit-packed bytes (bit tables) or big-endian words
+        :returns: False if the range is not mapped
+        :rtype: bool
+        """
+        block, offset = self._locate(register, length)
+        if block is None:
+            return False
+        if self.bits:
+            for i in range(length):
+                block[offset + i] = (data[i >> 3] >> (i & 7)) & 0x01
+        else:
+            for i in range(length):
+                block[offset + i] = (data[i * 2] << 8) | data[i * 2 + 1]
+        return True
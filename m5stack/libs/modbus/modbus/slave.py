@@ -9,11 +9,10 @@
 # - documentation
 
 from .frame import ModbusRTUFrame, ModbusTCPFrame
+from .regmap import RegisterMap
 import socket
-import math
 import asyncio
 import sys
-import struct
 import time
 import select
 
@@ -38,6 +37,11 @@ class ModbusSlave:
         "input_registers",
     )
 
+    _bit_register_types = (
+        "coils",
+        "discrete_inputs",
+    )
+
     _FUNCTION_MAP = {
         1: "coils",
         2: "discrete_inputs",
@@ -61,19 +65,21 @@ class ModbusSlave:
         :param bool verbose: Enable verbose logging
         """
         self.sl_type = sl_type
-        self.context = context
         self.ignore_unit_id = ignore_unit_id
         self._device_address = device_address
         self._verbose = verbose
         self.forward_message = None
+        self.forward_message_async = None
         self.stopped = False
+        self._tx_buf = bytearray(260)
         if context is None:
-            self.context = {
+            context = {
                 "discrete_inputs": [],
                 "coils": [],
                 "input_registers": [],
                 "holding_registers": [],
             }
+        self.context = context
         self.cb = {
             0x02: None,  # Read Discrete Inputs
             0x01: None,  # Read Coils
@@ -98,12 +104,39 @@ class ModbusSlave:
         """
         self.cb[event] = callback
 
-    def _add_register_in_context(self, reg_type, register, value):
-        """Add a register to the context
+    @property
+    def context(self) -> dict:
+        """Register context in dict format
+
+        The registers are stored in a :class:`RegisterMap` per register type,
+        the dict format ``{"coils": [{"register": 0, "value": [...]}], ...}``
+        is only used to import and export the registers. Modifying the
+        returned dict has no effect on the slave.
+
+        :returns: Register context or None if no context is set
+        :rtype: dict or None
+        """
+        if self._maps is None:
+            return None
+        return {reg_type: regs.export() for reg_type, regs in self._maps.items()}
+
+    @context.setter
+    def context(self, context: dict) -> None:
+        if context is None:
+            self._maps = None
+            return
+        self._maps = {}
+        for reg_type, regs in context.items():
+            if reg_type in self._available_register_types:
+                self._maps[reg_type] = RegisterMap(reg_type in self._bit_register_types, regs)
+
+    def _get_map(self, reg_type: str, create: bool = False) -> RegisterMap:
+        """Get the register map of a register type
 
         :param str reg_type: Type of register (coils, discrete_inputs, holding_registers, input_registers)
-        :param int register: Register address
-        :param value: Value to add
+        :param bool create: Create the register map if it does not exist
+        :returns: Register map
+        :rtype: RegisterMap
         :raises: KeyError if register type is invalid
         """
         if reg_type not in self._available_register_types:
@@ -112,41 +145,16 @@ class ModbusSlave:
                     reg_type, self._available_register_types
                 )
             )
+        if self._maps is None:
+            self._maps = {}
+        if create and reg_type not in self._maps:
+            self._maps[reg_type] = RegisterMap(reg_type in self._bit_register_types)
+        return self._maps[reg_type]
 
-        added = False
-        for reg in self.context[reg_type]:
-            if reg["register"] <= register < reg["register"] + len(reg["value"]):
-                # if register exists in the context
-                idx = register - reg["register"]
-                reg["value"][idx] = value
-                added = True
-            elif reg["register"] + 1 == register:
-                # if register is at the end of the context
-                reg["value"].append(value)
-                added = True
-
-        if not added:
-            # if register is not in the context
-            self.context[reg_type].append({"register": register, "value": [value]})
-
-        # sort the registers in the context
-        regs = self.context[reg_type]
-        for i in range(len(regs)):
-            for j in range(len(regs)):
-                if regs[i]["register"] < regs[j]["register"]:
-                    regs[i], regs[j] = regs[j], regs[i]
-
-        # Merge registers with consecutive addresses
-        for i in range(len(regs) - 1, -1, -1):
-            if regs[i]["register"] == regs[i - 1]["register"] + len(regs[i - 1]["value"]):
-                regs[i - 1]["value"].extend(regs[i]["value"])
-                regs.pop(i)
-
-    def _remove_register_from_context(self, reg_type, register):
-        """Remove a register from the context
+    def _has_map(self, reg_type: str) -> bool:
+        """Check if a register type has a register map, without creating it
 
         :param str reg_type: Type of register (coils, discrete_inputs, holding_registers, input_registers)
-        :param int register: Register address
         :raises: KeyError if register type is invalid
         """
         if reg_type not in self._available_register_types:
@@ -155,38 +163,29 @@ class ModbusSlave:
                     reg_type, self._available_register_types
                 )
             )
+        return self._maps is not None and reg_type in self._maps
 
-        new_regs = []
-        regs = self.context[reg_type]
-        for i in range(len(regs) - 1, -1, -1):
-            quantity = len(regs[i]["value"])
-            if regs[i]["register"] <= register < regs[i]["register"] + quantity:
-                idx = register - regs[i]["register"]
-                if quantity == 1:
-                    del regs[i]
-                elif idx == 0:
-                    regs[i]["register"] += 1
-                    regs[i]["value"].pop(0)
-                elif idx == quantity - 1:
-                    regs[i]["value"].pop(-1)
-                elif 0 < idx < quantity - 1:
-                    new_regs.append(
-                        {"register": regs[i]["register"], "value": regs[i]["value"][0:idx]}
-                    )
-                    new_regs.append(
-                        {
-                            "register": regs[i]["register"] + idx + 1,
-                            "value": regs[i]["value"][idx + 1 :],
-                        }
-                    )
-                    del regs[i]
+    def _add_register_in_context(self, reg_type, register, value):
+        """Add a register to the context
+
+        :param str reg_type: Type of register (coils, discrete_inputs, holding_registers, input_registers)
+        :param int register: Register address
+        :param value: Value to add
+        :raises: KeyError if register type is invalid
+        """
+        self._get_map(reg_type, create=True).add(register, value)
+
+    def _remove_register_from_context(self, reg_type, register):
+        """Remove a register from the context
 
-        regs.extend(new_regs)
-        # sort the registers in the context
-        for i in range(len(regs)):
-            for j in range(len(regs)):
-                if regs[i]["register"] < regs[j]["register"]:
-                    regs[i], regs[j] = regs[j], regs[i]
+        :param str reg_type: Type of register (coils, discrete_inputs, holding_registers, input_registers)
+        :param int register: Register address
+        :raises: KeyError if register type is invalid
+        """
+        if not self._has_map(reg_type):
+            # nothing to remove, and no empty map in the exported context
+            return
+        self._get_map(reg_type).remove(register)
 
     def add_coil(self, register: int, value: bool) -> None:
         """Add a coil to the modbus register dictionary
@@ -256,19 +255,7 @@ class ModbusSlave:
         :returns: Register value
         :raises: KeyError if register type is invalid or register not found
         """
-        if reg_type not in self._available_register_types:
-            raise KeyError(
-                "{} is Invalid register type of {}".format(
-                    reg_type, self._available_register_types
-                )
-            )
-
-        for reg in self.context[reg_type]:
-            if reg["register"] <= register < reg["register"] + len(reg["value"]):
-                idx = register - reg["register"]
-                return reg["value"][idx]
-
-        raise KeyError("Register {} not found in context".format(register))
+        return self._get_map(reg_type).get(register)
 
     def _set_reg_data(self, reg_type, register, value):
         """Set register data in context
@@ -278,20 +265,7 @@ class ModbusSlave:
         :param value: Value to set
         :raises: KeyError if register type is invalid or register not found
         """
-        if reg_type not in self._available_register_types:
-            raise KeyError(
-                "{} is Invalid register type of {}".format(
-                    reg_type, self._available_register_types
-                )
-            )
-
-        for reg in self.context[reg_type]:
-            if reg["register"] <= register < reg["register"] + len(reg["value"]):
-                idx = register - reg["register"]
-                reg["value"][idx] = value
-                return
-
-        raise KeyError("Register {} not found in context".format(register))
+        self._get_map(reg_type).set(register, value)
 
     def _set_reg_datablock(self, reg_type: str, register: int, block: list):
         """Set multiple register data in context
@@ -301,24 +275,7 @@ class ModbusSlave:
         :param list block: List of values to set
         :raises: KeyError if register type is invalid or register not found
         """
-        if reg_type not in self._available_register_types:
-            raise KeyError(
-                "{} is Invalid register type of {}".format(
-                    reg_type, self._available_register_types
-                )
-            )
-
-        for reg in self.context[reg_type]:
-            if reg["register"] <= register < reg["register"] + len(reg["value"]):
-                idx = register - reg["register"]
-                for i in range(idx, idx + len(block)):
-                    reg["value"][i] = block[i - idx]
-                # for new_value in block:
-                #     reg["value"][idx] = new_value
-                #     idx += 1
-                return
-
-        raise KeyError("Register {} not found in context".format(register))
+        self._get_map(reg_type).set_block(register, block)
 
     def get_coil(self, register: int) -> bool:
         """Get the coil value
@@ -431,14 +388,14 @@ class ModbusSlave:
         :returns: Response frame or None
         """
         # TODO: Refactor this method
-        if self.context is None:
+        if self._maps is None:
             if self.forward_message is not None:
                 return self.forward_message(frame)
             return
 
         db = self._FUNCTION_MAP[frame.func_code]
 
-        if db not in self.context:
+        if db not in self._maps:
             # No: Function code supported
             if self.sl_type == "tcp":
                 return ModbusTCPFrame(
@@ -474,18 +431,8 @@ class ModbusSlave:
                         fr_type="response",
                         error_code=0x03,
                     )
-            if self._check_register(frame.register, frame.length, self.context[db]):
-                data = self._get_data(frame.register, frame.length, self.context[db])
-                res = None
-                if frame.func_code in [1, 2]:
-                    res = bytearray([0x00] * math.ceil(frame.length / 8))
-                    for i in range(frame.length):
-                        if data[i] is True or data[i] == 0x01:
-                            res[i // 8] |= 0x01 << (i % 8)
-                else:
-                    res = bytearray(frame.length * 2)
-                    for i in range(frame.length):
-                        struct.pack_into(">H", res, i * 2, data[i])
+            res = self._maps[db].pack(frame.register, frame.length)
+            if res is not None:
                 if self.sl_type == "tcp":
                     return ModbusTCPFrame(
                         transaction_id=frame.transaction_id,
@@ -540,8 +487,8 @@ class ModbusSlave:
                             fr_type="response",
                             error_code=0x03,
                         )
-                if self._check_register(frame.register, length, self.context[db]):
-                    self.set_coil(frame.register, True if data[0] else False)
+                if self._check_register(frame.register, length, self._maps[db]):
+                    self._maps[db].set(frame.register, data[0])
                 else:
                     # No: Output Address == OK
                     if self.sl_type == "tcp":
@@ -562,8 +509,8 @@ class ModbusSlave:
             if frame.func_code == 6:
                 length = 1
                 data = frame.data
-                if self._check_register(frame.register, length, self.context[db]):
-                    self.set_holding_register(frame.register, struct.unpack(">H", data)[0])
+                if self._check_register(frame.register, length, self._maps[db]):
+                    self._maps[db].set(frame.register, (data[0] << 8) | data[1])
                 else:
                     # No: Register Address == OK
                     if self.sl_type == "tcp":
@@ -583,11 +530,8 @@ class ModbusSlave:
                         )
             if frame.func_code == 15:
                 length = frame.length
-                data = [False for _ in range(frame.length)]
-                for i in range(frame.length):
-                    if frame.data[i // 8] & 0x01 << (i % 8) > 0:
-                        data[i] = True
-                if not (0x0001 <= length <= 0x07B0):
+                data = frame.data
+                if not (0x0001 <= length <= 0x07B0 and len(data) >= (length + 7) >> 3):
                     # 0x0001 ≤ Quantity of Outputs ≤ 0x07B0 AND Byte Count = N*
                     if self.sl_type == "tcp":
                         return ModbusTCPFrame(
@@ -604,9 +548,7 @@ class ModbusSlave:
                             fr_type="response",
                             error_code=0x03,
                         )
-                if self._check_register(frame.register, length, self.context[db]):
-                    self.set_multi_coils(frame.register, data)
-                else:
+                if not self._maps[db].unpack_into(frame.register, length, data):
                     # No: Starting Address == OK AND Starting Address + Quantity of Outputs == OK
                     if self.sl_type == "tcp":
                         return ModbusTCPFrame(
@@ -643,11 +585,7 @@ class ModbusSlave:
                             fr_type="response",
                             error_code=0x03,
                         )
-                if self._check_register(frame.register, length, self.context[db]):
-                    self.set_multi_holding_register(
-                        frame.register, struct.unpack(">" + "H" * frame.length, data)
-                    )
-                else:
+                if not self._maps[db].unpack_into(frame.register, length, data):
                     # No: Starting Address == OK AND Starting Address + Quantity of Outputs == OK
                     if self.sl_type == "tcp":
                         return ModbusTCPFrame(
@@ -708,43 +646,34 @@ class ModbusSlave:
 
         :param int register: Starting register address
         :param int length: Number of registers
-        :param list regs: Register context
+        :param RegisterMap regs: Register map
         :returns: True if valid, False otherwise
         :rtype: bool
         """
-        for reg in regs:
-            quantity = len(reg["value"])
-            if reg["register"] <= register < reg["register"] + quantity:
-                if reg["register"] + quantity >= register + length:
-                    return True
-        return False
+        return regs.contains(register, length)
 
     def _get_data(self, register, length, regs):
         """Get data from register context
 
         :param int register: Starting register address
         :param int length: Number of registers
-        :param list regs: Register context
+        :param RegisterMap regs: Register map
         :returns: List of register values
         :rtype: list
         """
-        for reg in regs:
-            if reg["register"] <= register < reg["register"] + len(reg["value"]):
-                return reg["value"][
-                    (register - reg["register"]) : (register - reg["register"] + length)
-                ]
+        return regs.get_block(register, length)
 
-    def _set_data(self, register, length, data_Block, data):
-        """Set data in register block
+    def _encode_response(self, frame) -> memoryview:
+        """Encode a response frame into the reusable transmit buffer
 
-        :param int register: Register address
-        :param int length: Data length
-        :param dict data_Block: Data block structure
-        :param data: Data to set
+        :param frame: Response frame returned by handle_message
+        :returns: Encoded frame, only valid until the next response is encoded
+        :rtype: memoryview
         """
-        offset = register - data_Block["startAddr"]
-        for i in range(length * 2):
-            data_Block["registers"][2 * offset + i] = data[i]
+        if frame.frame_length() > len(self._tx_buf):
+            return frame.get_frame()
+        n = frame.encode_into(self._tx_buf)
+        return memoryview(self._tx_buf)[:n]
 
     def _log(self, *args, **kwargs) -> None:
         if self._verbose:
@@ -785,15 +714,16 @@ class _CModbusRTUSlave(ModbusSlave):
                 self.ignore_unit_id is not True and frame.device_addr != self._device_address
             ):
                 return
-            resp = self.handle_message(frame).get_frame()
+            resp = self._encode_response(self.handle_message(frame))
             self.uart.write(resp)
             cb = self.cb[frame.func_code]
             if cb is not None:
                 db = self._FUNCTION_MAP[frame.func_code]
-                data = self._get_data(frame.register, frame.length, self.context[db])
                 if frame.func_code in [1, 2, 3, 4, 15, 16]:
+                    data = self._get_data(frame.register, frame.length, self._maps[db])
                     cb(self, frame.register, data)
                 if frame.func_code in [5, 6]:
+                    data = self._get_data(frame.register, 1, self._maps[db])
                     cb(self, frame.register, data[0])
 
 
@@ -852,16 +782,16 @@ class _MModbusRTUSlave(ModbusSlave):
                     self.rsp = rsp  # Save response for next tick
                 return
             self.rsp = b""  # Reset response
-            resp = self.handle_message(frame).get_frame()
+            resp = self._encode_response(self.handle_message(frame))
             self.uart.write(resp)
             cb = self.cb[frame.func_code]
             if cb is not None:
                 db = self._FUNCTION_MAP[frame.func_code]
                 if frame.func_code in [1, 2, 3, 4, 15, 16]:
-                    data = self._get_data(frame.register, frame.length, self.context[db])
+                    data = self._get_data(frame.register, frame.length, self._maps[db])
                     micropython.schedule(cb, (self, frame.register, data))
                 if frame.func_code in [5, 6]:
-                    data = self._get_data(frame.register, 1, self.context[db])
+                    data = self._get_data(frame.register, 1, self._maps[db])
                     micropython.schedule(cb, (self, frame.register, data[0]))
 
 
@@ -878,7 +808,125 @@ class ModbusRTUSlave:
             return _MModbusRTUSlave(*args, **kwargs)
 
 
-class _CModbusTCPServer(ModbusSlave):
+class _ModbusTCPServerBase(ModbusSlave):
+    # set by stop() to end serve_async
+    _stop_event = None
+
+    def stop(self) -> None:
+        """Stop the modbus slave"""
+        self.stopped = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def _process_request(self, frame) -> memoryview:
+        """Handle one complete MBAP request
+
+        :param frame: Received request frame
+        :returns: Encoded response or None if there is nothing to answer
+        :rtype: memoryview or None
+        """
+        req = ModbusTCPFrame.parse_frame(frame, verbose=self._verbose)
+        if req is None or (
+            self.ignore_unit_id is not True and req.unit_id != self._device_address
+        ):
+            self._log("unit id not match")
+            return None
+        res = self.handle_message(req)
+        if res is None:
+            return None
+        out = self._encode_response(res)
+        cb = self.cb[req.func_code]
+        if cb is not None and res.func_code < 0x80:
+            db = self._FUNCTION_MAP[req.func_code]
+            if req.func_code in [1, 2, 3, 4, 15, 16]:
+                cb(self, req.register, self._get_data(req.register, req.length, self._maps[db]))
+            if req.func_code in [5, 6]:
+                cb(self, req.register, self._get_data(req.register, 1, self._maps[db])[0])
+        return out
+
+    async def _process_request_async(self, frame) -> memoryview:
+        """Handle one complete MBAP request, awaiting forward_message_async
+        when the server has no context.
+
+        :param frame: Received request frame
+        :returns: Encoded response or None if there is nothing to answer
+        :rtype: memoryview or None
+        """
+        if self._maps is None and self.forward_message_async is not None:
+            req = ModbusTCPFrame.parse_frame(frame, verbose=self._verbose)
+            if req is None:
+                return None
+            res = await self.forward_message_async(req)
+            if res is None:
+                return None
+            return self._encode_response(res)
+        return self._process_request(frame)
+
+    async def serve_async(self, max_clients: int = 8, max_buffer: int = 512) -> None:
+        """Serve several clients concurrently with asyncio.start_server
+
+        Every client gets its own task and receive buffer, requests are
+        reassembled from the MBAP length field, so frames split over several
+        TCP segments or several frames in one segment are handled. All
+        clients share the register context of this server.
+
+        :param int max_clients: Connections beyond this number are closed
+        :param int max_buffer: Receive buffer size per client in bytes, at
+                               least one maximum sized frame (260 bytes)
+        :returns: None
+        """
+        self.stopped = False
+        self._stop_event = asyncio.Event()
+        self.client_count = 0
+        self._max_clients = max_clients
+        self._max_buffer = max(max_buffer, 260)
+        self._log("starting async tcp server on port {}".format(self.port))
+        server = await asyncio.start_server(
+            self._serve_client, self.host, self.port, backlog=max_clients
+        )
+        try:
+            await self._stop_event.wait()
+        finally:
+            self._stop_event = None
+            server.close()
+            await server.wait_closed()
+
+    async def _serve_client(self, reader, writer) -> None:
+        if self.client_count >= self._max_clients:
+            self._log("too many clients, closing connection")
+            writer.close()
+            await writer.wait_closed()
+            return
+        self.client_count += 1
+        rx = bytearray()
+        try:
+            while not self.stopped:
+                chunk = await reader.read(self._max_buffer - len(rx))
+                if not chunk:
+                    break
+                rx.extend(chunk)
+                while len(rx) >= 6:
+                    n = 6 + ((rx[4] << 8) | rx[5])
+                    if n > 260 or rx[2] or rx[3]:
+                        # not modbus, drop the connection
+                        raise OSError("invalid MBAP header")
+                    if len(rx) < n:
+                        break
+                    res = await self._process_request_async(rx[:n])
+                    rx[:n] = b""
+                    if res is not None:
+                        writer.write(res)
+                await writer.drain()
+        except Exception as e:
+            # a malformed request must not end the server, only the connection
+            self._log("client error", e)
+        finally:
+            self.client_count -= 1
+            writer.close()
+            await writer.wait_closed()
+
+
+class _CModbusTCPServer(_ModbusTCPServerBase):
     def __init__(self, host, port, verbose=False, *args, **kwargs):
         """Init a modbus TCP server for CPython
 
@@ -923,7 +971,7 @@ class _CModbusTCPServer(ModbusSlave):
                             and frame.device_addr != self._device_address
                         ):
                             return
-                        res = self.handle_message(frame).get_frame()
+                        res = self._encode_response(self.handle_message(frame))
                         self._log(res)
                         conn.send(res)
                     except:
@@ -961,7 +1009,7 @@ class _CModbusTCPServer(ModbusSlave):
                             ):
                                 self._log("unit id not match")
                                 return
-                            res = self.handle_message(frame).get_frame()
+                            res = self._encode_response(self.handle_message(frame))
                             self._log(res)
                             client.send(res)
                             cb = self.cb[frame.func_code]
@@ -969,11 +1017,11 @@ class _CModbusTCPServer(ModbusSlave):
                                 db = self._FUNCTION_MAP[frame.func_code]
                                 if frame.func_code in [1, 2, 3, 4, 15, 16]:
                                     data = self._get_data(
-                                        frame.register, frame.length, self.context[db]
+                                        frame.register, frame.length, self._maps[db]
                                     )
                                     micropython.schedule(cb, (self, frame.register, data))
                                 if frame.func_code in [5, 6]:
-                                    data = self._get_data(frame.register, 1, self.context[db])
+                                    data = self._get_data(frame.register, 1, self._maps[db])
                                     micropython.schedule(cb, (self, frame.register, data[0]))
                         else:
                             self._log(fd, "closed")
@@ -995,15 +1043,15 @@ class _CModbusTCPServer(ModbusSlave):
                     self._log("received Frame        {}".format(req))
                     res = self.handle_message(req)
                     self._log("responding with Frame {}".format(res))
-                    conn.send(res.get_frame())
+                    conn.send(self._encode_response(res))
                     cb = self.cb[frame.func_code]
                     if cb is not None:
                         db = self._FUNCTION_MAP[frame.func_code]
                         if frame.func_code in [1, 2, 3, 4, 15, 16]:
-                            data = self._get_data(frame.register, frame.length, self.context[db])
+                            data = self._get_data(frame.register, frame.length, self._maps[db])
                             micropython.schedule(cb, (self, frame.register, data))
                         if frame.func_code in [5, 6]:
-                            data = self._get_data(frame.register, 1, self.context[db])
+                            data = self._get_data(frame.register, 1, self._maps[db])
                             micropython.schedule(cb, (self, frame.register, data[0]))
                 else:
                     self._log("shutting down async server")
@@ -1012,7 +1060,7 @@ class _CModbusTCPServer(ModbusSlave):
         self.sock.close()
 
 
-class _MModbusTCPServer(ModbusSlave):
+class _MModbusTCPServer(_ModbusTCPServerBase):
     def __init__(self, host, port, verbose=False, *args, **kwargs):
         """Init a modbus TCP server for MicroPython
 
@@ -1053,7 +1101,7 @@ class _MModbusTCPServer(ModbusSlave):
                             and frame.unit_id != self._device_address
                         ):
                             return
-                        res = self.handle_message(frame).get_frame()
+                        res = self._encode_response(self.handle_message(frame))
                         self._log(res)
                         conn.send(res)
                     except:
@@ -1082,7 +1130,7 @@ class _MModbusTCPServer(ModbusSlave):
                             ):
                                 self._log("unit id not match")
                                 return
-                            res = self.handle_message(frame).get_frame()
+                            res = self._encode_response(self.handle_message(frame))
                             self._log(res)
                             fd.send(res)
                             cb = self.cb[frame.func_code]
@@ -1090,11 +1138,11 @@ class _MModbusTCPServer(ModbusSlave):
                                 db = self._FUNCTION_MAP[frame.func_code]
                                 if frame.func_code in [1, 2, 3, 4, 15, 16]:
                                     data = self._get_data(
-                                        frame.register, frame.length, self.context[db]
+                                        frame.register, frame.length, self._maps[db]
                                     )
                                     micropython.schedule(cb, (self, frame.register, data))
                                 if frame.func_code in [5, 6]:
-                                    data = self._get_data(frame.register, 1, self.context[db])
+                                    data = self._get_data(frame.register, 1, self._maps[db])
                                     micropython.schedule(cb, (self, frame.register, data[0]))
                         else:
                             self._log(fd, "closed")
@@ -1120,15 +1168,15 @@ class _MModbusTCPServer(ModbusSlave):
                     self._log("received Frame        {}".format(req))
                     res = self.handle_message(req)
                     self._log("responding with Frame {}".format(res))
-                    conn.send(res.get_frame())
+                    conn.send(self._encode_response(res))
                     cb = self.cb[frame.func_code]
                     if cb is not None:
                         db = self._FUNCTION_MAP[frame.func_code]
                         if frame.func_code in [1, 2, 3, 4, 15, 16]:
-                            data = self._get_data(frame.register, frame.length, self.context[db])
+                            data = self._get_data(frame.register, frame.length, self._maps[db])
                             micropython.schedule(cb, (self, frame.register, data))
                         if frame.func_code in [5, 6]:
-                            data = self._get_data(frame.register, 1, self.context[db])
+                            data = self._get_data(frame.register, 1, self._maps[db])
                             micropython.schedule(cb, (self, frame.register, data[0]))
                 else:
                     self._log("shutting down async server")
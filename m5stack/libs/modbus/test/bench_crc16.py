@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+# Compare the table based CRC16 in modbus.frame against the former bit-by-bit
+# routine. Runs on CPython and on the device:
+#
+#   python test/bench_crc16.py
+#   mpremote run test/bench_crc16.py
+
+import os
+import sys
+import time
+
+if sys.implementation.name == "cpython":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modbus import frame
+
+
+def crc16_bitwise(data):
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc = crc >> 1
+    return crc
+
+
+def crc16_table(data):
+    table = frame._CRC16_TABLE
+    crc = 0xFFFF
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
+
+
+def ticks_us():
+    if sys.implementation.name == "micropython":
+        return time.ticks_us()
+    return time.perf_counter_ns() // 1000
+
+
+def bench(name, func, data, rounds):
+    start = ticks_us()
+    for _ in range(rounds):
+        func(data)
+    elapsed = max(ticks_us() - start, 1)
+    kbps = len(data) * rounds * 1000 // elapsed
+    print(
+        "{:<10} {:>6} bytes x {:>5}: {:>8} us, {:>6} kB/s".format(
+            name, len(data), rounds, elapsed, kbps
+        )
+    )
+    return elapsed
+
+
+def main():
+    # 8 byte request, 255 byte max response
+    for size, rounds in ((8, 1000), (255, 100)):
+        data = bytearray((i * 7) & 0xFF for i in range(size))
+        assert crc16_bitwise(data) == crc16_table(data) == frame.crc16(data)
+        t0 = bench("bitwise", crc16_bitwise, data, rounds)
+        t1 = bench("table", crc16_table, data, rounds)
+        t2 = bench("crc16", frame.crc16, data, rounds)
+        print("speedup table: {:.1f}x, crc16: {:.1f}x".format(t0 / t1, t0 / t2))
+
+
+main()
@@ -815,6 +815,11 @@ class Test(unittest.TestCase):
             },
         )
 
+    def test_remove_unconfigured(self):
+        sl = ModbusSlave(context={"coils": [{"register": 0, "value": [True]}]})
+        sl.remove_holding_register(5)
+        self.assertEqual(sl.context, {"coils": [{"register": 0, "value": [True]}]})
+
 
 if __name__ == "__main__":
     unittest.main()
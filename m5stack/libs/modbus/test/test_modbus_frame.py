@@ -764,6 +764,52 @@ class Test(unittest.TestCase):
             parsed_frame = frame.ModbusTCPFrame.parse_frame(test["frame"])
             self.assertEqual(f.get_frame(), parsed_frame.get_frame())
 
+    def test_crc16(self):
+        data = bytearray([0x01, 0x03, 0x00, 0x00, 0x00, 0x0A, 0xC5, 0xCD])
+        self.assertEqual(frame.crc16(data, 6), 0xCDC5)
+        self.assertEqual(frame.crc16(data), 0x0000)
+        self.assertEqual(frame.crc16(b""), 0xFFFF)
+        self.assertEqual(frame.crc16(b"123456789"), 0x4B37)
+        self.assertEqual(frame.ModbusRTUFrame._crc16(data[0:6]), 0xCDC5)
+
+    def test_encode_into(self):
+        buf = bytearray(260)
+        f = frame.ModbusRTUFrame(
+            device_addr=1,
+            func_code=0x10,
+            register=18,
+            length=2,
+            data=bytearray(b"\x00\x01\x00\x02"),
+        )
+        n = f.encode_into(buf)
+        self.assertEqual(buf[:n], f.get_frame())
+        n = frame.ModbusRTUFrame.encode_request_into(
+            buf, 1, 0x10, 18, 2, bytearray(b"\x00\x01\x00\x02")
+        )
+        self.assertEqual(buf[:n], f.get_frame())
+
+        f = frame.ModbusTCPFrame(
+            transaction_id=0x1234, unit_id=1, func_code=3, register=18, length=8
+        )
+        n = frame.ModbusTCPFrame.encode_request_into(buf, 0x1234, 1, 3, 18, 8)
+        self.assertEqual(buf[:n], f.get_frame())
+
+    def test_decode_read_response(self):
+        rtu = frame.ModbusRTUFrame(
+            device_addr=1, func_code=3, fr_type="response", data=bytearray([0x12, 0x34])
+        ).get_frame()
+        self.assertEqual(bytes(frame.ModbusRTUFrame.decode_read_response(rtu, 3)), b"\x12\x34")
+        self.assertIsNone(frame.ModbusRTUFrame.decode_read_response(rtu, 4))
+        rtu[-1] ^= 0xFF
+        self.assertIsNone(frame.ModbusRTUFrame.decode_read_response(rtu, 3))
+
+        tcp = frame.ModbusTCPFrame(
+            transaction_id=7, unit_id=1, func_code=1, fr_type="response", data=bytearray([0x05])
+        ).get_frame()
+        self.assertEqual(bytes(frame.ModbusTCPFrame.decode_read_response(tcp, 1, 7)), b"\x05")
+        self.assertIsNone(frame.ModbusTCPFrame.decode_read_response(tcp, 1, 8))
+        self.assertIsNone(frame.ModbusTCPFrame.decode_read_response(tcp[:-1], 1))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+if sys.implementation.name == "cpython":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import asyncio
+from modbus.frame import ModbusRTUFrame, ModbusTCPFrame
+from modbus.gateway import ModbusGateway
+from modbus.slave import ModbusSlave, ModbusTCPServer
+
+
+class FakeBus:
+    # Stands in for a ModbusRTUMaster: answers RTU frames from a slave context
+    def __init__(self, units):
+        self._inter_frame_delay = 1750
+        self.slaves = {}
+        for unit in units:
+            self.slaves[unit] = ModbusSlave(
+                sl_type="rtu",
+                device_address=unit,
+                context={"holding_registers": [{"register": 0, "value": [unit] * 8}]},
+            )
+        self.sent = 0
+        self.busy = False
+        self.overlap = False
+
+    def _reply(self, frame):
+        self.sent += 1
+        req = ModbusRTUFrame.parse_frame(bytes(frame), fr_type="request")
+        slave = self.slaves.get(frame[0])
+        if slave is None:
+            return (False, bytearray())
+        return (True, slave.handle_message(req).get_frame())
+
+    def _send(self, frame, timeout=2000):
+        return self._reply(frame)
+
+    async def _send_async(self, frame, timeout=2000):
+        self.overlap = self.overlap or self.busy
+        self.busy = True
+        await asyncio.sleep(0.005)
+        self.busy = False
+        return self._reply(frame)
+
+
+def read_request(tid, unit, register=0, length=2):
+    return ModbusTCPFrame(
+        transaction_id=tid, unit_id=unit, func_code=3, register=register, length=length
+    )
+
+
+class Test(unittest.TestCase):
+    port = 10300
+
+    def setUp(self):
+        Test.port += 1
+        self.bus1 = FakeBus([1, 2])
+        self.bus2 = FakeBus([3])
+        self.server = ModbusTCPServer("127.0.0.1", self.port)
+        self.gw = ModbusGateway(
+            self.server, {1: self.bus1, 2: self.bus1, 3: self.bus2, 4: self.bus2}, cache_ttl=1000
+        )
+
+    def test_forward(self):
+        res = self.gw.forward(read_request(7, 2))
+        self.assertEqual(res.transaction_id, 7)
+        self.assertEqual(res.unit_id, 2)
+        self.assertEqual(bytes(res.data), b"\x00\x02\x00\x02")
+        # served from the cache
+        self.gw.forward(read_request(8, 2))
+        self.assertEqual(self.bus1.sent, 1)
+        # a write invalidates the cache of the unit
+        res = self.gw.forward(ModbusTCPFrame(unit_id=2, func_code=6, register=0, data=b"\x00\x09"))
+        self.assertEqual(res.func_code, 6)
+        res = self.gw.forward(read_request(9, 2))
+        self.assertEqual(bytes(res.data), b"\x00\x09\x00\x02")
+        self.assertEqual(self.bus1.sent, 3)
+        self.assertEqual(self.gw.get_stats()["cache_hits"], 1)
+
+    def test_errors(self):
+        res = self.gw.forward(read_request(1, 9))
+        self.assertEqual((res.func_code, res.error_code), (0x83, 0x0A))
+        res = self.gw.forward(read_request(1, 4))
+        self.assertEqual((res.func_code, res.error_code), (0x83, 0x0B))
+        stats = self.gw.get_stats()
+        self.assertEqual((stats["rejected"], stats["timeouts"]), (1, 1))
+
+    def test_serve_async(self):
+        async def client(unit, count):
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            values = []
+            for i in range(count):
+                writer.write(read_request(i, unit, register=i % 4).get_frame())
+                rx = await reader.readexactly(13)
+                values.append(rx[9:])
+            writer.close()
+            return values
+
+        async def run():
+            task = asyncio.create_task(self.gw.serve_async())
+            await asyncio.sleep(0.1)
+            results = await asyncio.gather(client(1, 8), client(2, 8), client(3, 8))
+            self.gw.stop()
+            await task
+            return results
+
+        results = asyncio.run(run())
+        for unit, values in zip((1, 2, 3), results):
+            self.assertEqual(values, [bytes([0, unit, 0, unit])] * 8)
+        self.assertFalse(self.bus1.overlap)
+        # every unit reads 4 distinct ranges, repeats are cached
+        self.assertEqual(self.bus1.sent, 8)
+        self.assertEqual(self.bus2.sent, 4)
+        stats = self.gw.get_stats()
+        self.assertEqual(stats["requests"], 24)
+        self.assertEqual(stats["cache_hits"], 12)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_bus_failures(self):
+        async def broken(frame, timeout=2000):
+            if frame[0] == 1:
+                raise ValueError("bad frame")
+            # never answers
+            await asyncio.sleep(10)
+
+        async def run():
+            self.bus1._send_async = broken
+            self.gw.timeout = 50
+            workers = [
+                asyncio.create_task(self.gw._bus_worker(b)) for b in self.gw._buses.values()
+            ]
+            results = []
+            for unit in (1, 2, 3):
+                res = await asyncio.wait_for(self.gw.forward_async(read_request(1, unit)), 1)
+                results.append((res.func_code, res.error_code))
+            for task in workers:
+                task.cancel()
+            return results
+
+        # the worker survives the first error and a hung bus is answered
+        # with 0x0B, the other bus keeps working
+        self.assertEqual(asyncio.run(run()), [(0x83, 0x0B), (0x83, 0x0B), (3, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+if sys.implementation.name == "cpython":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import struct
+from modbus.frame import ModbusTCPFrame
+from modbus.master import ModbusMaster
+from modbus.poll import PollPlan
+from modbus.slave import ModbusSlave
+
+
+class LoopbackMaster(ModbusMaster):
+    def __init__(self, slave):
+        super().__init__(ms_type="tcp")
+        self.slave = slave
+        self.ti = 1
+        self._verbose = False
+        self.exception_cb = None
+        self.requests = 0
+
+    def _send(self, frame, timeout=2000):
+        self.requests += 1
+        req = ModbusTCPFrame.parse_frame(bytes(frame))
+        return (True, self.slave.handle_message(req).get_frame())
+
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        holding = [0] * 300
+        holding[0] = 0x1234
+        holding[1] = 0xFFFE
+        holding[10:12] = struct.unpack(">HH", struct.pack(">f", 1.5))
+        holding[20:22] = struct.unpack(">HH", struct.pack(">i", -100000))[::-1]
+        holding[200] = 7
+        self.slave = ModbusSlave(
+            context={
+                "holding_registers": [{"register": 0, "value": holding}],
+                "input_registers": [{"register": 0, "value": [1, 2, 3, 4]}],
+            }
+        )
+        self.tags = [
+            {"name": "a", "address": 0},
+            {"name": "b", "address": 1, "type": "int16"},
+            {"name": "f", "address": 10, "type": "float32"},
+            {"name": "l", "address": 20, "type": "int32", "word_order": "little"},
+            {"name": "far", "address": 200},
+            {"name": "in", "address": 2, "table": "input_registers"},
+        ]
+
+    def test_plan(self):
+        plan = PollPlan(self.tags, max_gap=10)
+        self.assertEqual(
+            sorted((r.func_code, r.start, r.count) for r in plan.requests),
+            [(3, 0, 22), (3, 200, 1), (4, 2, 1)],
+        )
+        plan = PollPlan([{"name": str(i), "address": i * 2} for i in range(100)], max_gap=1)
+        self.assertEqual([(r.start, r.count) for r in plan.requests], [(0, 125), (126, 73)])
+        self.assertRaises(ValueError, PollPlan, [{"name": "x", "address": 0, "type": "u8"}])
+
+    def test_poll(self):
+        master = LoopbackMaster(self.slave)
+        values = master.poll(PollPlan(self.tags))
+        self.assertEqual(master.requests, 3)
+        self.assertEqual(values, {"a": 0x1234, "b": -2, "f": 1.5, "l": -100000, "far": 7, "in": 3})
+        values = master.poll(PollPlan([{"name": "x", "address": 299, "type": "uint32"}]))
+        self.assertEqual(values, {"x": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+if sys.implementation.name == "cpython":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from modbus.regmap import RegisterMap
+
+
+class Test(unittest.TestCase):
+    def test_registers(self):
+        regs = RegisterMap()
+        for addr in range(100, 0, -2):
+            regs.add(addr, addr)
+        self.assertEqual(len(regs.export()), 50)
+        for addr in range(1, 100, 2):
+            regs.add(addr, addr)
+        self.assertEqual(regs.export(), [{"register": 1, "value": list(range(1, 101))}])
+
+        self.assertTrue(regs.contains(1, 100))
+        self.assertFalse(regs.contains(0, 2))
+        self.assertFalse(regs.contains(100, 2))
+        self.assertEqual(regs.get(50), 50)
+        self.assertEqual(regs.get_block(10, 3), [10, 11, 12])
+        self.assertRaises(KeyError, regs.get, 101)
+
+        regs.remove(50)
+        self.assertEqual(
+            [(r["register"], len(r["value"])) for r in regs.export()], [(1, 49), (51, 50)]
+        )
+        self.assertRaises(KeyError, regs.set, 50, 0)
+        regs.add(50, 0xFFEE)
+        self.assertEqual(len(regs.export()), 1)
+        self.assertEqual(regs.pack(49, 2), bytearray([0x00, 0x31, 0xFF, 0xEE]))
+
+        self.assertTrue(regs.unpack_into(1, 2, bytearray([0x12, 0x34, 0x56, 0x78])))
+        self.assertEqual(regs.get_block(1, 2), [0x1234, 0x5678])
+        self.assertFalse(regs.unpack_into(100, 2, bytearray(4)))
+        self.assertIsNone(regs.pack(100, 2))
+
+    def test_bits(self):
+        bits = RegisterMap(
+            bits=True, regs=[{"register": 8, "value": [True]}, {"register": 0, "value": [0] * 8}]
+        )
+        self.assertEqual(bits.export(), [{"register": 0, "value": [False] * 8 + [True]}])
+        bits.set_block(0, [True, False, True, True, False, False, False, False, True, True])
+        self.assertEqual(bits.get(8), True)
+        self.assertEqual(bits.pack(0, 9), bytearray([0x0D, 0x01]))
+        self.assertTrue(bits.unpack_into(1, 3, bytearray([0x05])))
+        self.assertEqual(bits.get_block(0, 4), [True, True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
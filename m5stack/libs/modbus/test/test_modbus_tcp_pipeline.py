@@ -0,0 +1,162 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+if sys.implementation.name == "cpython":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import asyncio
+import errno
+import socket
+import time
+import _thread
+from modbus.frame import ModbusTCPFrame
+from modbus.master import ModbusTCPClient
+from modbus.poll import PollPlan
+from modbus.slave import ModbusSlave
+
+
+def server_loop(args):
+    # Collect `batch` requests, answer them in reverse order and deliver the
+    # answers one byte at a time to exercise response reassembly.
+    sock, slave, batch = args
+    conn, _ = sock.accept()
+    rx = bytearray()
+    pending = []
+    while True:
+        chunk = conn.recv(512)
+        if not chunk:
+            break
+        rx.extend(chunk)
+        while len(rx) >= 6 and len(rx) >= 6 + ((rx[4] << 8) | rx[5]):
+            n = 6 + ((rx[4] << 8) | rx[5])
+            pending.append(ModbusTCPFrame.parse_frame(bytes(rx[:n])))
+            rx[:n] = b""
+        if len(pending) >= batch:
+            out = b"".join(bytes(slave.handle_message(f).get_frame()) for f in pending[::-1])
+            pending = []
+            for i in range(len(out)):
+                conn.send(out[i : i + 1])
+    conn.close()
+    sock.close()
+
+
+class Test(unittest.TestCase):
+    port = 10100
+
+    def setUp(self):
+        Test.port += 1
+        self.slave = ModbusSlave(
+            context={
+                "coils": [{"register": 0, "value": [True, False, True]}],
+                "holding_registers": [{"register": 0, "value": list(range(100))}],
+            }
+        )
+
+    def start_server(self, batch):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", self.port))
+        sock.listen(1)
+        _thread.start_new_thread(server_loop, ((sock, self.slave, batch),))
+        time.sleep(0.1)
+
+    def test_read_pipelined(self):
+        self.start_server(4)
+        cl = ModbusTCPClient("127.0.0.1", self.port)
+        cl.connect()
+        results = cl.read_pipelined(
+            [(1, 3, 0, 2), (1, 3, 10, 3), (1, 1, 0, 3), (1, 3, 200, 1)], window=4
+        )
+        cl.disconnect()
+        self.assertEqual(
+            [values for values, _ in results],
+            [[0, 1], [10, 11, 12], [True, False, True], None],
+        )
+        self.assertTrue(all(latency >= 0 for _, latency in results))
+
+    def test_poll_pipelined(self):
+        self.start_server(2)
+        cl = ModbusTCPClient("127.0.0.1", self.port)
+        cl.connect()
+        plan = PollPlan(
+            [{"name": "a", "address": 1}, {"name": "b", "address": 90, "type": "uint32"}]
+        )
+        self.assertEqual(cl.poll(plan, window=2), {"a": 1, "b": (90 << 16) | 91})
+        cl.disconnect()
+
+    def test_read_pipelined_async(self):
+        self.start_server(3)
+
+        async def run():
+            cl = ModbusTCPClient("127.0.0.1", self.port)
+            await cl.connect_async()
+            results = await cl.read_pipelined_async(
+                [(1, 3, 0, 1), (1, 3, 1, 1), (1, 3, 2, 1)], window=3
+            )
+            cl.disconnect()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual([values for values, _ in results], [[0], [1], [2]])
+
+    def test_recv_frame_errors(self):
+        cl = ModbusTCPClient("127.0.0.1", self.port)
+        cl.sock, peer = socket.socketpair()
+        # a timeout returns None and leaves the socket blocking
+        self.assertIsNone(cl._recv_frame(50))
+        self.assertIsNone(cl.sock.gettimeout())
+        cl.sock.close()
+        peer.close()
+
+        # a reset connection is not a timeout
+        class ResetSocket:
+            def settimeout(self, timeout):
+                pass
+
+            def recv(self, n):
+                raise OSError(errno.ECONNRESET)
+
+        cl.sock = ResetSocket()
+        with self.assertRaises(OSError):
+            cl._recv_frame(1000)
+
+    def test_resync(self):
+        cl = ModbusTCPClient("127.0.0.1", self.port)
+        cl.sock, peer = socket.socketpair()
+        # answer with transaction id 5 to a read of one holding register
+        frame = b"\x00\x05\x00\x00\x00\x05\x01\x03\x02\x00\x07"
+        # the rest of a frame cut by a timeout is not read as a new frame
+        peer.send(frame[:4])
+        self.assertIsNone(cl._recv_frame(50))
+        self.assertEqual(cl._rx, b"")
+        # a header with a protocol id or a length out of range drops the buffer
+        peer.send(b"\x00\x05\x00\x01\x00\x05\x01\x03\x02\x00\x07")
+        self.assertIsNone(cl._recv_frame(50))
+        self.assertEqual(cl._rx, b"")
+        peer.send(b"\x00\x05\x00\x00\x01\x00" + frame)
+        self.assertIsNone(cl._recv_frame(50))
+        peer.send(frame)
+        self.assertEqual(bytes(cl._recv_frame(50)), frame)
+
+        # stale answers do not extend the timeout of _send()
+        def stale(_):
+            for _ in range(20):
+                peer.send(frame)
+                time.sleep(0.02)
+
+        _thread.start_new_thread(stale, (None,))
+        start = time.time()
+        request = ModbusTCPFrame(transaction_id=6, unit_id=1, func_code=3, register=0, length=1)
+        self.assertEqual(cl._send(request.get_frame(), 100), (False, b""))
+        self.assertLess(time.time() - start, 0.3)
+        time.sleep(0.4)
+        cl.sock.close()
+        peer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
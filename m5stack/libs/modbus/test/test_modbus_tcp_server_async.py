@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 lbuque, written for M5Stack
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+if sys.implementation.name == "cpython":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import asyncio
+import time
+from modbus.frame import ModbusTCPFrame
+from modbus.slave import ModbusTCPServer
+
+CLIENTS = 8
+REQUESTS = 200
+
+
+async def stand_in_client(port, index, requests):
+    # A plain stream client: pipelines all requests, sends every frame in two
+    # TCP segments and reads the responses back with MBAP reassembly.
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(requests):
+        frame = ModbusTCPFrame(
+            transaction_id=i,
+            unit_id=1,
+            func_code=3,
+            register=index,
+            length=2,
+        ).get_frame()
+        writer.write(frame[:5])
+        await writer.drain()
+        writer.write(frame[5:])
+    await writer.drain()
+    values = []
+    rx = bytearray()
+    while len(values) < requests:
+        rx.extend(await reader.read(512))
+        while len(rx) >= 6 and len(rx) >= 6 + ((rx[4] << 8) | rx[5]):
+            n = 6 + ((rx[4] << 8) | rx[5])
+            resp = ModbusTCPFrame.parse_frame(bytes(rx[:n]))
+            values.append(((rx[0] << 8) | rx[1], bytes(resp.data)))
+            rx[:n] = b""
+    writer.close()
+    return values
+
+
+class Test(unittest.TestCase):
+    port = 10200
+
+    def setUp(self):
+        Test.port += 1
+        self.srv = ModbusTCPServer(
+            "127.0.0.1",
+            self.port,
+            context={"holding_registers": [{"register": 0, "value": list(range(64))}]},
+        )
+
+    def test_concurrent_clients(self):
+        async def run():
+            task = asyncio.create_task(self.srv.serve_async(max_clients=CLIENTS))
+            await asyncio.sleep(0.1)
+            start = time.time()
+            results = await asyncio.gather(
+                *[stand_in_client(self.port, i, REQUESTS) for i in range(CLIENTS)]
+            )
+            elapsed = time.time() - start
+            self.srv.stop()
+            await task
+            return results, elapsed
+
+        results, elapsed = asyncio.run(run())
+        for index, values in enumerate(results):
+            self.assertEqual(
+                values, [(i, bytes([0, index, 0, index + 1])) for i in range(REQUESTS)]
+            )
+        print(
+            "{} clients x {} requests: {:.0f} requests/s".format(
+                CLIENTS, REQUESTS, CLIENTS * REQUESTS / elapsed
+            )
+        )
+
+    def test_max_clients(self):
+        async def run():
+            task = asyncio.create_task(self.srv.serve_async(max_clients=1))
+            await asyncio.sleep(0.1)
+            reader1, writer1 = await asyncio.open_connection("127.0.0.1", self.port)
+            await asyncio.sleep(0.1)
+            reader2, writer2 = await asyncio.open_connection("127.0.0.1", self.port)
+            rejected = await reader2.read(16)
+            writer1.write(ModbusTCPFrame(unit_id=1, func_code=3, register=0, length=1).get_frame())
+            accepted = await reader1.read(16)
+            writer1.close()
+            writer2.close()
+            self.srv.stop()
+            await task
+            return rejected, accepted
+
+        rejected, accepted = asyncio.run(run())
+        self.assertEqual(rejected, b"")
+        self.assertEqual(accepted, bytes([0, 0, 0, 0, 0, 5, 1, 3, 2, 0, 0]))
+
+    def test_malformed_request(self):
+        errors = []
+
+        async def run():
+            def handler(loop, context):
+                # client tasks cancelled at the end of the test are fine
+                if not isinstance(context.get("exception"), asyncio.CancelledError):
+                    errors.append(context)
+
+            asyncio.get_event_loop().set_exception_handler(handler)
+            task = asyncio.create_task(self.srv.serve_async())
+            await asyncio.sleep(0.1)
+            # a write multiple registers request without length
+            reader1, writer1 = await asyncio.open_connection("127.0.0.1", self.port)
+            writer1.write(bytes([0, 0, 0, 0, 0, 4, 1, 16, 0, 1]))
+            closed = await asyncio.wait_for(reader1.read(16), 1)
+            writer1.close()
+            reader2, writer2 = await asyncio.open_connection("127.0.0.1", self.port)
+            writer2.write(ModbusTCPFrame(unit_id=1, func_code=3, register=1, length=1).get_frame())
+            accepted = await asyncio.wait_for(reader2.read(16), 1)
+            writer2.close()
+            self.srv.stop()
+            await task
+            return closed, accepted
+
+        closed, accepted = asyncio.run(run())
+        self.assertEqual(closed, b"")
+        self.assertEqual(accepted, bytes([0, 0, 0, 0, 0, 5, 1, 3, 2, 0, 1]))
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,8 @@
 import socket
+import time
+
+# unread rest of a body that close() still reads to keep the connection
+_DRAIN_MAX = 4096
 
 
 class Response:
@@ -32,6 +36,33 @@ class Response:
 
         return ujson.loads(self.content)
 
+    def iter_content(self, chunk_size=1024):
+        """Iterate over the body in chunks of at most chunk_size bytes.
+
+        The body is read from the connection as the chunks are requested.
+        """
+        while self.raw:
+            chunk = self.raw.read(chunk_size)
+            if not chunk:
+                self.close()
+                break
+            yield chunk
+
+    def readinto(self, buf):
+        """Read the next part of the body into a caller-provided buffer.
+
+        :param buf: a bytearray or memoryview to fill.
+        :return: the number of bytes read, 0 at the end of the body.
+        :rtype: int
+        """
+        if not self.raw:
+            return 0
+        n = self.raw.readinto(buf)
+        if not n:
+            self.close()
+            return 0
+        return n
+
 
 def request(
     method,
@@ -111,7 +142,7 @@ def request(
                 s.write(b"Transfer-Encoding: chunked\r\n")
             else:
                 if getattr(data, "readinto", None):
-                    s.write(b"Content-Length: %d\r\n" % len(data.seek(0, 2)))
+                    s.write(b"Content-Length: %d\r\n" % data.seek(0, 2))
                 else:
                     s.write(b"Content-Length: %d\r\n" % len(data))
         s.write(b"Connection: close\r\n\r\n")
@@ -230,3 +261,386 @@ def urlencode(query):
         l.append(k + "=" + v)
 
     return "&".join(l)
+
+
+class _BodyReader:
+    """File-like reader of one response body on a persistent connection.
+
+    Handles Content-Length, chunked and read-until-close bodies. Once the
+    body was read completely, closing it hands the connection back to the
+    session for the next request. A rest of up to ``_DRAIN_MAX`` bytes is
+    read and dropped by close(), a larger one closes the connection.
+    """
+
+    def __init__(self, session, key, sock, length=None, chunked=False, keep_alive=True):
+        self._session = session
+        self._key = key
+        self._sock = sock
+        # bytes left in the body or the current chunk, None if unknown
+        self._remaining = length
+        self._chunked = chunked
+        self._keep_alive = keep_alive and (chunked or length is not None)
+        self._done = length == 0 and not chunked
+
+    def _next_chunk(self):
+        # returns False after the last chunk
+        line = self._sock.readline()
+        if self._remaining == 0 and line == b"\r\n":
+            # end of the previous chunk
+            line = self._sock.readline()
+        if not line:
+            raise OSError("connection closed")
+        self._remaining = int(line.split(b";", 1)[0].strip(), 16)
+        if self._remaining == 0:
+            # skip the trailer
+            while True:
+                line = self._sock.readline()
+                if not line or line == b"\r\n":
+                    break
+            self._done = True
+            return False
+        return True
+
+    def _limit(self, n):
+        # number of bytes that can be read now without crossing the body end
+        if self._done:
+            return 0
+        if self._chunked and not self._remaining:
+            if not self._next_chunk():
+                return 0
+        if self._remaining is None:
+            return n
+        return min(n, self._remaining)
+
+    def _consumed(self, n):
+        if not n:
+            if self._remaining is None:
+                self._done = True
+            elif self._remaining:
+                raise OSError("connection closed")
+            return
+        if self._remaining is not None:
+            self._remaining -= n
+            if not self._remaining and not self._chunked:
+                self._done = True
+
+    def readinto(self, buf):
+        n = self._limit(len(buf))
+        if not n:
+            return 0
+        if n < len(buf):
+            buf = memoryview(buf)[:n]
+        n = self._sock.readinto(buf) or 0
+        self._consumed(n)
+        return n
+
+    def read(self, n=-1):
+        if n is not None and n >= 0:
+            n = self._limit(n)
+            if not n:
+                return b""
+            data = self._sock.read(n)
+            self._consumed(len(data))
+            return data
+        data = b""
+        while True:
+            chunk = self.read(1024)
+            if not chunk:
+                return data
+            data += chunk
+
+    def _drain(self):
+        if not self._chunked and self._remaining > _DRAIN_MAX:
+            return
+        left = _DRAIN_MAX
+        try:
+            while not self._done and left > 0:
+                n = len(self.read(min(left, 512)))
+                if not n:
+                    return
+                left -= n
+        except (OSError, ValueError):
+            # the connection is closed below
+            self._done = False
+
+    def close(self):
+        if self._sock is None:
+            return
+        if not self._done and self._keep_alive:
+            self._drain()
+        if self._done and self._keep_alive:
+            self._session._release(self._key, self._sock)
+        else:
+            self._sock.close()
+        self._sock = None
+
+
+class Session:
+    """Send requests over persistent HTTP/1.1 connections.
+
+    Connections are kept open per host and reused by the following requests
+    to the same host, which saves the TCP and TLS handshakes. Host name
+    lookups are cached as well. A connection goes back to the pool when the
+    response is closed or its body was read completely. Closing reads and
+    drops an unread rest of up to 4 KB, the connection of a larger body is
+    closed instead.
+
+    :param dict headers: headers sent with every request.
+    :param int pool_size: maximum number of idle connections per host.
+    :param int idle_timeout: seconds an idle connection is kept open.
+    :param int dns_ttl: seconds a host name lookup is cached.
+
+    MicroPython Code Block:
+
+        .. code-block:: python
+
+            import requests2
+
+            session = requests2.Session()
+            while True:
+                rsp = session.post("http://example.com/telemetry", json={"temp": 21.5})
+                print(rsp.status_code)
+                rsp.close()
+                time.sleep(5)
+    """
+
+    def __init__(self, headers=None, pool_size=2, idle_timeout=30, dns_ttl=300):
+        self.headers = headers or {}
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.dns_ttl = dns_ttl
+        # (proto, host, port) -> [(sock, idle since), ...]
+        self._pool = {}
+        # (host, port) -> (addrinfo, expiry)
+        self._dns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close all idle connections."""
+        for conns in self._pool.values():
+            for sock, _ in conns:
+                sock.close()
+        self._pool = {}
+
+    def _resolve(self, host, port):
+        now = time.time()
+        entry = self._dns.get((host, port))
+        if entry is None or now >= entry[1]:
+            ai = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+            entry = self._dns[(host, port)] = (ai, now + self.dns_ttl)
+        return entry[0]
+
+    def _release(self, key, sock):
+        conns = self._pool.setdefault(key, [])
+        if len(conns) < self.pool_size:
+            conns.append((sock, time.time()))
+        else:
+            sock.close()
+
+    def _connect(self, key, timeout):
+        conns = self._pool.get(key)
+        now = time.time()
+        while conns:
+            sock, since = conns.pop()
+            if now - since < self.idle_timeout:
+                # also when None, to drop the timeout of the previous request
+                sock.settimeout(timeout)
+                return sock, True
+            sock.close()
+        proto, host, port = key
+        ai = self._resolve(host, port)
+        sock = socket.socket(ai[0], socket.SOCK_STREAM, ai[2])
+        if timeout is not None:
+            sock.settimeout(timeout)
+        try:
+            sock.connect(ai[-1])
+            if proto == "https:":
+                import ssl
+
+                sock = ssl.wrap_socket(sock, server_hostname=host)
+        except OSError:
+            sock.close()
+            # the address may have changed
+            self._dns.pop((host, port), None)
+            raise
+        return sock, False
+
+    def request(self, method, url, data=None, json=None, headers=None, timeout=None):
+        """Send a request.
+
+        :param str method: the HTTP method.
+        :param str url: the URL.
+        :param data: the body, bytes, str, a file object or an iterator of
+                     chunks.
+        :param json: an object sent as JSON body.
+        :param dict headers: headers of this request.
+        :param timeout: socket timeout in seconds.
+        :return: the response, its body is read from the connection on
+                 demand.
+        :rtype: Response
+        """
+        for _ in range(5):
+            rsp = self._request(method, url, data, json, headers, timeout)
+            if rsp.status_code not in (301, 302, 303, 307, 308) or "Location" not in rsp.headers:
+                return rsp
+            rsp.close()
+            location = rsp.headers["Location"]
+            if location.startswith("/"):
+                location = "/".join(url.split("/", 3)[:3]) + location
+            url = location
+            if rsp.status_code in (301, 302, 303):
+                method, data, json = "GET", None, None
+        return rsp
+
+    def _request(self, method, url, data, json, headers, timeout):
+        try:
+            proto, dummy, host, path = url.split("/", 3)
+        except ValueError:
+            proto, dummy, host = url.split("/", 2)
+            path = ""
+        if proto == "http:":
+            port = 80
+        elif proto == "https:":
+            port = 443
+        else:
+            raise ValueError("Unsupported protocol: " + proto)
+        if ":" in host:
+            host, port = host.split(":", 1)
+            port = int(port)
+
+        hdrs = dict(self.headers)
+        if headers:
+            hdrs.update(headers)
+        if json is not None:
+            assert data is None
+            import ujson
+
+            data = ujson.dumps(json)
+            hdrs["Content-Type"] = "application/json"
+        if isinstance(data, str):
+            data = data.encode()
+        chunked_data = (
+            data and getattr(data, "__next__", None) and not getattr(data, "__len__", None)
+        )
+        if data:
+            if chunked_data:
+                hdrs["Transfer-Encoding"] = "chunked"
+            elif getattr(data, "readinto", None):
+                hdrs["Content-Length"] = data.seek(0, 2)
+                data.seek(0, 0)
+            else:
+                hdrs["Content-Length"] = len(data)
+        elif method in ("POST", "PUT", "PATCH"):
+            hdrs["Content-Length"] = 0
+
+        # the request line and headers are sent with one write
+        head = "%s /%s HTTP/1.1\r\n" % (method, path)
+        if "Host" not in hdrs:
+            head += "Host: %s\r\n" % host
+        for k in hdrs:
+            head += "%s: %s\r\n" % (k, hdrs[k])
+        head = (head + "\r\n").encode()
+
+        key = (proto, host, port)
+        while True:
+            sock, reused = self._connect(key, timeout)
+            try:
+                sock.write(head)
+                if data:
+                    self._send_body(sock, data, chunked_data)
+                line = sock.readline()
+                if not line:
+                    raise OSError("connection closed")
+                break
+            except OSError:
+                sock.close()
+                # a reused connection may have been closed by the server,
+                # try again once with a new one
+                if not reused or chunked_data:
+                    raise
+                if getattr(data, "readinto", None):
+                    data.seek(0, 0)
+
+        try:
+            line = line.split(None, 2)
+            if len(line) < 2:
+                raise ValueError("HTTP error: BadStatusLine:\n%s" % line)
+            status = int(line[1])
+            reason = str(line[2].rstrip(), "utf-8") if len(line) > 2 else ""
+            keep_alive = line[0] == b"HTTP/1.1"
+            resp_d = {}
+            length = None
+            chunked = False
+            while True:
+                line = sock.readline()
+                if not line or line == b"\r\n":
+                    break
+                k, v = str(line, "utf-8").split(":", 1)
+                v = v.strip()
+                resp_d[k] = v
+                k = k.lower()
+                if k == "content-length":
+                    length = int(v)
+                elif k == "transfer-encoding":
+                    chunked = "chunked" in v.lower()
+                elif k == "connection":
+                    keep_alive = v.lower() != "close"
+        except Exception:
+            sock.close()
+            raise
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            length = 0
+            chunked = False
+        elif chunked:
+            length = None
+
+        rsp = Response(_BodyReader(self, key, sock, length, chunked, keep_alive))
+        rsp.status_code = status
+        rsp.reason = reason
+        rsp.headers = resp_d
+        if length == 0:
+            # nothing to read, the connection is free again
+            rsp.raw.close()
+            rsp.raw = None
+            rsp._cached = b""
+        return rsp
+
+    @staticmethod
+    def _send_body(sock, data, chunked_data):
+        if chunked_data:
+            for chunk in data:
+                if chunk:
+                    sock.write(b"%x\r\n" % len(chunk) + chunk + b"\r\n")
+            sock.write(b"0\r\n\r\n")
+        elif getattr(data, "readinto", None):
+            buf = bytearray(1024)
+            while True:
+                n = data.readinto(buf)
+                if not n:
+                    break
+                sock.write(buf if n == len(buf) else memoryview(buf)[:n])
+        else:
+            sock.write(data)
+
+    def head(self, url, **kw):
+        return self.request("HEAD", url, **kw)
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
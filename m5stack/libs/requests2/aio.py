@@ -0,0 +1,574 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import time
+
+
+def _split_url(url):
+    try:
+        proto, dummy, host, path = url.split("/", 3)
+    except ValueError:
+        proto, dummy, host = url.split("/", 2)
+        path = ""
+    if proto == "http:":
+        port = 80
+    elif proto == "https:":
+        port = 443
+    else:
+        raise ValueError("Unsupported protocol: " + proto)
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    return proto, host, port, path
+
+
+async def _wait(coro, timeout):
+    if timeout is None:
+        return await coro
+    return await asyncio.wait_for(coro, timeout)
+
+
+class _Limiter:
+    # counting semaphore, asyncio of MicroPython has none
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self._event = asyncio.Event()
+
+    async def acquire(self):
+        while self.count >= self.limit:
+            self._event.clear()
+            await self._event.wait()
+        self.count += 1
+
+    def release(self):
+        self.count -= 1
+        self._event.set()
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0
+
+    def close(self):
+        try:
+            self.writer.close()
+        except OSError:
+            pass
+
+
+class Response:
+    """Response of an asynchronous request.
+
+    Unless the request was made with ``stream=True`` the body was already
+    read and :attr:`content`, :attr:`text` and :meth:`json` can be used
+    directly. Otherwise the body is read with :meth:`read`,
+    :meth:`readinto` or :meth:`iter_content`, and the response has to be
+    read completely or closed to free the connection.
+    """
+
+    def __init__(self, session, key, conn, length, chunked, keep_alive, read_timeout):
+        self.status_code = 0
+        self.reason = ""
+        self.headers = {}
+        self.encoding = "utf-8"
+        self._session = session
+        self._key = key
+        self._conn = conn
+        # bytes left in the body or the current chunk, None if unknown
+        self._remaining = length
+        self._chunked = chunked
+        self._keep_alive = keep_alive and (chunked or length is not None)
+        self._done = length == 0 and not chunked
+        self._read_timeout = read_timeout
+        self._cached = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Release the connection. If the body was not read completely the
+        connection is closed, otherwise it is kept for the next request."""
+        if self._conn is None:
+            return
+        if self._done and self._keep_alive:
+            self._session._release(self._key, self._conn)
+        else:
+            self._conn.close()
+            self._session._release(self._key, None)
+        self._conn = None
+
+    async def _next_chunk(self):
+        reader = self._conn.reader
+        line = await _wait(reader.readline(), self._read_timeout)
+        if self._remaining == 0 and line == b"\r\n":
+            # end of the previous chunk
+            line = await _wait(reader.readline(), self._read_timeout)
+        if not line:
+            raise OSError("connection closed")
+        self._remaining = int(line.split(b";", 1)[0].strip(), 16)
+        if self._remaining == 0:
+            # skip the trailer
+            while True:
+                line = await _wait(reader.readline(), self._read_timeout)
+                if not line or line == b"\r\n":
+                    break
+            self._done = True
+            return False
+        return True
+
+    async def _limit(self, n):
+        # number of bytes that can be read now without crossing the body end
+        if self._done or self._conn is None:
+            return 0
+        if self._chunked and not self._remaining:
+            if not await self._next_chunk():
+                return 0
+        if self._remaining is None:
+            return n
+        return min(n, self._remaining)
+
+    def _consumed(self, n):
+        if not n:
+            if self._remaining is None:
+                self._done = True
+            elif self._remaining:
+                raise OSError("connection closed")
+            return
+        if self._remaining is not None:
+            self._remaining -= n
+            if not self._remaining and not self._chunked:
+                self._done = True
+
+    async def read(self, n=-1):
+        """Read from the body.
+
+        :param int n: maximum number of bytes to read, -1 to read the rest
+                      of the body.
+        :return: the data, empty bytes at the end of the body.
+        :rtype: bytes
+        """
+        if self._cached is not None:
+            data = self._cached if n < 0 else self._cached[:n]
+            self._cached = self._cached[len(data) :]
+            return data
+        if n < 0:
+            data = b""
+            while True:
+                chunk = await self.read(1024)
+                if not chunk:
+                    return data
+                data += chunk
+        try:
+            n = await self._limit(n)
+            data = b""
+            if n:
+                data = await _wait(self._conn.reader.read(n), self._read_timeout)
+                self._consumed(len(data))
+        except BaseException:
+            # also on cancellation, or the limiter slot of the host is lost
+            self._done = False
+            self.close()
+            raise
+        if self._done:
+            self.close()
+        return data
+
+    async def readinto(self, buf):
+        """Read the next part of the body into a caller-provided buffer.
+
+        :param buf: a bytearray or memoryview to fill.
+        :return: the number of bytes read, 0 at the end of the body.
+        :rtype: int
+        """
+        reader = self._conn.reader if self._conn else None
+        if reader is None or self._cached is not None or not hasattr(reader, "readinto"):
+            data = await self.read(len(buf))
+            buf[: len(data)] = data
+            return len(data)
+        try:
+            n = await self._limit(len(buf))
+            if n:
+                n = await _wait(reader.readinto(memoryview(buf)[:n]), self._read_timeout) or 0
+                self._consumed(n)
+        except BaseException:
+            # also on cancellation, or the limiter slot of the host is lost
+            self._done = False
+            self.close()
+            raise
+        if self._done:
+            self.close()
+        return n
+
+    def iter_content(self, chunk_size=1024):
+        """Iterate over the body in chunks of at most ``chunk_size`` bytes.
+
+        :param int chunk_size: the maximum size of a chunk.
+        :return: an asynchronous iterator.
+
+        Example::
+
+            async for chunk in rsp.iter_content(512):
+                f.write(chunk)
+        """
+        return _ChunkIter(self, chunk_size)
+
+    @property
+    def content(self):
+        if self._cached is None:
+            raise ValueError("body not read, use await read()")
+        return self._cached
+
+    @property
+    def text(self):
+        return str(self.content, self.encoding)
+
+    def json(self):
+        import ujson
+
+        return ujson.loads(self.content)
+
+
+class _ChunkIter:
+    def __init__(self, response, chunk_size):
+        self._response = response
+        self._chunk_size = chunk_size
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self._response.read(self._chunk_size)
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+
+class AsyncSession:
+    """Send HTTP/1.1 requests from asyncio tasks.
+
+    Many requests can run concurrently from one event loop. Connections are
+    kept open per host and reused, and at most ``limit_per_host``
+    requests run at the same time for a host, the others wait for a free
+    connection.
+
+    :param dict headers: headers sent with every request.
+    :param int limit_per_host: maximum number of concurrent requests per
+                               host.
+    :param timeout: default timeout in seconds, a number for both phases or
+                    a ``(connect, read)`` tuple. The read timeout applies to
+                    the response headers and to every read of the body.
+    :param int idle_timeout: seconds an idle connection is kept open.
+
+    MicroPython Code Block:
+
+        .. code-block:: python
+
+            import asyncio
+            from requests2.aio import AsyncSession
+
+            async def main():
+                session = AsyncSession(limit_per_host=2)
+                rsps = await asyncio.gather(
+                    session.get("http://example.com/a"),
+                    session.get("http://example.com/b"),
+                )
+                print([rsp.text for rsp in rsps])
+
+            asyncio.run(main())
+    """
+
+    def __init__(self, headers=None, limit_per_host=2, timeout=(10, 30), idle_timeout=30):
+        self.headers = headers or {}
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        # (proto, host, port) -> [_Connection, ...]
+        self._pool = {}
+        # (proto, host, port) -> _Limiter
+        self._limiters = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close all idle connections."""
+        for conns in self._pool.values():
+            for conn in conns:
+                conn.close()
+        self._pool = {}
+
+    def _release(self, key, conn):
+        # called once per request, when its response is done
+        if conn is not None:
+            conn.idle_since = time.time()
+            self._pool.setdefault(key, []).append(conn)
+        self._limiters[key].release()
+
+    async def _connect(self, key, timeout):
+        conns = self._pool.get(key)
+        now = time.time()
+        while conns:
+            conn = conns.pop()
+            if now - conn.idle_since < self.idle_timeout:
+                return conn, True
+            conn.close()
+        proto, host, port = key
+        if proto == "https:":
+            coro = asyncio.open_connection(host, port, ssl=True)
+        else:
+            coro = asyncio.open_connection(host, port)
+        reader, writer = await _wait(coro, timeout)
+        return _Connection(reader, writer), False
+
+    async def request(
+        self, method, url, data=None, json=None, headers=None, stream=False, timeout=None
+    ):
+        """Send a request.
+
+        :param str method: the HTTP method.
+        :param str url: the URL.
+        :param data: the body, bytes, str, a dict (sent form encoded), a file
+                     object or an iterator of chunks.
+        :param json: an object sent as JSON body.
+        :param dict headers: headers of this request.
+        :param bool stream: False to read the body before returning, True to
+                            read it from the response on demand.
+        :param timeout: timeout of this request, see :class:`AsyncSession`.
+        :return: the response.
+        :rtype: Response
+        """
+        for _ in range(5):
+            rsp = await self._request(method, url, data, json, headers, stream, timeout)
+            if rsp.status_code not in (301, 302, 303, 307, 308) or "Location" not in rsp.headers:
+                return rsp
+            if stream:
+                rsp.close()
+            location = rsp.headers["Location"]
+            if location.startswith("/"):
+                location = "/".join(url.split("/", 3)[:3]) + location
+            url = location
+            if rsp.status_code in (301, 302, 303):
+                method, data, json = "GET", None, None
+        return rsp
+
+    async def _request(self, method, url, data, json, headers, stream, timeout):
+        proto, host, port, path = _split_url(url)
+        if timeout is None:
+            timeout = self.timeout
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+
+        hdrs = dict(self.headers)
+        if headers:
+            hdrs.update(headers)
+        if json is not None:
+            assert data is None
+            import ujson
+
+            data = ujson.dumps(json)
+            hdrs["Content-Type"] = "application/json"
+        elif isinstance(data, dict):
+            from . import urlencode
+
+            data = urlencode(data)
+            hdrs["Content-Type"] = "application/x-www-form-urlencoded"
+        if isinstance(data, str):
+            data = data.encode()
+        chunked_data = data and not getattr(data, "__len__", None)
+        chunked_data = chunked_data and not getattr(data, "readinto", None)
+        if data:
+            if chunked_data:
+                hdrs["Transfer-Encoding"] = "chunked"
+            elif getattr(data, "readinto", None):
+                hdrs["Content-Length"] = data.seek(0, 2)
+                data.seek(0, 0)
+            else:
+                hdrs["Content-Length"] = len(data)
+        elif method in ("POST", "PUT", "PATCH"):
+            hdrs["Content-Length"] = 0
+
+        head = "%s /%s HTTP/1.1\r\n" % (method, path)
+        if "Host" not in hdrs:
+            head += "Host: %s\r\n" % host
+        for k in hdrs:
+            head += "%s: %s\r\n" % (k, hdrs[k])
+        head = (head + "\r\n").encode()
+
+        key = (proto, host, port)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = _Limiter(self.limit_per_host)
+        await limiter.acquire()
+        try:
+            while True:
+                conn, reused = await self._connect(key, connect_timeout)
+                try:
+                    conn.writer.write(head)
+                    if data:
+                        await self._send_body(conn.writer, data, chunked_data)
+                    await conn.writer.drain()
+                    line = await _wait(conn.reader.readline(), read_timeout)
+                    if not line:
+                        raise OSError("connection closed")
+                    break
+                except OSError:
+                    conn.close()
+                    # a reused connection may have been closed by the server,
+                    # try again once with a new one
+                    if not reused or chunked_data:
+                        raise
+                    if getattr(data, "readinto", None):
+                        data.seek(0, 0)
+                except BaseException:
+                    conn.close()
+                    raise
+
+            try:
+                line = line.split(None, 2)
+                if len(line) < 2:
+                    raise ValueError("HTTP error: BadStatusLine:\n%s" % line)
+                status = int(line[1])
+                reason = str(line[2].rstrip(), "utf-8") if len(line) > 2 else ""
+                keep_alive = line[0] == b"HTTP/1.1"
+                resp_d = {}
+                length = None
+                chunked = False
+                while True:
+                    line = await _wait(conn.reader.readline(), read_timeout)
+                    if not line or line == b"\r\n":
+                        break
+                    k, v = str(line, "utf-8").split(":", 1)
+                    v = v.strip()
+                    resp_d[k] = v
+                    k = k.lower()
+                    if k == "content-length":
+                        length = int(v)
+                    elif k == "transfer-encoding":
+                        chunked = "chunked" in v.lower()
+                    elif k == "connection":
+                        keep_alive = v.lower() != "close"
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            limiter.release()
+            raise
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            length = 0
+            chunked = False
+        elif chunked:
+            length = None
+
+        # from here on the response releases the connection and the limiter
+        rsp = Response(self, key, conn, length, chunked, keep_alive, read_timeout)
+        rsp.status_code = status
+        rsp.reason = reason
+        rsp.headers = resp_d
+        if length == 0:
+            rsp.close()
+            rsp._cached = b""
+        elif not stream:
+            rsp._cached = await rsp.read()
+        return rsp
+
+    @staticmethod
+    async def _send_body(writer, data, chunked_data):
+        if chunked_data:
+            if getattr(data, "__aiter__", None):
+                data = data.__aiter__()
+                while True:
+                    try:
+                        chunk = await data.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    if chunk:
+                        writer.write(b"%x\r\n" % len(chunk) + chunk + b"\r\n")
+                        await writer.drain()
+            else:
+                for chunk in data:
+                    if chunk:
+                        writer.write(b"%x\r\n" % len(chunk) + chunk + b"\r\n")
+                        await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        elif getattr(data, "readinto", None):
+            buf = bytearray(1024)
+            while True:
+                n = data.readinto(buf)
+                if not n:
+                    break
+                writer.write(bytes(buf) if n == len(buf) else buf[:n])
+                await writer.drain()
+        else:
+            writer.write(data)
+
+    async def head(self, url, **kw):
+        return await self.request("HEAD", url, **kw)
+
+    async def get(self, url, **kw):
+        return await self.request("GET", url, **kw)
+
+    async def post(self, url, **kw):
+        return await self.request("POST", url, **kw)
+
+    async def put(self, url, **kw):
+        return await self.request("PUT", url, **kw)
+
+    async def patch(self, url, **kw):
+        return await self.request("PATCH", url, **kw)
+
+    async def delete(self, url, **kw):
+        return await self.request("DELETE", url, **kw)
+
+
+_session = None
+
+
+def _default_session():
+    global _session
+    if _session is None:
+        _session = AsyncSession()
+    return _session
+
+
+async def request(method, url, **kw):
+    """Send a request with the shared default session, see
+    :meth:`AsyncSession.request`."""
+    return await _default_session().request(method, url, **kw)
+
+
+async def head(url, **kw):
+    return await request("HEAD", url, **kw)
+
+
+async def get(url, **kw):
+    return await request("GET", url, **kw)
+
+
+async def post(url, **kw):
+    return await request("POST", url, **kw)
+
+
+async def put(url, **kw):
+    return await request("PUT", url, **kw)
+
+
+async def patch(url, **kw):
+    return await request("PATCH", url, **kw)
+
+
+async def delete(url, **kw):
+    return await request("DELETE", url, **kw)
@@ -4,7 +4,10 @@
 
 package(
     "requests2",
-    ("__init__.py",),
+    (
+        "__init__.py",
+        "aio.py",
+    ),
     base_path="..",
     opt=0,
 )
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 from . import robust
+from .topic import TopicTrie
 from micropython import schedule
 
 
@@ -20,26 +21,16 @@ class MQTTClient(robust.MQTTClient):
     ):
         super().__init__(client_id, server, port, user, password, keepalive, ssl, ssl_params)
         self.set_callback(self._callback)
-        self._topics = {}
+        self._topics = TopicTrie()
 
     def _callback(self, topic, msg):
-        if isinstance(topic, bytes):
-            handler = self._topics.get(topic.decode())
-            if handler is None:
-                handler = self._topics.get(topic)
-        elif isinstance(topic, str):
-            handler = self._topics.get(topic)
-            if handler is None:
-                handler = self._topics.get(topic.encode())
-
-        if handler is not None:
+        for handler in self._topics.match(topic):
             schedule(handler, (topic, msg))
 
     def subscribe(self, topic, handler, qos=0):
-        self._topics[topic] = handler
+        self._topics.add(topic, handler)
         return super().subscribe(topic, qos)
 
     def unsubscribe(self, topic):
-        if topic in self._topics:
-            del self._topics[topic]
+        self._topics.remove(topic)
         return super().unsubscribe(topic)
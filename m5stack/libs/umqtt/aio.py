@@ -0,0 +1,571 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import os
+import struct
+import time
+from .simple import MQTTException
+
+try:
+    from time import ticks_ms, ticks_diff
+except ImportError:
+
+    def ticks_ms():
+        return int(time.time() * 1000) & 0x3FFFFFFF
+
+    def ticks_diff(a, b):
+        return ((a - b + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+
+
+def _encode_len(n):
+    buf = bytearray()
+    while n > 0x7F:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+    return buf
+
+
+def _encode_str(s):
+    if isinstance(s, str):
+        s = s.encode()
+    return struct.pack("!H", len(s)) + s
+
+
+class _Message:
+    def __init__(self, topic, msg, qos, retain):
+        self.topic = topic.encode() if isinstance(topic, str) else bytes(topic)
+        self.msg = msg.encode() if isinstance(msg, str) else bytes(msg)
+        self.qos = qos
+        self.retain = retain
+        self.pid = 0
+        self.sent = 0
+
+
+class AsyncMQTTClient:
+    """MQTT client driven by asyncio.
+
+    :meth:`publish` never waits for the broker. Messages are put in a queue
+    that is written to the broker by a background task, which keeps up to
+    ``window`` QoS 1 messages without PUBACK in flight and matches the
+    PUBACKs by packet id. While the connection is down the messages stay in
+    the queue (optionally also in a file, so they survive a reset) and are
+    sent after the client reconnected; messages that were in flight are
+    sent again. When the queue is full the oldest message is dropped.
+
+    :param str client_id: the unique client id string used when connecting to
+                          the broker.
+    :param str server: the hostname or IP address of the remote broker.
+    :param int port: the network port of the server host to connect to.
+    :param user: a username for broker authentication.
+    :type user: str or None
+    :param password: a password for broker authentication.
+    :type password: str or None
+    :param int keepalive: maximum period in seconds allowed between
+                          communications with the broker.
+    :param ssl: True or an ``SSLContext`` to connect with TLS.
+    :param int window: maximum number of unacknowledged QoS 1 publishes.
+    :param int queue_size: maximum number of queued messages.
+    :param queue_file: file that messages queued while disconnected are
+                       written to, None to keep them only in RAM.
+    :type queue_file: str or None
+    :param int reconnect_delay: seconds between two connection attempts.
+
+    MicroPython Code Block:
+
+        .. code-block:: python
+
+            import asyncio
+            from umqtt.aio import AsyncMQTTClient
+
+            async def main():
+                client = AsyncMQTTClient("m5", "broker.emqx.io", queue_file="/flash/mqtt.q")
+                client.set_callback(lambda topic, msg: print(topic, msg))
+                await client.connect()
+                await client.subscribe(b"cmd/#")
+                while True:
+                    client.publish(b"sensor/temp", b"21.5", qos=1)
+                    await asyncio.sleep(1)
+
+            asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        client_id,
+        server,
+        port=0,
+        user=None,
+        password=None,
+        keepalive=60,
+        ssl=None,
+        window=8,
+        queue_size=32,
+        queue_file=None,
+        reconnect_delay=2,
+    ):
+        if port == 0:
+            port = 8883 if ssl else 1883
+        self.client_id = client_id
+        self.server = server
+        self.port = port
+        self.user = user
+        self.pswd = password
+        self.keepalive = keepalive
+        self.ssl = ssl
+        self.window = window
+        self.queue_size = queue_size
+        self.queue_file = queue_file
+        self.reconnect_delay = reconnect_delay
+        self.cb = None
+        self.lw_topic = None
+        self.lw_msg = None
+        self.lw_qos = 0
+        self.lw_retain = False
+        self.pid = 0
+        self._reader = None
+        self._writer = None
+        self._connected = False
+        self._clean_session = True
+        self._queue = []
+        self._queue_event = asyncio.Event()
+        self._closed_event = asyncio.Event()
+        self._window_event = asyncio.Event()
+        # packet id -> _Message waiting for its PUBACK
+        self._inflight = {}
+        # packet id -> [asyncio.Event, response] of SUBSCRIBE/UNSUBSCRIBE
+        self._pending = {}
+        self._subscriptions = {}
+        self._tasks = []
+        self._supervisor = None
+        self._last_rx = 0
+        self._last_tx = 0
+        self._persisted = False
+        self._file_records = 0
+        self.reset_stats()
+        if queue_file:
+            self._load_queue()
+
+    def set_callback(self, f):
+        """Set the function called with ``(topic, msg)`` for every received
+        message. A coroutine function is awaited."""
+        self.cb = f
+
+    def set_last_will(self, topic, msg, retain=False, qos=0):
+        """Set the last will, must be called before :meth:`connect`."""
+        assert 0 <= qos <= 2
+        assert topic
+        self.lw_topic = topic
+        self.lw_msg = msg
+        self.lw_qos = qos
+        self.lw_retain = retain
+
+    def isconnected(self):
+        """Return True while the client is connected to the broker."""
+        return self._connected
+
+    def reset_stats(self):
+        """Reset all counters to 0."""
+        self._published = 0
+        self._acked = 0
+        self._received = 0
+        self._dropped = 0
+        self._reconnects = 0
+        self._latency_total = 0
+        self._latency_max = 0
+        self._stats_start = ticks_ms()
+
+    def get_stats(self):
+        """Get the client counters.
+
+        :returns: dict with the keys ``published`` (messages written to the
+                  broker), ``acked`` (PUBACKs received), ``received``,
+                  ``dropped`` (messages dropped from the full queue),
+                  ``queued``, ``inflight``, ``reconnects``,
+                  ``latency_avg`` and ``latency_max`` (milliseconds from
+                  writing a QoS 1 message until its PUBACK) and
+                  ``throughput`` (published messages per second since the
+                  counters were reset).
+        :rtype: dict
+        """
+        elapsed = ticks_diff(ticks_ms(), self._stats_start)
+        return {
+            "published": self._published,
+            "acked": self._acked,
+            "received": self._received,
+            "dropped": self._dropped,
+            "queued": len(self._queue),
+            "inflight": len(self._inflight),
+            "reconnects": self._reconnects,
+            "latency_avg": self._latency_total // self._acked if self._acked else 0,
+            "latency_max": self._latency_max,
+            "throughput": self._published * 1000 / elapsed if elapsed > 0 else 0,
+        }
+
+    async def connect(self, clean_session=True):
+        """Connect to the broker and start the background tasks, which
+        reconnect automatically when the connection is lost.
+
+        :param bool clean_session: start a new session on the broker.
+        :returns: True if the broker has a session for this client.
+        :rtype: bool
+        :raises OSError: if the broker cannot be reached.
+        :raises MQTTException: if the broker refused the connection.
+        """
+        self._clean_session = clean_session
+        session_present = await self._connect()
+        if self._supervisor is None:
+            self._supervisor = asyncio.create_task(self._supervise())
+        return session_present
+
+    async def disconnect(self):
+        """Disconnect from the broker and stop the background tasks.
+
+        Queued messages are kept.
+        """
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
+        if self._connected:
+            try:
+                await self._write(b"\xe0\0")
+            except OSError:
+                pass
+        self._close()
+
+    def publish(self, topic, msg, retain=False, qos=0):
+        """Queue a message.
+
+        :param topic: the topic that the message should be published on.
+        :type topic: str or bytes
+        :param msg: the message.
+        :type msg: str or bytes
+        :param bool retain: whether the broker retains the message.
+        :param int qos: 0 or 1.
+        """
+        assert qos in (0, 1)
+        message = _Message(topic, msg, qos, retain)
+        self._queue.append(message)
+        if len(self._queue) > self.queue_size:
+            self._queue.pop(0)
+            self._dropped += 1
+        if not self._connected and self.queue_file:
+            self._append_file(message)
+        self._queue_event.set()
+
+    async def subscribe(self, topic, qos=0):
+        """Subscribe to a topic and wait for the SUBACK.
+
+        The subscription is renewed after a reconnect.
+
+        :param topic: the topic filter.
+        :type topic: str or bytes
+        :param int qos: maximum QoS of the messages, 0 or 1.
+        :raises MQTTException: if the broker refused the subscription.
+        """
+        # QoS 2 messages would need the PUBREC/PUBREL/PUBCOMP handshake
+        assert qos in (0, 1)
+        self._subscriptions[topic] = qos
+        topic = _encode_str(topic)
+        pid = self._next_pid()
+        response = await self._request(
+            b"\x82"
+            + _encode_len(2 + len(topic) + 1)
+            + struct.pack("!H", pid)
+            + topic
+            + bytes([qos]),
+            pid,
+        )
+        if response[2] == 0x80:
+            raise MQTTException(response[2])
+
+    async def unsubscribe(self, topic):
+        """Unsubscribe from a topic and wait for the UNSUBACK.
+
+        :param topic: the topic filter.
+        :type topic: str or bytes
+        """
+        self._subscriptions.pop(topic, None)
+        topic = _encode_str(topic)
+        pid = self._next_pid()
+        await self._request(
+            b"\xa2" + _encode_len(2 + len(topic)) + struct.pack("!H", pid) + topic, pid
+        )
+
+    async def flush(self):
+        """Wait until the queue is empty and all QoS 1 messages were
+        acknowledged."""
+        while self._queue or self._inflight:
+            self._window_event.clear()
+            await self._window_event.wait()
+
+    def _next_pid(self):
+        while True:
+            self.pid = self.pid % 0xFFFF + 1
+            if self.pid not in self._inflight and self.pid not in self._pending:
+                return self.pid
+
+    async def _write(self, data):
+        self._writer.write(data)
+        await self._writer.drain()
+        self._last_tx = ticks_ms()
+
+    async def _request(self, packet, pid):
+        if not self._connected:
+            raise OSError(-1)
+        entry = [asyncio.Event(), None]
+        self._pending[pid] = entry
+        try:
+            await self._write(packet)
+            await entry[0].wait()
+        finally:
+            self._pending.pop(pid, None)
+        if entry[1] is None:
+            raise OSError(-1)
+        return entry[1]
+
+    async def _connect(self):
+        if self.ssl:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.server, self.port, ssl=self.ssl
+            )
+        else:
+            self._reader, self._writer = await asyncio.open_connection(self.server, self.port)
+        flags = self._clean_session << 1
+        payload = _encode_str(self.client_id)
+        if self.lw_topic:
+            flags |= 0x4 | (self.lw_qos & 0x3) << 3 | self.lw_retain << 5
+            payload += _encode_str(self.lw_topic) + _encode_str(self.lw_msg)
+        if self.user:
+            flags |= 0xC0
+            payload += _encode_str(self.user) + _encode_str(self.pswd)
+        body = b"\x00\x04MQTT\x04" + bytes([flags]) + struct.pack("!H", self.keepalive) + payload
+        try:
+            await self._write(b"\x10" + _encode_len(len(body)) + body)
+            resp = await asyncio.wait_for(self._reader.readexactly(4), 10)
+        except Exception:
+            self._close()
+            raise
+        if resp[0] != 0x20 or resp[1] != 0x02:
+            self._close()
+            raise MQTTException(-1)
+        if resp[3] != 0:
+            self._close()
+            raise MQTTException(resp[3])
+        self._connected = True
+        self._last_rx = ticks_ms()
+        self._tasks = [
+            asyncio.create_task(self._recv_task()),
+            asyncio.create_task(self._send_task()),
+        ]
+        if self.keepalive:
+            self._tasks.append(asyncio.create_task(self._ping_task()))
+        session_present = bool(resp[2] & 1)
+        if not session_present and self._subscriptions:
+            asyncio.create_task(self._resubscribe())
+        return session_present
+
+    async def _resubscribe(self):
+        try:
+            for topic, qos in list(self._subscriptions.items()):
+                await self.subscribe(topic, qos)
+        except OSError:
+            pass
+
+    def _close(self):
+        was_connected = self._connected
+        self._connected = False
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        for task in self._tasks:
+            # MicroPython can't cancel the running task, it ends by itself
+            if task is not current:
+                task.cancel()
+        self._tasks = []
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except OSError:
+                pass
+            self._writer = None
+        if was_connected:
+            # messages without PUBACK are sent again after reconnecting
+            inflight = sorted(self._inflight.values(), key=lambda m: m.sent)
+            self._inflight = {}
+            self._queue = (inflight + self._queue)[-self.queue_size :]
+            if self.queue_file and self._queue:
+                self._save_queue()
+            self._closed_event.set()
+        for entry in self._pending.values():
+            entry[0].set()
+        self._window_event.set()
+        self._queue_event.set()
+
+    async def _supervise(self):
+        while True:
+            while self._connected:
+                self._closed_event.clear()
+                await self._closed_event.wait()
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._connect()
+                self._reconnects += 1
+            except (OSError, MQTTException, asyncio.TimeoutError):
+                pass
+
+    async def _send_task(self):
+        try:
+            while True:
+                if not self._queue:
+                    if self._persisted:
+                        self._remove_file()
+                    self._window_event.set()
+                    self._queue_event.clear()
+                    await self._queue_event.wait()
+                    continue
+                message = self._queue[0]
+                if message.qos and len(self._inflight) >= self.window:
+                    self._window_event.clear()
+                    await self._window_event.wait()
+                    continue
+                self._queue.pop(0)
+                pid = 0
+                if message.qos:
+                    pid = message.pid = self._next_pid()
+                    message.sent = ticks_ms()
+                    self._inflight[pid] = message
+                await self._write(self._encode_publish(message, pid))
+                self._published += 1
+        except OSError:
+            self._close()
+
+    def _encode_publish(self, message, pid):
+        sz = 2 + len(message.topic) + len(message.msg)
+        if message.qos:
+            sz += 2
+        header = bytes([0x30 | message.qos << 1 | message.retain]) + _encode_len(sz)
+        header += struct.pack("!H", len(message.topic)) + message.topic
+        if message.qos:
+            header += struct.pack("!H", pid)
+        return header + message.msg
+
+    async def _recv_task(self):
+        try:
+            while True:
+                op = (await self._reader.readexactly(1))[0]
+                sz = 0
+                sh = 0
+                while True:
+                    b = (await self._reader.readexactly(1))[0]
+                    sz |= (b & 0x7F) << sh
+                    if not b & 0x80:
+                        break
+                    sh += 7
+                data = await self._reader.readexactly(sz) if sz else b""
+                self._last_rx = ticks_ms()
+                await self._handle_packet(op, data)
+        except (OSError, EOFError):
+            self._close()
+
+    async def _handle_packet(self, op, data):
+        kind = op & 0xF0
+        if kind == 0x40:  # PUBACK
+            message = self._inflight.pop((data[0] << 8) | data[1], None)
+            if message is not None:
+                latency = ticks_diff(ticks_ms(), message.sent)
+                self._acked += 1
+                self._latency_total += latency
+                if latency > self._latency_max:
+                    self._latency_max = latency
+                self._window_event.set()
+        elif kind == 0x30:  # PUBLISH
+            topic_len = (data[0] << 8) | data[1]
+            topic = data[2 : 2 + topic_len]
+            i = 2 + topic_len
+            if op & 6:
+                pid = data[i : i + 2]
+                i += 2
+            self._received += 1
+            if self.cb is not None:
+                ret = self.cb(topic, data[i:])
+                if hasattr(ret, "send"):
+                    await ret
+            if op & 6 == 2:
+                await self._write(b"\x40\x02" + pid)
+        elif kind in (0x90, 0xB0):  # SUBACK, UNSUBACK
+            entry = self._pending.get((data[0] << 8) | data[1])
+            if entry is not None:
+                entry[1] = data
+                entry[0].set()
+
+    async def _ping_task(self):
+        try:
+            while True:
+                await asyncio.sleep(self.keepalive / 2)
+                if ticks_diff(ticks_ms(), self._last_rx) > self.keepalive * 1500:
+                    # no PINGRESP, the connection is dead
+                    break
+                if ticks_diff(ticks_ms(), self._last_tx) >= self.keepalive * 500:
+                    await self._write(b"\xc0\0")
+        except OSError:
+            pass
+        self._close()
+
+    def _append_file(self, message):
+        if self._file_records >= 2 * self.queue_size:
+            # drop the records of messages that fell out of the queue
+            self._save_queue()
+            return
+        with open(self.queue_file, "ab") as f:
+            f.write(self._encode_record(message))
+        self._file_records += 1
+        self._persisted = True
+
+    def _save_queue(self):
+        with open(self.queue_file, "wb") as f:
+            for message in self._queue:
+                f.write(self._encode_record(message))
+        self._file_records = len(self._queue)
+        self._persisted = True
+
+    def _remove_file(self):
+        try:
+            os.remove(self.queue_file)
+        except OSError:
+            pass
+        self._file_records = 0
+        self._persisted = False
+
+    @staticmethod
+    def _encode_record(message):
+        return (
+            struct.pack(
+                "!BHI", message.qos << 1 | message.retain, len(message.topic), len(message.msg)
+            )
+            + message.topic
+            + message.msg
+        )
+
+    def _load_queue(self):
+        try:
+            f = open(self.queue_file, "rb")
+        except OSError:
+            return
+        with f:
+            while True:
+                header = f.read(7)
+                if len(header) < 7:
+                    break
+                flags, topic_len, msg_len = struct.unpack("!BHI", header)
+                topic = f.read(topic_len)
+                msg = f.read(msg_len)
+                if len(msg) < msg_len:
+                    break
+                self._queue.append(_Message(topic, msg, flags >> 1, flags & 1))
+                self._file_records += 1
+        self._queue = self._queue[-self.queue_size :]
+        self._persisted = True
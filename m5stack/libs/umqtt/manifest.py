@@ -6,8 +6,10 @@ package(
     "umqtt",
     (
         "__init__.py",
+        "aio.py",
         "robust.py",
         "simple.py",
+        "topic.py",
     ),
     base_path="..",
     opt=0,
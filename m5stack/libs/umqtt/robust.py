@@ -38,6 +38,14 @@ class MQTTClient(simple.MQTTClient):
                 self.log(False, e)
             self.reconnect()
 
+    def publish_many(self, messages):
+        while 1:
+            try:
+                return super().publish_many(messages)
+            except OSError as e:
+                self.log(False, e)
+            self.reconnect()
+
     def wait_msg(self):
         while 1:
             try:
@@ -6,6 +6,11 @@ import socket
 import struct
 from binascii import hexlify
 
+# larger payloads are written to the socket directly instead of copied
+_COPY_MAX = 256
+# publish_many() writes the assembled packets before the buffer grows past it
+_BATCH_MAX = 1024
+
 
 class MQTTException(Exception):
     pass
@@ -40,6 +45,70 @@ class MQTTClient:
         self.lw_msg = None
         self.lw_qos = 0
         self.lw_retain = False
+        # reusable buffer that every outgoing packet is assembled in
+        self._wbuf = bytearray(64)
+
+    def _buffer(self, size):
+        if len(self._wbuf) < size:
+            # keep the packets already assembled for publish_many()
+            buf = bytearray(size + 32)
+            buf[: len(self._wbuf)] = self._wbuf
+            self._wbuf = buf
+        return self._wbuf
+
+    @staticmethod
+    def _put_len(buf, i, sz):
+        while sz > 0x7F:
+            buf[i] = (sz & 0x7F) | 0x80
+            sz >>= 7
+            i += 1
+        buf[i] = sz
+        return i + 1
+
+    @staticmethod
+    def _put_str(buf, i, s):
+        if isinstance(s, str):
+            s = s.encode()
+        struct.pack_into("!H", buf, i, len(s))
+        buf[i + 2 : i + 2 + len(s)] = s
+        return i + 2 + len(s)
+
+    def _next_pid(self):
+        self.pid = self.pid % 0xFFFF + 1
+        return self.pid
+
+    def _put_publish(self, i, topic, msg, retain, qos, pid):
+        # assemble a PUBLISH packet at offset i of the buffer, returns its end;
+        # a large payload isn't copied, it is written to the socket with the
+        # packets before it and 0 is returned
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(msg, str):
+            msg = msg.encode()
+        sz = 2 + len(topic) + len(msg)
+        if qos > 0:
+            sz += 2
+        assert sz < 2097152
+        copy = len(msg) <= _COPY_MAX
+        end = i + sz - len(msg) + 4
+        if copy:
+            end += len(msg)
+        if i and end > _BATCH_MAX:
+            self.sock.write(self._wbuf, i)
+            end -= i
+            i = 0
+        buf = self._buffer(end)
+        buf[i] = 0x30 | qos << 1 | retain
+        i = self._put_str(buf, self._put_len(buf, i + 1, sz), topic)
+        if qos > 0:
+            struct.pack_into("!H", buf, i, pid)
+            i += 2
+        if not copy:
+            self.sock.write(buf, i)
+            self.sock.write(msg)
+            return 0
+        buf[i : i + len(msg)] = msg
+        return i + len(msg)
 
     def _send_str(self, s):
         self.sock.write(struct.pack("!H", len(s)))
@@ -105,7 +174,6 @@ class MQTTClient:
             self.sock = wrap_socket(self.sock, **self.ssl_params)
         elif self.ssl:
             self.sock = self.ssl.wrap_socket(self.sock, server_hostname=self.server)
-        premsg = bytearray(b"\x10\0\0\0\0\0")
         msg = bytearray(b"\x04MQTT\x04\x02\0\0")
 
         sz = 10 + 2 + len(self.client_id)
@@ -122,23 +190,20 @@ class MQTTClient:
             msg[6] |= 0x4 | (self.lw_qos & 0x1) << 3 | (self.lw_qos & 0x2) << 3
             msg[6] |= self.lw_retain << 5
 
-        i = 1
-        while sz > 0x7F:
-            premsg[i] = (sz & 0x7F) | 0x80
-            sz >>= 7
-            i += 1
-        premsg[i] = sz
-
-        self.sock.write(premsg, i + 2)
-        self.sock.write(msg)
-        # print(hex(len(msg)), hexlify(msg, ":"))
-        self._send_str(self.client_id)
+        # the whole packet is sent with one write
+        buf = self._buffer(sz + 6)
+        buf[0] = 0x10
+        i = self._put_len(buf, 1, sz)
+        buf[i] = 0  # high byte of the protocol name length
+        buf[i + 1 : i + 1 + len(msg)] = msg
+        i = self._put_str(buf, i + 1 + len(msg), self.client_id)
         if self.lw_topic:
-            self._send_str(self.lw_topic)
-            self._send_str(self.lw_msg)
+            i = self._put_str(buf, i, self.lw_topic)
+            i = self._put_str(buf, i, self.lw_msg)
         if self.user:
-            self._send_str(self.user)
-            self._send_str(self.pswd)
+            i = self._put_str(buf, i, self.user)
+            i = self._put_str(buf, i, self.pswd)
+        self.sock.write(buf, i)
         resp = self.sock.read(4)
         assert resp[0] == 0x20 and resp[1] == 0x02
         if resp[3] != 0:
@@ -159,49 +224,60 @@ class MQTTClient:
             return False
 
     def publish(self, topic, msg, retain=False, qos=0):
-        pkt = bytearray(b"\x30\0\0\0")
-        pkt[0] |= qos << 1 | retain
-        sz = 2 + len(topic) + len(msg)
+        pid = 0
         if qos > 0:
-            sz += 2
-        assert sz < 2097152
-        i = 1
-        while sz > 0x7F:
-            pkt[i] = (sz & 0x7F) | 0x80
-            sz >>= 7
-            i += 1
-        pkt[i] = sz
-        # print(hex(len(pkt)), hexlify(pkt, ":"))
-        self.sock.write(pkt, i + 1)
-        self._send_str(topic)
-        if qos > 0:
-            self.pid += 1
-            pid = self.pid
-            struct.pack_into("!H", pkt, 0, pid)
-            self.sock.write(pkt, 2)
-        self.sock.write(msg)
+            pid = self._next_pid()
+        i = self._put_publish(0, topic, msg, retain, qos, pid)
+        if i:
+            self.sock.write(self._wbuf, i)
         if qos == 1:
-            while 1:
-                op = self.wait_msg()
-                if op == 0x40:
-                    sz = self.sock.read(1)
-                    assert sz == b"\x02"
-                    rcv_pid = self.sock.read(2)
-                    rcv_pid = rcv_pid[0] << 8 | rcv_pid[1]
-                    if pid == rcv_pid:
-                        return
+            self._wait_puback({pid})
         elif qos == 2:
             assert 0
 
+    def publish_many(self, messages):
+        """Publish several messages with few socket writes.
+
+        :param list messages: ``(topic, msg)`` or ``(topic, msg, retain, qos)``
+                              tuples.
+
+        Returns after the PUBACKs of all QoS 1 messages were received.
+        """
+        i = 0
+        pids = set()
+        for message in messages:
+            topic, msg = message[0], message[1]
+            retain = message[2] if len(message) > 2 else False
+            qos = message[3] if len(message) > 3 else 0
+            assert qos < 2
+            pid = 0
+            if qos > 0:
+                pid = self._next_pid()
+                pids.add(pid)
+            i = self._put_publish(i, topic, msg, retain, qos, pid)
+        if i:
+            self.sock.write(self._wbuf, i)
+        self._wait_puback(pids)
+
+    def _wait_puback(self, pids):
+        while pids:
+            op = self.wait_msg()
+            if op == 0x40:
+                sz = self.sock.read(1)
+                assert sz == b"\x02"
+                rcv_pid = self.sock.read(2)
+                pids.discard(rcv_pid[0] << 8 | rcv_pid[1])
+
     def subscribe(self, topic, qos=0):
         assert self.cb is not None, "Subscribe callback is not set"
-        pkt = bytearray(b"\x82\0\0\0")
-        self.pid += 1
-        struct.pack_into("!BH", pkt, 1, 2 + 2 + len(topic) + 1, self.pid)
-        # print(hex(len(pkt)), hexlify(pkt, ":"))
-        self.sock.write(pkt)
-        self._send_str(topic)
-        self.sock.write(qos.to_bytes(1, "little"))
+        self._next_pid()
+        buf = self._buffer(4 + 2 + len(topic) + 1)
+        buf[0] = 0x82
+        struct.pack_into("!BH", buf, 1, 2 + 2 + len(topic) + 1, self.pid)
+        pkt = bytes(buf[:4])
+        i = self._put_str(buf, 4, topic)
+        buf[i] = qos
+        self.sock.write(buf, i + 1)
         while 1:
             op = self.wait_msg()
             if op == 0x90:
@@ -213,11 +289,12 @@ class MQTTClient:
                 return
 
     def unsubscribe(self, topic):
-        pkt = bytearray(b"\xa2\0\0\0")
-        self.pid += 1
-        struct.pack_into("!BH", pkt, 1, 2 + 2 + len(topic), self.pid)
-        self.sock.write(pkt)
-        self._send_str(topic)
+        self._next_pid()
+        buf = self._buffer(4 + 2 + len(topic))
+        buf[0] = 0xA2
+        struct.pack_into("!BH", buf, 1, 2 + 2 + len(topic), self.pid)
+        pkt = bytes(buf[:4])
+        self.sock.write(buf, self._put_str(buf, 4, topic))
         while 1:
             op = self.wait_msg()
             if op == 0xB0:
@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+
+def _to_bytes(topic):
+    return topic.encode() if isinstance(topic, str) else bytes(topic)
+
+
+class TopicTrie:
+    """Index of topic filters for dispatching received messages.
+
+    Filters are stored level by level, so finding the handlers of a topic
+    takes time proportional to the number of topic levels, not to the
+    number of subscriptions. The ``+`` and ``#`` wildcards are supported,
+    and topics starting with ``$`` are not matched by a wildcard in the
+    first level. Topics and filters are compared as bytes.
+
+    MicroPython Code Block:
+
+        .. code-block:: python
+
+            from umqtt.topic import TopicTrie
+
+            trie = TopicTrie()
+            trie.add("sensor/+/temp", handler)
+            trie.match(b"sensor/kitchen/temp")  # [handler]
+    """
+
+    def __init__(self) -> None:
+        # node: [{level: node}, [handler, ...]]
+        self._root = [{}, []]
+        self._filters = {}
+
+    def add(self, topic_filter, handler) -> None:
+        """Set the handler of a topic filter, replacing a previous one.
+
+        :param topic_filter: the topic filter.
+        :type topic_filter: str or bytes
+        :param handler: the handler.
+        """
+        key = _to_bytes(topic_filter)
+        self.remove(key)
+        node = self._root
+        for level in key.split(b"/"):
+            child = node[0].get(level)
+            if child is None:
+                child = node[0][level] = [{}, []]
+            node = child
+        node[1].append(handler)
+        self._filters[key] = handler
+
+    def remove(self, topic_filter) -> None:
+        """Remove a topic filter.
+
+        :param topic_filter: the topic filter.
+        :type topic_filter: str or bytes
+        """
+        key = _to_bytes(topic_filter)
+        handler = self._filters.pop(key, None)
+        if handler is None:
+            return
+        path = [self._root]
+        levels = key.split(b"/")
+        for level in levels:
+            path.append(path[-1][0][level])
+        path[-1][1].remove(handler)
+        # drop the nodes that no longer lead to a handler
+        for i in range(len(levels) - 1, -1, -1):
+            node = path[i + 1]
+            if node[0] or node[1]:
+                break
+            del path[i][0][levels[i]]
+
+    def __contains__(self, topic_filter) -> bool:
+        return _to_bytes(topic_filter) in self._filters
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def match(self, topic) -> list:
+        """Find the handlers of all the filters that match a topic.
+
+        :param topic: the topic of a received message.
+        :type topic: str or bytes
+        :return: the handlers.
+        :rtype: list
+        """
+        if isinstance(topic, str):
+            topic = topic.encode()
+        levels = topic.split(b"/")
+        # no wildcard matches the first level of $SYS/... topics
+        wildcards = not topic.startswith(b"$")
+        handlers = []
+        nodes = [self._root]
+        for i, level in enumerate(levels):
+            next_nodes = []
+            for node in nodes:
+                children = node[0]
+                if wildcards or i:
+                    child = children.get(b"#")
+                    if child is not None:
+                        handlers.extend(child[1])
+                    child = children.get(b"+")
+                    if child is not None:
+                        next_nodes.append(child)
+                child = children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+            if not next_nodes:
+                return handlers
+            nodes = next_nodes
+        for node in nodes:
+            handlers.extend(node[1])
+            # "a/#" also matches "a"
+            child = node[0].get(b"#")
+            if child is not None:
+                handlers.extend(child[1])
+        return handlers
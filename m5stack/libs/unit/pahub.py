@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 from machine import I2C
 from micropython import const
+import _thread
 import time
 import sys
 
@@ -20,7 +21,42 @@ PAHUB_CHN5 = const(5)
 PAHUB_DEFAULT_ADDR = const(0x70)
 
 
+class _BusState:
+    # shared by all the PAHUBUnit objects of one I2C bus
+
+    def __init__(self) -> None:
+        # address of a hub -> value of its control register, -1 if unknown
+        self.masks = {}
+        self.lock = _thread.allocate_lock()
+        self.owner = None
+        self.depth = 0
+        self.transfers = 0
+        self.switches = 0
+
+
+# bus -> _BusState
+_buses = {}
+
+
+def _bus_key(i2c):
+    # "I2C(0, scl=1, sda=2, freq=100000, ...)" up to the frequency, so that
+    # the I2C objects of one bus share the state
+    r = repr(i2c)
+    i = r.find(", freq")
+    return r[:i] if i > 0 else id(i2c)
+
+
 class PAHUBUnit:
+    """A channel of a PaHub unit (TCA9548A I2C multiplexer).
+
+    The object is used like the I2C bus of the channel. An operation selects
+    the channel, deselects the channels of the other hubs of the bus and
+    releases the channel again; the hubs remember their control register,
+    so this only costs the writes that change it. Use :meth:`transaction`
+    to keep the channel selected, and other threads away from the bus,
+    across several operations.
+    """
+
     _i2c = None
     _chn = -1
     _addr = PAHUB_DEFAULT_ADDR
@@ -31,83 +67,178 @@ class PAHUBUnit:
         self._i2c = i2c
         self._chn = channel
         self._addr = address
+        key = _bus_key(i2c)
+        if key not in _buses:
+            _buses[key] = _BusState()
+        self._bus = _buses[key]
+        if address not in self._bus.masks:
+            self._bus.masks[address] = -1
+
+    def transaction(self) -> "PAHUBUnit":
+        """Select the channel for a burst of operations.
+
+        Returns a context manager. Until it exits, the channel stays
+        selected and other threads wait for the bus. The channel is released
+        when it exits.
+
+        MicroPython Code Block:
+
+            .. code-block:: python
+
+                with pahub_0.transaction():
+                    pahub_0.writeto_mem(0x44, 0x00, b"\x01")
+                    data = pahub_0.readfrom_mem(0x44, 0x01, 6)
+        """
+        return self
+
+    def __enter__(self) -> "PAHUBUnit":
+        self._lock()
+        try:
+            bus = self._bus
+            # only one channel of all the hubs of the bus
+            for addr in bus.masks:
+                if addr != self._addr and bus.masks[addr]:
+                    self._write_mask(addr, 0)
+            mask = 1 << self._chn
+            if bus.masks[self._addr] != mask:
+                self._write_mask(self._addr, mask)
+        except BaseException:
+            self._unlock()
+            raise
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._unlock()
+
+    def _lock(self) -> None:
+        # reentrant for the thread that holds it
+        bus = self._bus
+        ident = _thread.get_ident()
+        if bus.owner != ident:
+            bus.lock.acquire()
+            bus.owner = ident
+        bus.depth += 1
+
+    def _unlock(self) -> None:
+        bus = self._bus
+        if bus.depth > 1:
+            bus.depth -= 1
+            return
+        try:
+            # leave the bus without hub channels, so that devices behind a
+            # hub don't collide with devices on the bus or behind other hubs
+            for addr in bus.masks:
+                if bus.masks[addr]:
+                    self._write_mask(addr, 0)
+        finally:
+            bus.depth = 0
+            bus.owner = None
+            bus.lock.release()
+
+    def _write_mask(self, addr: int, mask: int) -> None:
+        bus = self._bus
+        # unknown until the write succeeded
+        bus.masks[addr] = -1
+        self._i2c.writeto(addr, bytes((mask,)))
+        bus.masks[addr] = mask
+        bus.transfers += 1
+        bus.switches += 1
+
+    def _mask(self) -> int:
+        bus = self._bus
+        if bus.masks[self._addr] < 0:
+            bus.masks[self._addr] = self._i2c.readfrom(self._addr, 1)[0]
+            bus.transfers += 1
+        return bus.masks[self._addr]
 
     def select_channel(self, channel: int) -> None:
-        buf = bytearray(1)
-        buf[0] = self._i2c.readfrom(self._addr, 1)[0] | (1 << channel)
-        self._i2c.writeto(self._addr, buf)
+        mask = self._mask()
+        if not mask & (1 << channel):
+            self._write_mask(self._addr, mask | (1 << channel))
 
     def release_channel(self, channel: int) -> None:
-        buf = bytearray(1)
-        buf[0] = self._i2c.readfrom(self._addr, 1)[0] & (~(1 << channel))
-        self._i2c.writeto(self._addr, buf)
+        mask = self._mask()
+        if mask & (1 << channel):
+            self._write_mask(self._addr, mask & ~(1 << channel))
+
+    def get_stats(self) -> dict:
+        """Get the usage of the I2C bus of the hub.
+
+        :return: ``transfers``, the number of I2C transactions made through
+                 the hubs of the bus, including ``switches``, the writes of
+                 their control registers.
+        :rtype: dict
+        """
+        return {"transfers": self._bus.transfers, "switches": self._bus.switches}
+
+    def reset_stats(self) -> None:
+        """Reset the usage counters of the I2C bus of the hub to 0."""
+        self._bus.transfers = 0
+        self._bus.switches = 0
 
     def deinit(self) -> None:
-        self.release_channel(self._chn)
+        self._lock()
+        try:
+            self.release_channel(self._chn)
+        finally:
+            self._unlock()
 
     def scan(self, *args, **kwargs) -> list[int]:
-        self.select_channel(self._chn)
-        result = self._i2c.scan(*args, **kwargs)
-        self.release_channel(self._chn)
-        return result
+        with self:
+            self._bus.transfers += 1
+            return self._i2c.scan(*args, **kwargs)
 
     def start(self) -> None:
-        self.select_channel(self._chn)
-        self._i2c.start()
-        self.release_channel(self._chn)
+        with self:
+            self._i2c.start()
 
     def stop(self) -> None:
-        self.select_channel(self._chn)
-        self._i2c.stop()
-        self.release_channel(self._chn)
+        with self:
+            self._i2c.stop()
 
     def readinto(self, buf, nack: bool = True) -> None:
-        self.select_channel(self._chn)
-        self._i2c.readinto(buf, nack)
-        self.release_channel(self._chn)
+        with self:
+            self._bus.transfers += 1
+            self._i2c.readinto(buf, nack)
 
     def write(self, buf) -> int:
-        self.select_channel(self._chn)
-        result = self._i2c.write(buf)
-        self.release_channel(self._chn)
-        return result
+        with self:
+            self._bus.transfers += 1
+            return self._i2c.write(buf)
 
     def readfrom(self, addr: int, nbytes: int, *args, **kwargs) -> bytes:
-        self.select_channel(self._chn)
-        result = self._i2c.readfrom(addr, nbytes, *args, **kwargs)
-        self.release_channel(self._chn)
-        return result
+        with self:
+            self._bus.transfers += 1
+            return self._i2c.readfrom(addr, nbytes, *args, **kwargs)
 
     def readfrom_into(self, addr: int, buf, *args, **kwargs) -> None:
-        self.select_channel(self._chn)
-        self._i2c.readfrom_into(addr, buf, *args, **kwargs)
-        self.release_channel(self._chn)
+        with self:
+            self._bus.transfers += 1
+            self._i2c.readfrom_into(addr, buf, *args, **kwargs)
 
     def writeto(self, addr: int, buf, *args, **kwargs) -> int:
-        self.select_channel(self._chn)
-        result = self._i2c.writeto(addr, buf, *args, **kwargs)
-        time.sleep_ms(100)
-        self.release_channel(self._chn)
-        return result
+        with self:
+            self._bus.transfers += 1
+            result = self._i2c.writeto(addr, buf, *args, **kwargs)
+            time.sleep_ms(100)
+            return result
 
     def writevto(self, addr: int, vector, *args, **kwargs) -> int:
-        self.select_channel(self._chn)
-        result = self._i2c.writevto(addr, vector, *args, **kwargs)
-        self.release_channel(self._chn)
-        return result
+        with self:
+            self._bus.transfers += 1
+            return self._i2c.writevto(addr, vector, *args, **kwargs)
 
     def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, *args, **kwargs) -> bytes:
-        self.select_channel(self._chn)
-        result = self._i2c.readfrom_mem(addr, memaddr, nbytes, *args, **kwargs)
-        self.release_channel(self._chn)
-        return result
+        with self:
+            self._bus.transfers += 1
+            return self._i2c.readfrom_mem(addr, memaddr, nbytes, *args, **kwargs)
 
     def readfrom_mem_into(self, addr: int, memaddr: int, buf, *args, **kwargs) -> None:
-        self.select_channel(self._chn)
-        self._i2c.readfrom_mem_into(addr, memaddr, buf, *args, **kwargs)
-        self.release_channel(self._chn)
+        with self:
+            self._bus.transfers += 1
+            self._i2c.readfrom_mem_into(addr, memaddr, buf, *args, **kwargs)
 
     def writeto_mem(self, addr: int, memaddr: int, buf, *args, **kwargs) -> None:
-        self.select_channel(self._chn)
-        self._i2c.writeto_mem(addr, memaddr, buf, *args, **kwargs)
-        self.release_channel(self._chn)
+        with self:
+            self._bus.transfers += 1
+            self._i2c.writeto_mem(addr, memaddr, buf, *args, **kwargs)
@@ -40,7 +40,8 @@ class THERMALUnit(MLX90640):
         return round(self._framebuf[(x * y) - 1], 2)
 
     def get_temperature_buffer(self):
-        return self._framebuf
+        # a list like before, get_frame() returns the reused array("f")
+        return list(self._framebuf)
 
     def set_refresh_rate(self, rate):
         """
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Chain bus decoder benchmark, run it on the device:
+#
+#   mpremote run tests/chain/bench_decode.py
+#
+# Feeds a recorded notification stream of several devices (encoders,
+# joystick, ToF) into ChainLinkLayer._decode_packet in UART sized chunks and
+# compares it with the previous byte-at-a-time state machine.
+
+import time
+from chain.chain import ChainLinkLayer
+
+
+class CaptureUART:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, buf):
+        self.data.extend(buf)
+
+
+def record_stream(packets):
+    uart = CaptureUART()
+    link = ChainLinkLayer(uart)
+    for _ in range(packets // 4):
+        link._send_packet(1, 0x10, b"\x12\x34\x00\x00")  # encoder value
+        link._send_packet(2, 0x10, b"\xff\xfe\x00\x00")  # encoder value
+        link._send_packet(3, 0x30, b"\x00\x08\x00\x08\x01")  # joystick
+        link._send_packet(4, 0x50, b"\x2c\x01")  # ToF distance
+    return bytes(uart.data)
+
+
+def legacy_decode(state, buf):
+    # byte-at-a-time decoder used before the header scanner
+    decoded = 0
+    for b in buf:
+        s = state[0]
+        if s == 0:
+            if b == 0xAA:
+                state[0] = 1
+                state[7] = bytearray()
+        elif s == 1:
+            state[0] = 2 if b == 0x55 else 0
+        elif s == 2:
+            state[1] = b
+            state[0] = 3
+        elif s == 3:
+            state[1] |= b << 8
+            state[0] = 4
+        elif s == 4:
+            state[2] = b
+            state[0] = 5
+        elif s == 5:
+            state[3] = b
+            state[0] = 7 if state[1] == 3 else 6
+        elif s == 6:
+            state[7].append(b)
+            if len(state[7]) == state[1] - 3:
+                state[0] = 7
+        elif s == 7:
+            state[4] = b
+            state[0] = 8
+        elif s == 8:
+            state[0] = 9 if b == 0x55 else 0
+        elif s == 9:
+            state[0] = 0
+            if b == 0xAA and (state[2] + state[3] + sum(state[7])) & 0xFF == state[4]:
+                decoded += 1
+    return decoded
+
+
+def feed(decode, stream, chunk):
+    start = time.ticks_us()
+    for i in range(0, len(stream), chunk):
+        decode(stream[i : i + chunk])
+    return time.ticks_diff(time.ticks_us(), start)
+
+
+def main():
+    stream = record_stream(400)
+    print("stream: {} bytes, 400 packets".format(len(stream)))
+    for chunk in (16, 64, 256):
+        link = ChainLinkLayer(None)
+        link.MAX_QUEUED_PACKETS = 400
+        new_us = feed(link._decode_packet, stream, chunk)
+        assert sum(len(q) for q in link._packets.values()) == 400
+        state = [0, 0, 0, 0, 0, 0, 0, bytearray()]
+        old_us = feed(lambda buf: legacy_decode(state, buf), stream, chunk)
+        print(
+            "chunk {:4d}: scanner {:7d} us, state machine {:7d} us, {:.1f}x".format(
+                chunk, new_us, old_us, old_us / new_us
+            )
+        )
+
+
+main()
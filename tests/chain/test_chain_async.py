@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Loopback test of AsyncChainBus against simulated chain devices behind a
+# fake UART, run it on the device:
+#
+#   mpremote run tests/chain/test_chain_async.py
+
+import io
+import asyncio
+import time
+from chain.chain import ChainLinkLayer, CMD_ENUM_RESPONSE
+from chain.chain_async import AsyncChainBus
+from chain.encoder import EncoderChain
+from chain.key import KeyChain
+
+_MP_STREAM_POLL = 3
+_MP_STREAM_POLL_RD = 0x0001
+_MP_STREAM_POLL_WR = 0x0004
+
+
+class FakeUART(io.IOBase):
+    """Stream with the UART interface, host writes go to a FakeChain."""
+
+    def __init__(self):
+        self.rx = bytearray()
+        self.chain = None
+
+    def write(self, buf):
+        self.chain.receive(bytes(buf))
+        return len(buf)
+
+    def read(self, n=-1):
+        if not self.rx:
+            return None
+        if n < 0 or n > len(self.rx):
+            n = len(self.rx)
+        data = bytes(self.rx[:n])
+        self.rx[:n] = b""
+        return data
+
+    def readinto(self, buf):
+        data = self.read(len(buf))
+        if data is None:
+            return None
+        buf[: len(data)] = data
+        return len(data)
+
+    def any(self):
+        return len(self.rx)
+
+    def ioctl(self, req, arg):
+        if req == _MP_STREAM_POLL:
+            ret = 0
+            if arg & _MP_STREAM_POLL_RD and self.rx:
+                ret |= _MP_STREAM_POLL_RD
+            if arg & _MP_STREAM_POLL_WR:
+                ret |= _MP_STREAM_POLL_WR
+            return ret
+        return 0
+
+
+class FakeChain:
+    """Simulated chain: device 1 is an encoder, device 2 a key."""
+
+    def __init__(self, uart):
+        self.uart = uart
+        uart.chain = self
+        self.link = ChainLinkLayer(uart)
+        self.encoder_value = 0
+        # reply delay per device in ms, the encoder is slow
+        self.delay = {0xFF: 1, 1: 30, 2: 30}
+
+    def receive(self, buf):
+        self.link._decode_packet(buf)
+        for key, queue in self.link._packets.items():
+            while queue:
+                payload = queue.pop(0)[1]
+                asyncio.create_task(self.reply(key >> 8, key & 0xFF, payload))
+
+    def send(self, device_id, cmd, payload):
+        self.uart.rx.extend(self.link._encode_packet(device_id, cmd, payload))
+
+    async def reply(self, device_id, cmd, payload):
+        await asyncio.sleep_ms(self.delay[device_id])
+        if cmd == CMD_ENUM_RESPONSE:
+            self.send(device_id, cmd, b"\x02")
+        elif device_id == 1 and cmd == EncoderChain.CMD_GET_VALUE:
+            self.send(device_id, cmd, self.encoder_value.to_bytes(2, "little"))
+        elif device_id == 2 and cmd == KeyChain.CMD_KEY_STATE:
+            self.send(device_id, cmd, b"\x01")
+        # unknown commands are not answered
+
+
+async def test_enumerate(bus):
+    assert bus.device_num == 2
+
+
+async def test_concurrent(bus, encoder, key):
+    start = time.ticks_ms()
+    value, pressed = await asyncio.gather(
+        encoder.get_encoder_value_async(), key.get_button_state_async()
+    )
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    assert value == 0 and pressed is True
+    # both devices answer after 30 ms, awaited concurrently
+    assert elapsed < 55, elapsed
+
+
+async def test_timeout(bus):
+    assert await bus.send_async(2, 0x99, b"", timeout_ms=20) == b""
+
+
+async def test_key_events(chain, key):
+    events = key.events_async()
+    for event in (KeyChain.EVENT_CLICK, KeyChain.EVENT_LONG_PRESS):
+        chain.send(2, KeyChain.CMD_KEY_PRESS, bytes([event, 0]))
+    assert await events.__anext__() == KeyChain.EVENT_CLICK
+    assert await events.__anext__() == KeyChain.EVENT_LONG_PRESS
+    events.close()
+
+
+async def test_encoder_values(chain, encoder):
+    values = []
+
+    async def turn():
+        for v in (1, 2, 2, 3):
+            await asyncio.sleep_ms(60)
+            chain.encoder_value = v
+
+    asyncio.create_task(turn())
+    async for value in encoder.values_async(interval_ms=10):
+        values.append(value)
+        if value == 3:
+            break
+    assert values == [0, 1, 2, 3], values
+
+
+async def main():
+    uart = FakeUART()
+    chain = FakeChain(uart)
+    bus = AsyncChainBus(uart=uart)
+    await bus.start()
+    encoder = EncoderChain(bus, 1)
+    key = KeyChain(bus, 2)
+    await test_enumerate(bus)
+    await test_concurrent(bus, encoder, key)
+    await test_timeout(bus)
+    await test_key_events(chain, key)
+    await test_encoder_values(chain, encoder)
+    bus.deinit()
+    print("OK")
+
+
+asyncio.run(main())
@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Memory high-water benchmark of a multipart file upload: the previous
+# content() that concatenates the body in RAM, content() and the streamed
+# body() of MultiPartForm. The body is written to a stand-in for the socket
+# that only counts the bytes, so no network is needed.
+#
+#   python tests/ezdata/bench_upload.py
+#   mpremote run tests/ezdata/bench_upload.py
+
+import gc
+import sys
+import time
+
+try:
+    from ezdata.multi import MultiPartForm
+except ImportError:
+    # ezdata/__init__.py needs urequests, so load multi.py on its own
+    import os
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.path.join(root, "m5stack", "libs", "ezdata"))
+    from multi import MultiPartForm
+
+PATH = (
+    "/flash/bench_upload.bin" if sys.implementation.name == "micropython" else "bench_upload.bin"
+)
+# file sizes in bytes
+SIZES = (16 * 1024, 64 * 1024, 200 * 1024)
+
+try:
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+except AttributeError:
+
+    def ticks_ms():
+        return time.perf_counter_ns() // 1000000
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+if sys.implementation.name == "micropython":
+
+    class Peak:
+        # highest heap use since start(), sampled at every write
+        def start(self):
+            gc.collect()
+            self.base = gc.mem_alloc()
+            self.peak = self.base
+
+        def sample(self):
+            self.peak = max(self.peak, gc.mem_alloc())
+
+        def stop(self):
+            self.sample()
+            return self.peak - self.base
+
+else:
+    import tracemalloc
+
+    class Peak:
+        def start(self):
+            gc.collect()
+            tracemalloc.start()
+
+        def sample(self):
+            pass
+
+        def stop(self):
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+
+class Sink:
+    # counts what would be written to the socket
+    def __init__(self, peak):
+        self.peak = peak
+        self.size = 0
+
+    def write(self, buf):
+        self.peak.sample()
+        self.size += len(buf)
+        return len(buf)
+
+
+def legacy_content(form):
+    # the content() of the previous version, for comparison
+    data = b""
+    part_boundary = ("--" + form.boundary).encode()
+    needs_clrf = False
+    for name, value in form.fields:
+        if needs_clrf:
+            data += b"\r\n"
+        needs_clrf = True
+        block = [
+            part_boundary,
+            ('Content-Disposition: form-data; name="%s"' % name).encode(),
+            b"Content-Type: multipart/form-data",
+            b"",
+            value.encode(),
+        ]
+        data += b"\r\n".join(block)
+    for field, filename, content_type, _ in form.files:
+        if needs_clrf:
+            data += b"\r\n"
+        needs_clrf = True
+        block = [
+            part_boundary,
+            (
+                'Content-Disposition: form-data; name="%s"; filename="%s"' % (field, filename)
+            ).encode(),
+            ("Content-Type: %s" % content_type).encode(),
+            b"",
+        ]
+        data += b"\r\n".join(block)
+        data += b"\r\n"
+        with open(filename, "rb") as f:
+            while True:
+                ch = f.read(1024)
+                if not ch:
+                    break
+                data += ch
+    data += ("\r\n--" + form.boundary + "--\r\n").encode()
+    return data
+
+
+def send_legacy(form, sink):
+    sink.write(legacy_content(form))
+
+
+def send_content(form, sink):
+    sink.write(form.content())
+
+
+def send_body(form, sink):
+    # what requests2 does with a body that has readinto()
+    buf = bytearray(1024)
+    with form.body() as body:
+        while True:
+            n = body.readinto(buf)
+            if not n:
+                break
+            sink.write(memoryview(buf)[:n])
+
+
+def make_file(size):
+    chunk = bytes(range(256)) * 4
+    with open(PATH, "wb") as f:
+        for _ in range(size // len(chunk)):
+            f.write(chunk)
+        f.write(chunk[: size % len(chunk)])
+
+
+def bench(name, size, send):
+    form = MultiPartForm()
+    form.add_field("dataType", "file")
+    form.add_field("name", "bench")
+    form.add_file("file", PATH)
+    peak = Peak()
+    sink = Sink(peak)
+    try:
+        start = ticks_ms()
+        peak.start()
+        send(form, sink)
+        high = peak.stop()
+        elapsed = ticks_diff(ticks_ms(), start)
+    except MemoryError:
+        print("{:<16} {:>4} KB  MemoryError".format(name, size // 1024))
+        return
+    assert sink.size == form.content_length()
+    print("{:<16} {:>4} KB  peak {:>8} bytes  {:>6} ms".format(name, size // 1024, high, elapsed))
+
+
+def main():
+    import os
+
+    for size in SIZES:
+        make_file(size)
+        bench("legacy content", size, send_legacy)
+        bench("content", size, send_content)
+        bench("body", size, send_body)
+    os.remove(PATH)
+
+
+main()
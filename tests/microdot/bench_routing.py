@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Route dispatch benchmark: Microdot.find_route with the route index against
+# the previous linear scan over the URL map, at 10/100/500 routes.
+#
+#   mpremote run tests/microdot/bench_routing.py
+#   python tests/microdot/bench_routing.py   (from m5stack/libs)
+
+import time
+from microdot import Microdot
+
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:
+
+    def ticks_us():
+        return time.perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+class FakeRequest:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.url_args = None
+
+
+def handler(request, **kwargs):
+    return ""
+
+
+def make_app(count):
+    app = Microdot()
+    for i in range(count // 2):
+        app.route("/api/v1/res{}".format(i), methods=["GET", "POST"])(handler)
+        app.route("/api/v1/res{}/<int:id>".format(i), methods=["GET", "PUT"])(handler)
+    return app
+
+
+def linear_find_route(app, req):
+    # find_route before the route index
+    f = 404
+    for route_methods, route_pattern, route_handler, _, _ in app.url_map:
+        req.url_args = route_pattern.match(req.path)
+        if req.url_args is not None:
+            if req.method in route_methods:
+                f = route_handler
+                break
+            f = 405
+    return f
+
+
+def bench(find, app, requests, rounds):
+    start = ticks_us()
+    for _ in range(rounds):
+        for req in requests:
+            find(app, req)
+    return ticks_diff(ticks_us(), start) / (rounds * len(requests))
+
+
+def main():
+    for count in (10, 100, 500):
+        app = make_app(count)
+        n = count // 2
+        requests = [
+            FakeRequest("GET", "/api/v1/res0"),
+            FakeRequest("GET", "/api/v1/res{}/42".format(n // 2)),
+            FakeRequest("PUT", "/api/v1/res{}/7".format(n - 1)),
+            FakeRequest("GET", "/api/v1/missing"),
+        ]
+        rounds = max(1, 2000 // count)
+        for req in requests:
+            app.find_route(req)  # build the index, compile the patterns
+            linear_find_route(app, req)
+        indexed = bench(lambda a, r: a.find_route(r), app, requests, rounds)
+        linear = bench(linear_find_route, app, requests, rounds)
+        print(
+            "{:4d} routes: index {:8.1f} us, linear {:8.1f} us per request".format(
+                count, indexed, linear
+            )
+        )
+
+
+main()
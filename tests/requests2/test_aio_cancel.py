@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Cancel a streamed read of AsyncSession in the middle of the body, then send
+# a second request to the same host. The cancelled response must free its
+# slot of limit_per_host, otherwise the second request waits forever. The
+# server runs in the same event loop, so no network is needed:
+#
+#   python tests/requests2/test_aio_cancel.py
+#   mpremote run tests/requests2/test_aio_cancel.py
+
+import asyncio
+import sys
+
+try:
+    from requests2.aio import AsyncSession
+except ImportError:
+    import os
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.path.join(root, "m5stack", "libs"))
+    from requests2.aio import AsyncSession
+
+PORT = 8089
+
+
+async def handle(reader, writer):
+    line = await reader.readline()
+    while True:
+        h = await reader.readline()
+        if not h or h == b"\r\n":
+            break
+    if line.startswith(b"GET /stall"):
+        # announce a body that never comes completely
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 1000\r\n\r\n" + b"x" * 10)
+        await writer.drain()
+        await asyncio.sleep(5)
+    else:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def main():
+    server = await asyncio.start_server(handle, "127.0.0.1", PORT)
+    base = "http://127.0.0.1:%d" % PORT
+    session = AsyncSession(limit_per_host=1, timeout=(2, 10))
+
+    rsp = await session.get(base + "/stall", stream=True)
+    assert await rsp.read(10) == b"x" * 10
+    task = asyncio.create_task(rsp.read(100))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+    rsp = await asyncio.wait_for(session.get(base + "/ok"), 2)
+    assert rsp.text == "ok", rsp.text
+    session.close()
+    server.close()
+    await server.wait_closed()
+    print("OK")
+
+
+asyncio.run(main())
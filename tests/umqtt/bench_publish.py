@@ -0,0 +1,201 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Publish throughput benchmark: the previous publish with one socket write per
+# field against publish() with the packet builder and publish_many() batches,
+# for QoS 0 and QoS 1, against a minimal broker stand-in.
+#
+#   PYTHONPATH=m5stack/libs python tests/umqtt/bench_publish.py
+#                                                  (runs the broker in a thread)
+#   python tests/umqtt/bench_publish.py --broker   (broker only, on a PC)
+#   mpremote run tests/umqtt/bench_publish.py      (set BROKER to the PC)
+
+import struct
+import sys
+import time
+
+BROKER = "127.0.0.1"
+PORT = 18831
+# messages per run for QoS 0 and QoS 1
+COUNT = (2000, 200)
+PAYLOAD = b'{"temp": 21.5, "hum": 40.2}'
+
+try:
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+except AttributeError:
+
+    def ticks_ms():
+        return time.perf_counter_ns() // 1000000
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+def run_broker(port):
+    # accepts connections, answers CONNECT and acknowledges QoS 1 PUBLISH
+    import socket
+
+    def read_exact(conn, n):
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise OSError("closed")
+            data += chunk
+        return data
+
+    def serve(conn):
+        try:
+            while True:
+                op = read_exact(conn, 1)[0]
+                sz = sh = 0
+                while True:
+                    b = read_exact(conn, 1)[0]
+                    sz |= (b & 0x7F) << sh
+                    sh += 7
+                    if not b & 0x80:
+                        break
+                data = read_exact(conn, sz) if sz else b""
+                if op & 0xF0 == 0x10:
+                    conn.sendall(b"\x20\x02\x00\x00")
+                elif op & 0xF0 == 0x30 and op & 6:
+                    topic_len = struct.unpack("!H", data[:2])[0]
+                    conn.sendall(b"\x40\x02" + data[2 + topic_len : 4 + topic_len])
+                elif op & 0xF0 == 0xE0:
+                    break
+        except OSError:
+            pass
+        conn.close()
+
+    import threading
+
+    srv = socket.socket()
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind(("0.0.0.0", port))
+    srv.listen(4)
+    while True:
+        conn, _ = srv.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+
+class CountingSocket:
+    def __init__(self, sock):
+        self.sock = sock
+        self.writes = 0
+
+    def write(self, buf, n=None):
+        self.writes += 1
+        if n is None:
+            return self.sock.write(buf)
+        return self.sock.write(buf, n)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+def legacy_publish(client, topic, msg, qos):
+    # the publish() of the previous version, for comparison
+    pkt = bytearray(b"\x30\0\0\0")
+    pkt[0] |= qos << 1
+    sz = 2 + len(topic) + len(msg)
+    if qos > 0:
+        sz += 2
+    i = 1
+    while sz > 0x7F:
+        pkt[i] = (sz & 0x7F) | 0x80
+        sz >>= 7
+        i += 1
+    pkt[i] = sz
+    client.sock.write(pkt, i + 1)
+    client._send_str(topic)
+    if qos > 0:
+        client.pid += 1
+        pid = client.pid
+        struct.pack_into("!H", pkt, 0, pid)
+        client.sock.write(pkt, 2)
+    client.sock.write(msg)
+    if qos == 1:
+        client._wait_puback({pid})
+
+
+def bench(name, qos, send):
+    count = COUNT[qos]
+    from umqtt.simple import MQTTClient
+
+    client = MQTTClient("bench", BROKER, PORT)
+    client.connect()
+    client.sock = CountingSocket(client.sock)
+    start = ticks_ms()
+    send(client, qos, count)
+    elapsed = max(ticks_diff(ticks_ms(), start), 1)
+    print(
+        "{:<22} qos{}  {:>8.0f} msg/s  {:>5.2f} writes/msg".format(
+            name, qos, count * 1000 / elapsed, client.sock.writes / count
+        )
+    )
+    client.disconnect()
+
+
+def send_legacy(client, qos, count):
+    for _ in range(count):
+        legacy_publish(client, b"bench/sensor", PAYLOAD, qos)
+
+
+def send_publish(client, qos, count):
+    for _ in range(count):
+        client.publish(b"bench/sensor", PAYLOAD, qos=qos)
+
+
+def send_many(batch):
+    def send(client, qos, count):
+        messages = [(b"bench/sensor", PAYLOAD, False, qos)] * batch
+        for _ in range(count // batch):
+            client.publish_many(messages)
+
+    return send
+
+
+def main():
+    for qos in (0, 1):
+        bench("legacy publish", qos, send_legacy)
+        bench("publish", qos, send_publish)
+        bench("publish_many(10)", qos, send_many(10))
+        bench("publish_many(50)", qos, send_many(50))
+
+
+if sys.implementation.name == "micropython":
+    main()
+elif "--broker" in sys.argv:
+    run_broker(PORT)
+else:
+    import socket
+    import threading
+    import types
+
+    # umqtt/__init__ needs micropython.schedule
+    sys.modules.setdefault("micropython", types.SimpleNamespace(schedule=lambda f, a: f(a)))
+
+    class Socket(socket.socket):
+        # the stream methods of a MicroPython socket
+        def write(self, buf, n=None):
+            self.sendall(memoryview(buf)[:n] if n is not None else buf)
+            return n if n is not None else len(buf)
+
+        def read(self, n):
+            data = b""
+            while len(data) < n:
+                chunk = self.recv(n - len(data))
+                if not chunk:
+                    break
+                data += chunk
+            return data
+
+    import umqtt.simple
+
+    umqtt.simple.socket = types.SimpleNamespace(socket=Socket, getaddrinfo=socket.getaddrinfo)
+    threading.Thread(target=run_broker, args=(PORT,), daemon=True).start()
+    time.sleep(0.2)
+    main()
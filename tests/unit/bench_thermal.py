@@ -0,0 +1,29 @@
+# SPDX-FileCopyrightText: 2025 M5Stack Technology CO LTD
+#
+# SPDX-License-Identifier: MIT
+
+# Frame rate of the Thermal unit (MLX90640): time spent in get_frame() and in
+# the temperature calculation of one subpage, at 16 Hz and 1 MHz I2C.
+
+import time
+from machine import I2C, Pin
+from unit import ThermalUnit
+
+i2c0 = I2C(0, scl=Pin(1), sda=Pin(2), freq=1000000)
+thermal_0 = ThermalUnit(i2c0)
+thermal_0.set_refresh_rate(thermal_0.RefreshRate.REFRESH_16_HZ)
+
+frames = 20
+start = time.ticks_ms()
+for _ in range(frames):
+    thermal_0.update_temperature_buffer()
+elapsed = time.ticks_diff(time.ticks_ms(), start)
+print("get_frame: %.1f frames/s" % (frames * 1000 / elapsed))
+
+frame = thermal_0._frame
+start = time.ticks_us()
+for _ in range(frames):
+    thermal_0._calculate_to(frame, 0.95, 23.15, thermal_0._framebuf)
+elapsed = time.ticks_diff(time.ticks_us(), start)
+print("calculation: %.1f ms per subpage" % (elapsed / frames / 1000))
+print("min %.2f max %.2f" % (thermal_0.get_min_temperature, thermal_0.get_max_temperature))